@@ -0,0 +1,88 @@
+"""
+Conditional GET (ETag / Last-Modified) helperlari.
+
+View avval arzon fingerprint oladi (1 ta query), keyin:
+
+    validators = make_validators(fingerprint, last_modified=...)
+    not_modified = not_modified_response(request, validators)
+    if not_modified is not None:
+        return not_modified          # 304 — serializer ham, asosiy query ham yo'q
+    ...
+    return Response(data, headers=validators.headers)
+
+List endpointlar: filterlangan to'plam bo'yicha arzon aggregate (COUNT + MAX(...), 1 query) ->
+list_validators -> 304 paginate_request DAN OLDIN (sahifa query si ham yo'q). Page mode da aggregate
+count i paginate_request(count=...) ga beriladi — 200 da ham alohida COUNT yo'q.
+Aggregate bilan ifodalab bo'lmaydigan tartib (?q= rank) uchun — page_validators (sahifadan keyin).
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified.timestamp())
+        return headers
+
+
+def make_validators(*parts, last_modified: Optional[datetime] = None) -> Validators:
+    """
+    parts: fingerprint qismlari (timestamp, count, path ...) — istalgan biri o'zgarsa ETag ham o'zgaradi.
+    last_modified: None bo'lmagan eng katta timestamp.
+    """
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    etag = '"%s"' % hashlib.md5(raw.encode("utf-8"), usedforsecurity=False).hexdigest()
+    return Validators(etag=etag, last_modified=last_modified)
+
+
+def latest(*values) -> Optional[datetime]:
+    values = [v for v in values if v is not None]
+    return max(values) if values else None
+
+
+def not_modified_response(request, validators: Validators):
+    """
+    If-None-Match / If-Modified-Since mos kelsa 304 response, aks holda None.
+    (If-None-Match bo'lsa If-Modified-Since e'tiborga olinmaydi — RFC 9110.)
+    """
+    last_modified = validators.last_modified
+    response = get_conditional_response(
+        request,
+        etag=validators.etag,
+        last_modified=int(last_modified.timestamp()) if last_modified is not None else None,
+    )
+    if response is not None:
+        for name, value in validators.headers.items():
+            response[name] = value
+    return response
+
+
+def list_validators(path: str, fingerprint: dict) -> Validators:
+    """
+    List ETag: URL (filter + sahifa parametrlari) + butun to'plam aggregate i (selectors.*_list_fingerprint).
+    To'plamdagi istalgan o'zgarish hamma sahifalarning ETag ini almashtiradi (ortiqcha 200, noto'g'ri 304 yo'q).
+    Last-Modified berilmaydi — qator o'chsa MAX o'zgarmasligi mumkin (faqat count, ETag da bor).
+    """
+    return make_validators(path, *(value for _, value in sorted(fingerprint.items())))
+
+
+def page_validators(path: str, data: dict) -> Validators:
+    """
+    Paginated list javobi uchun ETag: URL + count / next_cursor + sahifa qatorlari (.values() dict lari).
+    Butun to'plam bo'yicha COUNT/MAX yo'q. Last-Modified berilmaydi: sahifadagi eng katta vaqt
+    qator o'chib, eskirog'i sahifaga kirganda o'zgarmaydi (noto'g'ri 304 bo'lardi).
+    """
+    rows = [sorted(row.items()) for row in data["results"]]
+    return make_validators(path, data.get("count"), data.get("next_cursor"), rows)
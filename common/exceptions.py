@@ -31,6 +31,12 @@ class NotFoundError(AppError):
     message = "Not found"
 
 
+class ValidationError(AppError):
+    code = "VALIDATION_ERROR"
+    status = 400
+    message = "Invalid input"
+
+
 def custom_exception_handler(exc, context):
     """
     Unified error format.
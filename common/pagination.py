@@ -1,11 +1,39 @@
-from typing import Any, Dict
-from django.db.models import QuerySet
+import uuid
+from datetime import date, datetime
+from functools import reduce
+from typing import Any, Dict, Optional, Sequence, Tuple
 
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q, QuerySet
 
-def paginate_queryset(qs: QuerySet, *, page: int, page_size: int) -> Dict[str, Any]:
+from .exceptions import ValidationError
+
+# (field_name, descending) juftliklari, masalan: (("created_at", True), ("id", True))
+OrderingKeys = Sequence[Tuple[str, bool]]
+
+CURSOR_SALT = "common.pagination.cursor"
+MAX_PAGE_SIZE = 100
+
+
+def _clamp_page_size(page_size) -> int:
+    return min(MAX_PAGE_SIZE, max(1, int(page_size)))  # hard limit: 100
+
+
+def paginate_queryset(
+    qs: QuerySet,
+    *,
+    page: int,
+    page_size: int,
+    with_count: bool = True,
+    count: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Simple, explicit pagination (DRF paginator ishlatmaymiz — tushunish oson bo‘lsin).
 
+    with_count=False -> qs.count() qilinmaydi ("count": None), katta jadvallarda arzonroq.
+    count: oldindan hisoblangan qs.count() (masalan ETag aggregate idan) — qayta COUNT yo'q.
+
     Returns:
       {
         "page": 1,
@@ -15,7 +43,7 @@ def paginate_queryset(qs: QuerySet, *, page: int, page_size: int) -> Dict[str, A
       }
     """
     page = max(1, int(page))
-    page_size = min(100, max(1, int(page_size)))  # hard limit: 100
+    page_size = _clamp_page_size(page_size)
 
     start = (page - 1) * page_size
     end = start + page_size
@@ -23,6 +51,188 @@ def paginate_queryset(qs: QuerySet, *, page: int, page_size: int) -> Dict[str, A
     return {
         "page": page,
         "page_size": page_size,
-        "count": qs.count(),
+        "count": (qs.count() if count is None else count) if with_count else None,
         "results": qs[start:end],
-    }
\ No newline at end of file
+    }
+
+
+#==========================
+# keyset (cursor) pagination
+#==========================
+def order_by_keys(qs: QuerySet, keys: OrderingKeys) -> QuerySet:
+    """
+    Keyset pagination uchun ordering.
+    NULL lar har doim oxirida (Postgres va SQLite bir xil natija bersin).
+    NOT NULL ustunlarda NULLS LAST yozilmaydi — Postgres DESC index (NULLS FIRST)
+    bilan mos kelsin, aks holda planner index o'rniga sort qiladi.
+    """
+    return qs.order_by(*[_order_expression(qs, name, desc) for name, desc in keys])
+
+
+def _order_expression(qs: QuerySet, name: str, desc: bool):
+    nulls_last = True if _is_nullable(qs, name) else None
+    return F(name).desc(nulls_last=nulls_last) if desc else F(name).asc(nulls_last=nulls_last)
+
+
+def _is_nullable(qs: QuerySet, name: str) -> bool:
+    try:
+        return qs.model._meta.get_field(name).null
+    except FieldDoesNotExist:
+        # annotation (masalan is_overdue) — NULL bo'lmaydi deb hisoblaymiz
+        return False
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _row_value(obj, name: str):
+    # model instance yoki qs.values() dict
+    return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+
+
+def encode_cursor(obj, keys: OrderingKeys) -> str:
+    """
+    Opaque + signed cursor: oxirgi qatordagi ordering qiymatlari.
+    Kalit nomlari ham imzolanadi — boshqa endpoint cursorini ishlatib bo'lmaydi.
+    """
+    payload = {
+        "k": [name for name, _ in keys],
+        "v": [_encode_value(_row_value(obj, name)) for name, _ in keys],
+    }
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor: str, keys: OrderingKeys) -> list:
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise ValidationError("Invalid cursor", details={"cursor": ["Invalid or tampered cursor"]})
+
+    names = [name for name, _ in keys]
+    if not isinstance(payload, dict) or payload.get("k") != names or len(payload.get("v") or []) != len(names):
+        raise ValidationError("Invalid cursor", details={"cursor": ["Cursor does not match this listing"]})
+
+    return payload["v"]
+
+
+def values_with_keys(qs: QuerySet, fields, keys: OrderingKeys) -> QuerySet:
+    """
+    qs.values(fields + ordering kalitlari) — keyset cursor .values() qatorlaridan ham yasalishi uchun.
+    """
+    return qs.values(*dict.fromkeys([*fields, *(name for name, _ in keys)]))
+
+
+def keyset_after_q(qs: QuerySet, keys: OrderingKeys, values: list) -> Q:
+    """
+    (k1, k2, ...) > (v1, v2, ...) ni ordering yo'nalishlariga mos Q ga aylantiradi:
+
+      k1 after v1
+      OR (k1 = v1 AND k2 after v2)
+      OR ...
+
+    NULLS LAST: NULL dan keyin hech narsa yo'q, NULL bo'lmagan qiymatdan keyin NULL lar keladi.
+    """
+    never = Q(pk__in=[])
+    branches = []
+    equal_prefix = Q()
+
+    for (name, desc), value in zip(keys, values):
+        if value is None:
+            after = never
+            equal = Q(**{f"{name}__isnull": True})
+        else:
+            after = Q(**{f"{name}__lt" if desc else f"{name}__gt": value})
+            if _is_nullable(qs, name):
+                after |= Q(**{f"{name}__isnull": True})
+            equal = Q(**{name: value})
+
+        if after is not never:
+            branches.append(equal_prefix & after)
+        equal_prefix &= equal
+
+    if not branches:
+        return never
+    return reduce(lambda a, b: a | b, branches)
+
+
+def paginate_keyset(
+    qs: QuerySet,
+    *,
+    keys: OrderingKeys,
+    cursor: Optional[str],
+    page_size: int,
+) -> Dict[str, Any]:
+    """
+    Keyset (cursor) pagination: OFFSET ham, count() ham yo'q.
+    Chuqur sahifalar ham birinchi sahifa kabi tez (index bo'yicha WHERE + LIMIT).
+
+    qs allaqachon order_by_keys(qs, keys) bilan tartiblangan bo'lishi kerak.
+
+    Returns:
+      {
+        "page_size": 10,
+        "next_cursor": "<opaque>" | None,
+        "results": [<obj>, ...]
+      }
+    """
+    page_size = _clamp_page_size(page_size)
+
+    if cursor:
+        qs = qs.filter(keyset_after_q(qs, keys, decode_cursor(cursor, keys)))
+
+    # +1 qator: keyingi sahifa bormi-yo'qmi bilish uchun
+    rows = list(qs[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    return {
+        "page_size": page_size,
+        "next_cursor": encode_cursor(rows[-1], keys) if has_more else None,
+        "results": rows,
+    }
+
+
+def _flag(value) -> bool:
+    return str(value).lower() not in ("0", "false", "no", "")
+
+
+def paginate_request(
+    qs: QuerySet,
+    params,
+    *,
+    keys: OrderingKeys,
+    default_page_size: int = 10,
+    count: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    View lar uchun umumiy kirish nuqtasi (params = request.query_params).
+
+      ?page=2&page_size=10           -> eski page mode (compat)
+      ?page=2&count=0                -> page mode, count() siz
+      ?cursor=&page_size=10          -> cursor mode, birinchi sahifa
+      ?cursor=<next_cursor>          -> cursor mode, keyingi sahifa
+
+    qs order_by_keys(qs, keys) bilan tartiblangan bo'lishi kerak.
+    count: page mode da qs.count() o'rniga ishlatiladi (cursor mode da count yo'q).
+    """
+    try:
+        page_size = int(params.get("page_size", default_page_size))
+        page = int(params.get("page", "1"))
+    except (TypeError, ValueError):
+        raise ValidationError(details={"page": ["page and page_size must be integers"]})
+
+    if "cursor" in params:
+        return paginate_keyset(qs, keys=keys, cursor=params.get("cursor"), page_size=page_size)
+
+    return paginate_queryset(
+        qs,
+        page=page,
+        page_size=page_size,
+        with_count=_flag(params.get("count", "1")),
+        count=count,
+    )
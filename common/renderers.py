@@ -0,0 +1,77 @@
+"""
+Tezroq JSON renderer (orjson) — DRF JSONRenderer bilan bir xil baytlar.
+
+settings: API_FAST_JSON=1 -> REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] da shu renderer.
+orjson ixtiyoriy dependency (pip install orjson); o'rnatilmagan bo'lsa — oddiy JSONRenderer.
+
+orjson UUID / datetime ni o'zi (C da) encode qiladi; qolgan tiplar (Decimal, lazy str,
+QuerySet ...) DRF encoders.JSONEncoder.default orqali — natija DRF bilan bir xil bo'lsin.
+Fast path faqat DRF default sozlamalarida (compact, unicode, strict) va indent so'ralmaganda;
+aks holda (yoki orjson encode qila olmasa) stdlib yo'liga tushadi.
+
+float lar ham stdlib yo'lida: orjson NaN/Infinity ni null qiladi (DRF strict -> ValueError)
+va repr boshqacha (1e16 -> 1e16, json.dumps -> 1e+16). API javoblarimizda float deyarli yo'q,
+shuning uchun tekshiruv arzon (faqat dict/list larni aylanib chiqadi).
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+_drf_encoder = encoders.JSONEncoder()
+
+if orjson is not None:
+    # UTC -> "Z" (DRF encoder bilan bir xil); int/UUID/... dict kalitlari json.dumps kabi str ga
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _contains_float(data) -> bool:
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, float):
+            return True
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    return False
+
+
+def _default(obj):
+    value = _drf_encoder.default(obj)
+    # masalan Decimal -> float: orjson emas, stdlib formatlasin
+    if _contains_float(value):
+        raise TypeError("float values are rendered by the stdlib encoder")
+    return value
+
+
+class FastJSONRenderer(JSONRenderer):
+    def _fast_path(self, accepted_media_type, renderer_context) -> bool:
+        return (
+            orjson is not None
+            and self.compact
+            and not self.ensure_ascii
+            and self.strict
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if not self._fast_path(accepted_media_type, renderer_context) or _contains_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            # masalan 64-bit dan katta int yoki _default dagi float — stdlib bilan (xato bo'lsa o'sha xato ko'tariladi)
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # DRF kabi: JS-safe bo'lishi uchun U+2028 / U+2029 har doim escape
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
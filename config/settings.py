@@ -109,8 +109,89 @@ REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "common.exceptions.custom_exception_handler"
 }
 
+# orjson renderer (common.renderers.FastJSONRenderer): "1" + pip install orjson.
+# Javob baytlari DRF JSONRenderer bilan bir xil; orjson yo'q bo'lsa oddiy JSONRenderer ishlaydi.
+API_FAST_JSON = os.getenv("API_FAST_JSON", "0") == "1"
+if API_FAST_JSON:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
+        "common.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    )
+
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.getenv("JWT_ACCESS_MINUTES", "30"))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=int(os.getenv("JWT_REFRESH_DAYS", "7"))),
 }
+
+
+# -------------------------
+# Notifications (outbox)
+# -------------------------
+# inline | on_commit | deferred (qarang: tickets.services.broadcast_notification)
+NOTIFICATION_FANOUT_MODE = os.getenv("NOTIFICATION_FANOUT_MODE", "inline")
+
+# PostgreSQL LISTEN/NOTIFY: bo'sh bo'lsa o'chirilgan (worker polling qiladi)
+OUTBOX_NOTIFY_CHANNEL = os.getenv("OUTBOX_NOTIFY_CHANNEL", "")
+
+# Delivery backend (qarang: tickets.delivery)
+NOTIFICATION_DELIVERY = {
+    "BACKEND": os.getenv("NOTIFICATION_DELIVERY_BACKEND", "tickets.delivery.SimulatedBackend"),
+    "OPTIONS": {
+        "max_concurrency": int(os.getenv("NOTIFICATION_DELIVERY_CONCURRENCY", "1")),
+        "timeout": float(os.getenv("NOTIFICATION_DELIVERY_TIMEOUT", "10")),
+    },
+}
+
+
+# -------------------------
+# SLA
+# -------------------------
+# "1": agent queue o'qilganda shu sahifadagi breachlar yoziladi (sweep_sla ishlamaydigan dev muhit uchun).
+# Default "0": queue o'qish read-only, breach + escalation ni sweep_sla daemon yuritadi.
+SLA_MARK_ON_READ = os.getenv("SLA_MARK_ON_READ", "0") == "1"
+
+# Background joblar (sweep_sla) history ga shu user nomidan yozadi
+SYSTEM_ACTOR_USERNAME = os.getenv("SYSTEM_ACTOR_USERNAME", "system")
+
+
+# -------------------------
+# Cache
+# -------------------------
+# Default: locmem (har process o'zining keshi). Bir nechta worker/process bo'lsa invalidation
+# hamma joyga yetishi uchun umumiy backend ulang, masalan:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "support-tickets"),
+    }
+}
+
+# Ticket detail (TicketDetailSerializer output) keshi: qaysi alias va necha sekund; 0 -> o'chirilgan
+TICKET_DETAIL_CACHE_ALIAS = os.getenv("TICKET_DETAIL_CACHE_ALIAS", "default")
+TICKET_DETAIL_CACHE_TIMEOUT = int(os.getenv("TICKET_DETAIL_CACHE_TIMEOUT", "300"))
+
+# GET /api/tickets/{id}?latest= (qiymatsiz) — messages/history dan nechta eng yangisi
+TICKET_DETAIL_LATEST_DEFAULT = int(os.getenv("TICKET_DETAIL_LATEST_DEFAULT", "20"))
+
+# -------------------------
+# Export
+# -------------------------
+# GET /api/tickets/export va export_tickets: DB dan shu o'lchamdagi bo'laklarda o'qiladi
+# (PostgreSQL da server-side cursor; PgBouncer transaction pooling bo'lsa
+# DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True qiling)
+TICKET_EXPORT_CHUNK_SIZE = int(os.getenv("TICKET_EXPORT_CHUNK_SIZE", "2000"))
+
+# -------------------------
+# Ticket routing (auto-assignment, qarang: tickets.routing)
+# -------------------------
+# MODE: off | inline (create_ticket ichida) | background (manage.py route_tickets --loop)
+TICKET_ROUTING = {
+    "MODE": os.getenv("TICKET_ROUTING_MODE", "off"),
+    "STRATEGY": os.getenv("TICKET_ROUTING_STRATEGY", "tickets.routing.LeastLoadedStrategy"),
+    "OPTIONS": {
+        "max_load": int(os.getenv("TICKET_ROUTING_MAX_LOAD", "0")),
+        "refresh_seconds": float(os.getenv("TICKET_ROUTING_REFRESH_SECONDS", "30")),
+    },
+}
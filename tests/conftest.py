@@ -2,16 +2,54 @@ import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 
+from tickets.delivery import BaseDeliveryBackend
+
 User = get_user_model()
 
+
+class FlakyBackend(BaseDeliveryBackend):
+    """payload["i"] toq bo'lgan notificationlar yiqiladi."""
+    def send_many(self, notifications, *, deadline=None):
+        return {n.id: (None if n.payload.get("i", 0) % 2 == 0 else "provider down") for n in notifications}
+
+
 @pytest.fixture
 def api():
     return APIClient()
 
+
 @pytest.fixture
 def client_user(db):
     return User.objects.create_user(username="client1", password="pass1234", role="client")
 
+
 @pytest.fixture
 def agent_user(db):
-    return User.objects.create_user(username="agent1", password="pass1234", role="agent")
\ No newline at end of file
+    return User.objects.create_user(username="agent1", password="pass1234", role="agent")
+
+
+@pytest.fixture
+def make_users(db):
+    """make_users(n) -> n ta yangi client (har biri alohida outbox "navbati" bo'lishi uchun)."""
+    created = []
+
+    def make(n, role="client"):
+        start = len(created)
+        users = User.objects.bulk_create([User(username=f"{role}-{start + i}", role=role) for i in range(n)])
+        created.extend(users)
+        return users
+
+    return make
+
+
+@pytest.fixture
+def flaky_delivery(monkeypatch):
+    # settings dagi dotted path o'rniga: process_outbox_batch shu backend ni oladi
+    monkeypatch.setattr("tickets.services.get_delivery_backend", FlakyBackend)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    # locmem kesh testlar orasida saqlanib qolmasin (ticket detail cache)
+    from django.core.cache import cache
+    cache.clear()
@@ -0,0 +1,87 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from tickets.audit import audit_batch, record
+from tickets.models import Ticket, TicketHistory
+from tickets.services import assign_ticket, change_status, claim_ticket, create_ticket
+
+User = get_user_model()
+HISTORY_TABLE = TicketHistory._meta.db_table
+
+
+def _history_inserts(ctx) -> int:
+    return sum(1 for q in ctx.captured_queries if q["sql"].startswith(f'INSERT INTO "{HISTORY_TABLE}"'))
+
+
+@pytest.fixture
+def ticket(client_user):
+    return create_ticket(actor=client_user, title="Audit", description="x", priority="low")
+
+
+@pytest.mark.django_db
+def test_claim_writes_both_history_rows_in_one_insert(ticket, agent_user):
+    with CaptureQueriesContext(connection) as ctx:
+        claim_ticket(ticket_id=ticket.id, actor=agent_user)
+
+    assert _history_inserts(ctx) == 1
+    assert set(TicketHistory.objects.filter(ticket=ticket).values_list("field", flat=True)) == {"assigned_to", "status"}
+
+
+@pytest.mark.django_db
+def test_assign_and_status_each_issue_one_history_insert(ticket, agent_user):
+    admin = User.objects.create_user(username="admin1", password="pass1234", role="admin")
+
+    with CaptureQueriesContext(connection) as ctx:
+        assign_ticket(ticket_id=ticket.id, actor=admin, agent_id=agent_user.id)
+    assert _history_inserts(ctx) == 1
+    assert TicketHistory.objects.filter(ticket=ticket).count() == 2
+
+    with CaptureQueriesContext(connection) as ctx:
+        change_status(ticket_id=ticket.id, actor=agent_user, new_status="resolved")
+    assert _history_inserts(ctx) == 1
+    assert TicketHistory.objects.filter(ticket=ticket).count() == 3
+
+
+@pytest.mark.django_db
+def test_nested_services_flush_once_in_outer_batch(client_user, agent_user):
+    tickets = [create_ticket(actor=client_user, title=f"T{i}", description="x", priority="low") for i in range(3)]
+
+    with CaptureQueriesContext(connection) as ctx:
+        with transaction.atomic(), audit_batch():
+            for t in tickets:
+                claim_ticket(ticket_id=t.id, actor=agent_user)
+                change_status(ticket_id=t.id, actor=agent_user, new_status="resolved")
+            assert not TicketHistory.objects.exists()
+
+    assert _history_inserts(ctx) == 1
+    assert TicketHistory.objects.count() == 3 * 3
+
+
+@pytest.mark.django_db
+def test_failed_service_writes_no_history(ticket, agent_user):
+    from common.exceptions import ConflictError
+
+    with pytest.raises(ConflictError):
+        change_status(ticket_id=ticket.id, actor=agent_user, new_status="closed")
+    assert not TicketHistory.objects.exists()
+
+    # recorder yo'q joyda darhol yoziladi
+    record(TicketHistory(ticket=ticket, actor=agent_user, field="note", old_value="", new_value="x"))
+    assert TicketHistory.objects.filter(field="note").exists()
+    assert Ticket.objects.get(id=ticket.id).status == "open"
+
+
+@pytest.mark.django_db
+def test_caught_nested_failure_drops_its_rows(ticket, agent_user):
+    with transaction.atomic(), audit_batch():
+        claim_ticket(ticket_id=ticket.id, actor=agent_user)
+        try:
+            with transaction.atomic(), audit_batch():
+                record(TicketHistory(ticket=ticket, actor=agent_user, field="note", old_value="", new_value="x"))
+                raise ValueError("inner failed")
+        except ValueError:
+            pass
+
+    assert set(TicketHistory.objects.values_list("field", flat=True)) == {"assigned_to", "status"}
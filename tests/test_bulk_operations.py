@@ -0,0 +1,123 @@
+import uuid
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from tickets.models import Ticket, TicketHistory, NotificationOutbox
+from tickets.services import create_ticket, claim_ticket, rebuild_ticket_counters
+
+User = get_user_model()
+
+
+@pytest.fixture
+def admin_user(db):
+    return User.objects.create_user(username="admin1", password="pass1234", role="admin")
+
+
+def _tickets(client_user, n):
+    return [create_ticket(actor=client_user, title=f"T{i}", description="x", priority="low") for i in range(n)]
+
+
+@pytest.mark.django_db
+def test_bulk_claim_reports_per_ticket_results(api, client_user, agent_user, admin_user):
+    free, taken = _tickets(client_user, 2)
+    claim_ticket(ticket_id=taken.id, actor=admin_user)
+    missing = uuid.uuid4()
+
+    api.force_authenticate(user=agent_user)
+    res = api.post(
+        "/api/tickets/bulk/claim/", {"ticket_ids": [str(taken.id), str(free.id), str(missing)]}, format="json"
+    )
+    assert res.status_code == 200
+
+    data = res.json()
+    assert (data["updated"], data["failed"]) == (1, 2)
+    assert [(r["id"], r["ok"]) for r in data["results"]] == [
+        (str(taken.id), False), (str(free.id), True), (str(missing), False)
+    ]
+    assert data["results"][0]["error"]["code"] == "CONFLICT"
+    assert data["results"][1]["ticket"]["assigned_to_id"] == str(agent_user.id)
+    assert data["results"][2]["error"]["code"] == "NOT_FOUND"
+
+    free.refresh_from_db()
+    assert (free.assigned_to_id, free.status) == (agent_user.id, "in_progress")
+    assert set(TicketHistory.objects.filter(ticket=free).values_list("field", flat=True)) == {"assigned_to", "status"}
+    # counterlar Ticket jadvali bilan mos (rebuild hech narsa o'zgartirmaydi)
+    assert rebuild_ticket_counters() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_status_validates_transitions_and_notifies(api, client_user, agent_user):
+    in_progress, still_open = _tickets(client_user, 2)
+    claim_ticket(ticket_id=in_progress.id, actor=agent_user)
+    before = Ticket.objects.get(id=in_progress.id).updated_at
+
+    api.force_authenticate(user=agent_user)
+    res = api.patch(
+        "/api/tickets/bulk/status/",
+        {"ticket_ids": [str(in_progress.id), str(still_open.id)], "status": "resolved"},
+        format="json",
+    )
+    assert res.status_code == 200
+    ok, conflict = res.json()["results"]
+    assert ok["ok"] and ok["ticket"]["status"] == "resolved"
+    assert conflict["error"]["code"] == "CONFLICT"
+    assert conflict["error"]["details"]["allowed"] == ["in_progress"]
+
+    in_progress.refresh_from_db()
+    assert in_progress.resolved_at is not None
+    assert in_progress.updated_at > before
+    assert Ticket.objects.get(id=still_open.id).status == "open"
+    assert NotificationOutbox.objects.filter(to_user=client_user, event="ticket_resolved").count() == 1
+    assert rebuild_ticket_counters() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_assign_is_admin_only(api, client_user, agent_user, admin_user):
+    tickets = _tickets(client_user, 3)
+    payload = {"ticket_ids": [str(t.id) for t in tickets], "agent_id": str(agent_user.id)}
+
+    api.force_authenticate(user=agent_user)
+    assert api.post("/api/tickets/bulk/assign/", payload, format="json").status_code == 403
+
+    api.force_authenticate(user=admin_user)
+    bad = api.post("/api/tickets/bulk/assign/", {**payload, "agent_id": str(admin_user.id)}, format="json")
+    assert bad.status_code == 409
+
+    res = api.post("/api/tickets/bulk/assign/", payload, format="json")
+    assert res.status_code == 200
+    assert res.json()["updated"] == 3
+    assert Ticket.objects.filter(assigned_to=agent_user, status="in_progress").count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_endpoints_validate_input(api, client_user, agent_user):
+    api.force_authenticate(user=client_user)
+    assert api.post("/api/tickets/bulk/claim/", {"ticket_ids": [str(uuid.uuid4())]}, format="json").status_code == 403
+
+    api.force_authenticate(user=agent_user)
+    res = api.post("/api/tickets/bulk/claim/", {"ticket_ids": []}, format="json")
+    assert res.status_code == 400
+    assert "ticket_ids" in res.json()["error"]["details"]
+
+
+def _bulk_status_queries(api, ids):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = api.patch("/api/tickets/bulk/status/", {"ticket_ids": ids, "status": "in_progress"}, format="json")
+    assert res.status_code == 200
+    assert res.json()["failed"] == 0
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_bulk_status_query_count_is_constant(api, client_user, agent_user):
+    api.force_authenticate(user=agent_user)
+    # warm-up: in_progress counter qatori yaratiladi
+    _bulk_status_queries(api, [str(t.id) for t in _tickets(client_user, 1)])
+
+    few = _bulk_status_queries(api, [str(t.id) for t in _tickets(client_user, 3)])
+    many = _bulk_status_queries(api, [str(t.id) for t in _tickets(client_user, 40)])
+    assert few == many
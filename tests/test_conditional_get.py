@@ -0,0 +1,124 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tickets.models import Ticket, NotificationOutbox
+from tickets.services import add_message, acknowledge_notification
+
+
+def _get(api, url, **headers):
+    with CaptureQueriesContext(connection) as ctx:
+        res = api.get(url, **headers)
+    return res, len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_ticket_list_304_until_a_ticket_changes(api, client_user):
+    ticket = Ticket.objects.create(created_by=client_user, title="A", description="x")
+    api.force_authenticate(user=client_user)
+
+    first, _ = _get(api, "/api/tickets/")
+    assert first.status_code == 200
+    assert first["ETag"]
+
+    res, _ = _get(api, "/api/tickets/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert res.status_code == 304
+
+    # boshqa sahifa — boshqa ETag
+    assert _get(api, "/api/tickets/?page_size=5")[0]["ETag"] != first["ETag"]
+
+    ticket.title = "B"
+    ticket.save()
+    res, _ = _get(api, "/api/tickets/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert res.status_code == 200
+    assert res.json()["results"][0]["title"] == "B"
+
+
+@pytest.mark.django_db
+def test_ticket_detail_etag_changes_on_new_message(api, client_user):
+    ticket = Ticket.objects.create(created_by=client_user, title="A", description="x")
+    api.force_authenticate(user=client_user)
+    url = f"/api/tickets/{ticket.id}/"
+
+    etag = _get(api, url)[0]["ETag"]
+    assert _get(api, url, HTTP_IF_NONE_MATCH=etag)[0].status_code == 304
+
+    add_message(ticket_id=ticket.id, actor=client_user, body="hi")
+    res, _ = _get(api, url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_notification_list_304_until_ack(api, agent_user):
+    n = NotificationOutbox.objects.create(to_user=agent_user, event="x", payload={})
+    api.force_authenticate(user=agent_user)
+
+    etag = _get(api, "/api/notifications/")[0]["ETag"]
+    res, _ = _get(api, "/api/notifications/", HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 304
+
+    acknowledge_notification(notification=n, actor=agent_user)
+    assert _get(api, "/api/notifications/", HTTP_IF_NONE_MATCH=etag)[0].status_code == 200
+
+
+@pytest.mark.django_db
+def test_list_304_is_answered_before_the_page_query(api, client_user):
+    Ticket.objects.create(created_by=client_user, title="A", description="x")
+    api.force_authenticate(user=client_user)
+
+    for url in ("/api/tickets/?cursor=", "/api/tickets/"):
+        # 200: aggregate + sahifa (page mode da count aggregate dan — alohida COUNT yo'q)
+        first, queries = _get(api, url)
+        assert first.status_code == 200
+        assert queries == 2
+        # 304: faqat aggregate
+        res, queries = _get(api, url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert res.status_code == 304
+        assert queries == 1
+    assert first.json()["count"] == 1
+
+
+@pytest.mark.django_db
+def test_notification_list_etag_changes_on_failed_attempt(api, agent_user):
+    from django.db.models import F
+
+    n = NotificationOutbox.objects.create(to_user=agent_user, event="x", payload={})
+    api.force_authenticate(user=agent_user)
+
+    etag = _get(api, "/api/notifications/")[0]["ETag"]
+    NotificationOutbox.objects.filter(id=n.id).update(status="failed", attempts=F("attempts") + 1)
+    res, _ = _get(api, "/api/notifications/", HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res.json()["results"][0]["attempts"] == 1
+
+
+@pytest.mark.django_db
+def test_ticket_search_etag_changes_when_rank_source_changes(api, client_user):
+    from tickets.search import index_ticket
+
+    ticket = Ticket.objects.create(created_by=client_user, title="A", description="x")
+    index_ticket(ticket)
+    api.force_authenticate(user=client_user)
+
+    etag = _get(api, "/api/tickets/?q=printer")[0]["ETag"]
+    assert _get(api, "/api/tickets/?q=printer", HTTP_IF_NONE_MATCH=etag)[0].status_code == 304
+
+    # message ticket.updated_at ga tegmaydi, lekin qidiruv natijasini o'zgartiradi
+    add_message(ticket_id=ticket.id, actor=client_user, body="printer broken")
+    res, _ = _get(api, "/api/tickets/?q=printer", HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert [r["id"] for r in res.json()["results"]] == [str(ticket.id)]
+
+
+@pytest.mark.django_db
+def test_ticket_list_etag_changes_when_page_row_is_deleted(api, client_user):
+    keep = Ticket.objects.create(created_by=client_user, title="Keep", description="x")
+    gone = Ticket.objects.create(created_by=client_user, title="Gone", description="x")
+    api.force_authenticate(user=client_user)
+
+    etag = _get(api, "/api/tickets/?count=0")[0]["ETag"]
+    gone.delete()
+    res, _ = _get(api, "/api/tickets/?count=0", HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert [r["id"] for r in res.json()["results"]] == [str(keep.id)]
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from tickets import delivery
+from tickets.delivery import AsyncDeliveryBackend, BaseDeliveryBackend, FileSinkBackend, TIMEOUT_ERROR
+from tickets.models import NotificationOutbox, NotificationStatus
+from tickets.services import process_outbox_batch
+
+
+class SlowAsyncBackend(AsyncDeliveryBackend):
+    in_flight = 0
+    peak = 0
+
+    async def asend(self, notification):
+        cls = type(self)
+        cls.in_flight += 1
+        cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            await asyncio.sleep(notification.payload.get("delay", 0.01))
+        finally:
+            cls.in_flight -= 1
+
+
+class CountingThreadBackend(BaseDeliveryBackend):
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def send(self, notification):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        time.sleep(0.01)
+        with cls.lock:
+            cls.in_flight -= 1
+
+
+def _rows(user, n, **payload):
+    return NotificationOutbox.objects.bulk_create(
+        [NotificationOutbox(to_user=user, event="x", payload=dict(payload)) for _ in range(n)]
+    )
+
+
+@pytest.mark.django_db
+def test_async_backend_respects_concurrency_and_timeout(agent_user):
+    rows = _rows(agent_user, 6) + _rows(agent_user, 1, delay=1)
+
+    results = SlowAsyncBackend(max_concurrency=3, timeout=0.2).send_many(rows)
+
+    assert SlowAsyncBackend.peak == 3
+    assert [results[n.id] for n in rows] == [None] * 6 + [TIMEOUT_ERROR]
+
+
+@pytest.mark.django_db
+def test_thread_backend_respects_concurrency(agent_user):
+    rows = _rows(agent_user, 8)
+
+    results = CountingThreadBackend(max_concurrency=2, timeout=5).send_many(rows)
+
+    assert CountingThreadBackend.peak == 2
+    assert set(results.values()) == {None}
+
+
+@pytest.mark.django_db
+def test_in_memory_backend_via_worker(agent_user, settings):
+    settings.NOTIFICATION_DELIVERY = {
+        "BACKEND": "tickets.delivery.InMemoryBackend",
+        "OPTIONS": {"max_concurrency": 4, "fail_events": ["broken"]},
+    }
+    delivery.sent_messages.clear()
+    _rows(agent_user, 3)
+    NotificationOutbox.objects.create(to_user=agent_user, event="broken", payload={})
+
+    assert process_outbox_batch(limit=10) == (4, 3)
+    assert len(delivery.sent_messages) == 3
+    assert NotificationOutbox.objects.get(event="broken").status == NotificationStatus.FAILED
+
+
+@pytest.mark.django_db
+def test_file_sink_backend_writes_ndjson(agent_user, tmp_path):
+    path = tmp_path / "outbox.ndjson"
+    rows = _rows(agent_user, 2, ticket_id="t-1")
+
+    FileSinkBackend(path=str(path), max_concurrency=2).send_many(rows)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert {line["id"] for line in lines} == {str(n.id) for n in rows}
+    assert lines[0]["payload"] == {"ticket_id": "t-1"}
+
+
+class SleepyBackend(BaseDeliveryBackend):
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send(self, notification):
+        time.sleep(0.2)
+        with self.lock:
+            self.sent.append(notification.id)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("max_concurrency", [1, 2])
+def test_deadline_skips_unstarted_sends_only(agent_user, max_concurrency):
+    # 3 to'lqin x 0.2s, deadline = 0.1 * 3 = 0.3s -> 3-to'lqin (0.4s da) boshlanmaydi
+    rows = _rows(agent_user, 3 * max_concurrency)
+    backend = SleepyBackend(max_concurrency=max_concurrency, timeout=0.1)
+
+    results = backend.send_many(rows)
+
+    timed_out = [n.id for n in rows if results[n.id] == TIMEOUT_ERROR]
+    assert timed_out
+    # yuborilganlar — aynan "sent" natijalilar (timeout bo'lib ham yuborilgan duplicate yo'q)
+    assert sorted(backend.sent, key=str) == sorted((n.id for n in rows if results[n.id] is None), key=str)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_send_runs_outside_transaction_on_claimed_rows(agent_user, monkeypatch):
+    from django.db import connection
+    from django.utils import timezone
+
+    seen = {}
+
+    class ProbeBackend(BaseDeliveryBackend):
+        def send_many(self, notifications, *, deadline=None):
+            seen["in_atomic_block"] = connection.in_atomic_block
+            # claim commit bo'lgan: boshqa worker uchun qatorlar hali "due" emas
+            seen["due"] = NotificationOutbox.objects.filter(next_attempt_at__lte=timezone.now()).count()
+            return {n.id: None for n in notifications}
+
+    monkeypatch.setattr("tickets.services.get_delivery_backend", ProbeBackend)
+    _rows(agent_user, 3)
+
+    assert process_outbox_batch(limit=10) == (3, 3)
+    assert seen == {"in_atomic_block": False, "due": 0}
+    assert NotificationOutbox.objects.filter(status=NotificationStatus.SENT).count() == 3
+
+
+@pytest.mark.django_db
+def test_sends_stop_before_the_claim_lease_runs_out(make_users, monkeypatch):
+    from datetime import timedelta
+
+    # lease 0.5s, margin 0.1s -> 0.4s dan keyin yangi send boshlanmaydi (0.2s lik send lar)
+    monkeypatch.setattr("tickets.services.OUTBOX_CLAIM_TIMEOUT", timedelta(seconds=0.5))
+    monkeypatch.setattr("tickets.services.OUTBOX_CLAIM_MARGIN", timedelta(seconds=0.1))
+    backend = SleepyBackend(max_concurrency=1)
+    monkeypatch.setattr("tickets.services.get_delivery_backend", lambda: backend)
+    for user in make_users(4):
+        _rows(user, 1)
+
+    assert process_outbox_batch(limit=10) == (4, len(backend.sent))
+    assert 0 < len(backend.sent) < 4
+
+    skipped = NotificationOutbox.objects.exclude(id__in=backend.sent)
+    assert {(n.status, n.last_error) for n in skipped} == {(NotificationStatus.FAILED, TIMEOUT_ERROR)}
+    assert NotificationOutbox.objects.filter(id__in=backend.sent, status=NotificationStatus.SENT).count() == len(backend.sent)
+
+
+@pytest.mark.django_db
+def test_results_are_not_recorded_once_the_lease_is_lost(make_users, monkeypatch):
+    from django.utils import timezone
+
+    stolen, kept = [_rows(user, 1)[0] for user in make_users(2)]
+
+    class SlowBackend(BaseDeliveryBackend):
+        def send_many(self, notifications, *, deadline=None):
+            # provider lease dan uzoq ishladi: boshqa worker "stolen" ni qayta claim qilib yubordi
+            NotificationOutbox.objects.filter(id=stolen.id).update(
+                status=NotificationStatus.SENT, next_attempt_at=timezone.now(), last_error="other worker",
+            )
+            return {n.id: "provider down" for n in notifications}
+
+    monkeypatch.setattr("tickets.services.get_delivery_backend", SlowBackend)
+
+    assert process_outbox_batch(limit=10) == (2, 0)
+
+    stolen.refresh_from_db()
+    kept.refresh_from_db()
+    assert (stolen.status, stolen.attempts, stolen.last_error) == (NotificationStatus.SENT, 0, "other worker")
+    assert (kept.status, kept.attempts) == (NotificationStatus.FAILED, 1)
@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tickets.models import Ticket
+from tickets.services import add_message, claim_ticket
+
+
+def _get(api, ticket, **headers):
+    with CaptureQueriesContext(connection) as ctx:
+        res = api.get(f"/api/tickets/{ticket.id}/", **headers)
+    return res, len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_detail_is_served_from_cache_until_service_write(
+    api, client_user, agent_user, django_capture_on_commit_callbacks
+):
+    ticket = Ticket.objects.create(created_by=client_user, title="Cached", description="x")
+    api.force_authenticate(user=client_user)
+
+    first, queries = _get(api, ticket)
+    assert first.status_code == 200
+    assert queries > 0
+
+    # keshdan: faqat fingerprint query (permission + ETag)
+    second, queries = _get(api, ticket)
+    assert second.json() == first.json()
+    assert queries == 1
+    assert second["ETag"] == first["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        add_message(ticket_id=ticket.id, actor=client_user, body="ping")
+    third, _ = _get(api, ticket)
+    assert [m["body"] for m in third.json()["messages"]] == ["ping"]
+    assert third["ETag"] != first["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        claim_ticket(ticket_id=ticket.id, actor=agent_user)
+    assert _get(api, ticket)[0].json()["status"] == "in_progress"
+
+
+@pytest.mark.django_db
+def test_cached_detail_still_checks_permission(api, client_user, agent_user):
+    from django.contrib.auth import get_user_model
+
+    other = get_user_model().objects.create_user(username="client2", password="pass1234", role="client")
+    ticket = Ticket.objects.create(created_by=client_user, title="Private", description="x")
+
+    api.force_authenticate(user=agent_user)
+    assert _get(api, ticket)[0].status_code == 200  # keshga tushdi
+
+    api.force_authenticate(user=other)
+    res, queries = _get(api, ticket)
+    assert res.status_code == 403
+    assert queries == 1
+
+
+@pytest.mark.django_db
+def test_detail_if_none_match_returns_304(api, client_user):
+    ticket = Ticket.objects.create(created_by=client_user, title="Etag", description="x")
+    api.force_authenticate(user=client_user)
+
+    etag = _get(api, ticket)[0]["ETag"]
+    res, queries = _get(api, ticket, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 304
+    assert queries == 1
+    assert res["ETag"] == etag
+    assert not res.content
+
+
+@pytest.mark.django_db
+def test_unknown_ticket_returns_404(api, client_user):
+    import uuid
+
+    api.force_authenticate(user=client_user)
+    res = api.get(f"/api/tickets/{uuid.uuid4()}/")
+    assert res.status_code == 404
+    assert res.json()["error"]["code"] == "NOT_FOUND"
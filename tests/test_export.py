@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from tickets.services import create_ticket, change_status, claim_ticket
+
+User = get_user_model()
+
+
+def _body(res):
+    assert res.status_code == 200
+    assert res.streaming
+    return b"".join(res.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_csv_streams_all_rows_in_chunks(api, client_user, agent_user, settings):
+    settings.TICKET_EXPORT_CHUNK_SIZE = 2
+    tickets = [create_ticket(actor=client_user, title=f"T{i}", description="x", priority="low") for i in range(5)]
+
+    api.force_authenticate(user=agent_user)
+    res = api.get("/api/tickets/export/?fmt=csv")
+    assert res["Content-Type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(_body(res))))
+    assert [r["id"] for r in rows] == [str(t.id) for t in tickets]
+    assert rows[0]["title"] == "T0"
+    assert rows[0]["assigned_to_id"] == ""
+
+
+@pytest.mark.django_db
+def test_export_ndjson_with_history_applies_filters_and_rbac(api, client_user, agent_user, settings):
+    settings.TICKET_EXPORT_CHUNK_SIZE = 1
+    other = User.objects.create_user(username="client2", password="pass1234", role="client")
+    mine = create_ticket(actor=client_user, title="Mine", description="x", priority="high")
+    claim_ticket(ticket_id=mine.id, actor=agent_user)
+    change_status(ticket_id=mine.id, actor=agent_user, new_status="resolved")
+    create_ticket(actor=client_user, title="Low", description="x", priority="low")
+    create_ticket(actor=other, title="Theirs", description="x", priority="high")
+
+    api.force_authenticate(user=client_user)
+    res = api.get("/api/tickets/export/?fmt=ndjson&history=1&priority=high")
+    assert res["Content-Type"] == "application/x-ndjson"
+
+    lines = [json.loads(line) for line in _body(res).splitlines()]
+    assert [item["id"] for item in lines] == [str(mine.id)]
+    assert lines[0]["status"] == "resolved"
+    assert [h["field"] for h in lines[0]["history"]] == ["assigned_to", "status", "status"]
+
+
+@pytest.mark.django_db
+def test_export_rejects_unknown_format(api, agent_user):
+    api.force_authenticate(user=agent_user)
+    res = api.get("/api/tickets/export/?fmt=xml")
+    assert res.status_code == 400
+    assert res.json()["error"]["code"] == "VALIDATION_ERROR"
+
+
+@pytest.mark.django_db
+def test_export_reads_in_bounded_queries(api, client_user, agent_user, django_assert_max_num_queries, settings):
+    settings.TICKET_EXPORT_CHUNK_SIZE = 10
+    for i in range(25):
+        create_ticket(actor=client_user, title=f"T{i}", description="x", priority="low")
+
+    api.force_authenticate(user=agent_user)
+    res = api.get("/api/tickets/export/?fmt=ndjson&history=1")
+    # auth + tickets (bitta cursor) + har bo'lak uchun 1 ta history query
+    with django_assert_max_num_queries(5):
+        assert len(_body(res).splitlines()) == 25
+
+
+@pytest.mark.django_db
+def test_export_tickets_command_writes_file(tmp_path, client_user):
+    from django.core.management import call_command
+
+    create_ticket(actor=client_user, title="Open", description="x", priority="low")
+    done = create_ticket(actor=client_user, title="Done", description="x", priority="low")
+    done.status = "closed"
+    done.save(update_fields=["status"])
+
+    path = tmp_path / "tickets.ndjson"
+    call_command("export_tickets", "--fmt", "ndjson", "--status", "closed", "--output", str(path), stderr=io.StringIO())
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["title"] for line in lines] == ["Done"]
+
+
+@pytest.mark.django_db
+def test_export_csv_neutralizes_formula_cells(api, client_user, agent_user):
+    titles = ["=HYPERLINK(\"http://x\")", "+1", "-1", "@SUM(A1)", "\tTab", "\rCR", "Plain"]
+    for title in titles:
+        create_ticket(actor=client_user, title=title, description="x", priority="low")
+
+    api.force_authenticate(user=agent_user)
+    rows = list(csv.DictReader(io.StringIO(_body(api.get("/api/tickets/export/?fmt=csv")), newline="")))
+
+    assert [r["title"] for r in rows] == ["'" + t for t in titles[:-1]] + ["Plain"]
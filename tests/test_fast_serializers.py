@@ -0,0 +1,61 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tickets.models import Ticket, NotificationOutbox
+from tickets.serializers import (
+    TicketListItemSerializer,
+    NotificationListSerializer,
+    TICKET_LIST_FIELDS,
+    NOTIFICATION_LIST_FIELDS,
+    fast_rows,
+)
+
+
+@pytest.mark.django_db
+def test_fast_rows_render_identical_json(client_user, agent_user):
+    Ticket.objects.create(created_by=client_user, title="Plain", description="x")
+    Ticket.objects.create(
+        created_by=client_user,
+        assigned_to=agent_user,
+        title="Ünïcode ✓",
+        description="x",
+        status="resolved",
+        resolved_at=timezone.now(),
+        due_at=timezone.now() + timedelta(hours=2),
+    )
+    NotificationOutbox.objects.create(to_user=agent_user, event="x", payload={"a": [1, "b"], "n": None})
+
+    cases = [
+        (Ticket.objects.order_by("created_at"), TicketListItemSerializer, TICKET_LIST_FIELDS),
+        (NotificationOutbox.objects.order_by("created_at"), NotificationListSerializer, NOTIFICATION_LIST_FIELDS),
+    ]
+    for qs, serializer_cls, fields in cases:
+        drf = JSONRenderer().render(serializer_cls(qs, many=True).data)
+        fast = JSONRenderer().render(fast_rows(qs.values(*fields), fields))
+        assert fast == drf
+
+
+@pytest.mark.django_db
+def test_ticket_list_reads_without_joins(api, client_user, agent_user):
+    Ticket.objects.create(created_by=client_user, assigned_to=agent_user, title="A", description="x")
+    api.force_authenticate(user=agent_user)
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = api.get("/api/tickets/?cursor=")
+    assert res.status_code == 200
+    assert res.json()["results"][0]["assigned_to_id"] == str(agent_user.id)
+    assert not any("JOIN" in q["sql"] for q in ctx.captured_queries)
+
+
+def test_bench_command_checks_output_parity():
+    out = StringIO()
+    call_command("bench_list_serializers", "--page-size", "5", "--repeat", "1", stdout=out)
+    assert "tickets" in out.getvalue()
+    assert "notifications" in out.getvalue()
@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+
+from tickets.models import Ticket, NotificationOutbox, NotificationStatus
+from tickets.selectors import tickets_qs, apply_ticket_filters, agent_queue_qs
+
+
+def _explain(qs) -> str:
+    # Kichik jadvalda planner seq scan tanlaydi — index ishlatilishini majburan tekshiramiz
+    with connection.cursor() as cur:
+        cur.execute("SET LOCAL enable_seqscan = off")
+    return qs.explain()
+
+
+@pytest.fixture
+def pg_only(db):
+    if connection.vendor != "postgresql":
+        pytest.skip("EXPLAIN plan checks run on PostgreSQL only")
+
+
+@pytest.mark.django_db
+def test_status_filter_uses_status_index(pg_only):
+    qs = apply_ticket_filters(tickets_qs(), {"status": "in_progress"}).order_by("-created_at")
+    assert "ticket_status_created_idx" in _explain(qs)
+
+
+@pytest.mark.django_db
+def test_agent_queue_uses_open_due_partial_index(pg_only):
+    qs = Ticket.objects.filter(status="open").order_by("due_at", "created_at")
+    assert "ticket_open_due_idx" in _explain(qs)
+
+
+@pytest.mark.django_db
+def test_agent_queue_is_sort_free_index_scan(pg_only):
+    plan = _explain(agent_queue_qs(Ticket.objects.filter(status="open"))[:10])
+    assert "ticket_open_queue_idx" in plan
+    assert "Sort" not in plan
+
+
+@pytest.mark.django_db
+def test_due_outbox_scan_uses_partial_index(pg_only):
+    from django.utils import timezone
+
+    qs = NotificationOutbox.objects.filter(
+        status__in=[NotificationStatus.PENDING, NotificationStatus.FAILED],
+        next_attempt_at__lte=timezone.now(),
+    ).order_by("next_attempt_at")
+    assert "outbox_due_idx" in _explain(qs)
@@ -4,6 +4,7 @@ from tickets.models import Ticket, NotificationOutbox, NotificationStatus
 
 User = get_user_model()
 
+
 @pytest.mark.django_db
 def test_ticket_create_enqueues_notification_for_agents(api, client_user, agent_user):
     api.force_authenticate(user=client_user)
@@ -22,6 +23,7 @@ def test_ticket_create_enqueues_notification_for_agents(api, client_user, agent_
         status=NotificationStatus.PENDING,
     ).exists()
 
+
 @pytest.mark.django_db
 def test_process_outbox_marks_sent(db, client_user, agent_user):
     # outboxga qo‘lbola yozamiz
@@ -33,9 +35,197 @@ def test_process_outbox_marks_sent(db, client_user, agent_user):
     assert n.status == NotificationStatus.PENDING
 
     from tickets.services import process_outbox_batch
-    processed = process_outbox_batch(limit=10)
-    assert processed == 1
+    assert process_outbox_batch(limit=10) == (1, 1)
 
     n.refresh_from_db()
     assert n.status == NotificationStatus.SENT
-    assert n.sent_at is not None
\ No newline at end of file
+    assert n.sent_at is not None
+
+
+def _create_ticket_queries(client_user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from tickets.services import create_ticket
+
+    with CaptureQueriesContext(connection) as ctx:
+        create_ticket(actor=client_user, title="Fan-out", description="x", priority="low")
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_create_ticket_fanout_query_count_is_constant(client_user):
+    _create_ticket_queries(client_user)  # warm-up: TicketCounter qatori birinchi ticketda yaratiladi
+
+    User.objects.bulk_create([User(username=f"few{i}", role="agent") for i in range(3)])
+    few = _create_ticket_queries(client_user)
+
+    User.objects.bulk_create([User(username=f"many{i}", role="agent") for i in range(60)])
+    many = _create_ticket_queries(client_user)
+
+    assert few == many
+    assert NotificationOutbox.objects.filter(event="ticket_created").count() == 3 + 63
+
+
+@pytest.mark.django_db
+def test_enqueue_notifications_bulk_chunks(client_user, agent_user):
+    from tickets.services import enqueue_notifications_bulk
+
+    created = enqueue_notifications_bulk(
+        recipients=[client_user.id, agent_user.id, agent_user.id],
+        event="broadcast",
+        payload={"x": 1},
+        batch_size=2,
+    )
+
+    assert created == 3
+    assert NotificationOutbox.objects.filter(event="broadcast", to_user=agent_user).count() == 2
+
+
+@pytest.mark.django_db
+def test_deferred_fanout_writes_single_job(api, client_user, agent_user, settings):
+    from tickets.models import NotificationFanout, FanoutStatus
+    from tickets.services import expand_fanout_jobs
+
+    settings.NOTIFICATION_FANOUT_MODE = "deferred"
+    api.force_authenticate(user=client_user)
+    res = api.post("/api/tickets/create/", {"title": "Later", "description": "x"}, format="json")
+    assert res.status_code == 201
+
+    assert not NotificationOutbox.objects.filter(event="ticket_created").exists()
+    job = NotificationFanout.objects.get()
+    assert job.status == FanoutStatus.PENDING
+
+    assert expand_fanout_jobs() == 1
+    job.refresh_from_db()
+    assert job.status == FanoutStatus.DONE
+    assert NotificationOutbox.objects.filter(to_user=agent_user, event="ticket_created").exists()
+
+    # qayta ishga tushsa — hech narsa takrorlanmaydi
+    assert expand_fanout_jobs() == 0
+
+
+@pytest.mark.django_db
+def test_poison_fanout_job_fails_alone(agent_user):
+    from tickets.models import NotificationFanout, FanoutStatus
+    from tickets.services import expand_fanout_jobs
+
+    poison = NotificationFanout.objects.create(audience="nobody", event="x", payload={})
+    good = NotificationFanout.objects.create(audience="agents", event="y", payload={})
+
+    assert expand_fanout_jobs() == 1
+
+    poison.refresh_from_db()
+    good.refresh_from_db()
+    assert poison.status == FanoutStatus.FAILED
+    assert "Unknown fan-out audience" in poison.last_error
+    assert good.status == FanoutStatus.DONE
+    assert list(NotificationOutbox.objects.values_list("event", flat=True)) == ["y"]
+    # FAILED job qayta olinmaydi
+    assert expand_fanout_jobs() == 0
+
+
+@pytest.mark.django_db
+def test_on_commit_fanout_expands_after_commit(client_user, agent_user, settings, django_capture_on_commit_callbacks):
+    from tickets.services import create_ticket
+
+    settings.NOTIFICATION_FANOUT_MODE = "on_commit"
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        create_ticket(actor=client_user, title="Soon", description="x", priority="low")
+
+    assert not NotificationOutbox.objects.filter(event="ticket_created").exists()
+
+    for callback in callbacks:
+        callback()
+    assert NotificationOutbox.objects.filter(to_user=agent_user, event="ticket_created").exists()
+
+
+def _batch_queries(users):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from tickets.services import process_outbox_batch
+
+    n = len(users)
+    NotificationOutbox.objects.bulk_create(
+        [NotificationOutbox(to_user=user, event="x", payload={"i": i}) for i, user in enumerate(users)]
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        process_outbox_batch(limit=n)
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_process_outbox_batch_query_count_is_constant(make_users, flaky_delivery):
+    small = _batch_queries(make_users(4))
+    large = _batch_queries(make_users(60))
+
+    assert small == large
+    assert NotificationOutbox.objects.filter(status=NotificationStatus.SENT).count() == 2 + 30
+    failed = NotificationOutbox.objects.filter(status=NotificationStatus.FAILED)
+    assert failed.count() == 2 + 30
+    assert set(failed.values_list("attempts", "last_error")) == {(1, "provider down")}
+
+
+@pytest.mark.django_db
+def test_failed_notification_is_retried_with_backoff_then_dead_lettered(agent_user, settings):
+    from datetime import timedelta
+    from django.utils import timezone
+    from tickets.constants import OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_BASE_DELAY
+    from tickets.services import process_outbox_batch
+
+    settings.NOTIFICATION_DELIVERY = {
+        "BACKEND": "tickets.delivery.InMemoryBackend",
+        "OPTIONS": {"fail_events": ["broken"]},
+    }
+    n = NotificationOutbox.objects.create(to_user=agent_user, event="broken", payload={})
+
+    before = timezone.now()
+    process_outbox_batch(limit=10)
+    n.refresh_from_db()
+    assert n.status == NotificationStatus.FAILED
+    assert n.attempts == 1
+    assert before + OUTBOX_RETRY_BASE_DELAY / 2 <= n.next_attempt_at <= timezone.now() + OUTBOX_RETRY_BASE_DELAY
+
+    # hali vaqti kelmagan — worker tegmaydi
+    process_outbox_batch(limit=10)
+    n.refresh_from_db()
+    assert n.attempts == 1
+
+    for _ in range(OUTBOX_MAX_ATTEMPTS - 1):
+        NotificationOutbox.objects.filter(id=n.id).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        process_outbox_batch(limit=10)
+
+    n.refresh_from_db()
+    assert n.status == NotificationStatus.DEAD
+    assert n.attempts == OUTBOX_MAX_ATTEMPTS
+
+
+@pytest.mark.django_db
+def test_failed_notification_holds_back_the_users_later_ones(agent_user, client_user, settings):
+    from datetime import timedelta
+    from django.utils import timezone
+    from tickets import delivery
+    from tickets.services import process_outbox_batch
+
+    settings.NOTIFICATION_DELIVERY = {
+        "BACKEND": "tickets.delivery.InMemoryBackend",
+        "OPTIONS": {"max_concurrency": 4, "fail_events": ["first"]},
+    }
+    delivery.sent_messages.clear()
+    first, second, third = [
+        NotificationOutbox.objects.create(to_user=agent_user, event=event, payload={}) for event in ("first", "x", "y")
+    ]
+    other = NotificationOutbox.objects.create(to_user=client_user, event="z", payload={})
+
+    # first yiqildi -> second/third yuborilmaydi (attempted emas), boshqa user esa yuboriladi
+    assert process_outbox_batch(limit=10) == (2, 1)
+    assert [m["id"] for m in delivery.sent_messages] == [str(other.id)]
+    second.refresh_from_db()
+    assert (second.status, second.attempts) == (NotificationStatus.PENDING, 0)
+
+    # first retry backoff da — uning orqasidagilar ham kutadi
+    assert process_outbox_batch(limit=10) == (0, 0)
+
+    settings.NOTIFICATION_DELIVERY = {"BACKEND": "tickets.delivery.InMemoryBackend", "OPTIONS": {"max_concurrency": 4}}
+    NotificationOutbox.objects.filter(id=first.id).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+    assert process_outbox_batch(limit=10) == (3, 3)
+    assert [m["id"] for m in delivery.sent_messages[1:]] == [str(first.id), str(second.id), str(third.id)]
@@ -0,0 +1,46 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+
+from tickets.models import NotificationOutbox, NotificationOutboxArchive, NotificationStatus
+
+
+def _aged(user, days, **fields):
+    n = NotificationOutbox.objects.create(to_user=user, event="x", payload={"k": 1}, **fields)
+    NotificationOutbox.objects.filter(id=n.id).update(created_at=timezone.now() - timedelta(days=days))
+    return n
+
+
+@pytest.mark.django_db
+def test_archive_moves_only_old_sent_rows_in_batches(agent_user):
+    now = timezone.now()
+    read_old = [_aged(agent_user, 40, status=NotificationStatus.SENT, read_at=now) for _ in range(3)]
+    unread_old = _aged(agent_user, 40, status=NotificationStatus.SENT)
+    stale_dead = _aged(agent_user, 120, status=NotificationStatus.DEAD)
+    pending_old = _aged(agent_user, 200)
+    read_new = _aged(agent_user, 1, status=NotificationStatus.SENT, read_at=now)
+
+    out = StringIO()
+    call_command("archive_outbox", "--batch-size", "2", stdout=out)
+
+    assert "Archived: 4 notifications in 2 batches" in out.getvalue()
+    archived = set(NotificationOutboxArchive.objects.values_list("id", flat=True))
+    assert archived == {n.id for n in read_old} | {stale_dead.id}
+    assert set(NotificationOutbox.objects.values_list("id", flat=True)) == {unread_old.id, pending_old.id, read_new.id}
+
+    row = NotificationOutboxArchive.objects.get(id=stale_dead.id)
+    assert row.payload == {"k": 1}
+    assert row.status == NotificationStatus.DEAD
+
+
+@pytest.mark.django_db
+def test_delete_mode_and_max_batches(agent_user):
+    for _ in range(5):
+        _aged(agent_user, 100, status=NotificationStatus.SENT)
+
+    call_command("archive_outbox", "--delete", "--batch-size", "2", "--max-batches", "2", stdout=StringIO())
+
+    assert NotificationOutbox.objects.count() == 1
+    assert not NotificationOutboxArchive.objects.exists()
@@ -0,0 +1,163 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+
+from tickets.models import NotificationOutbox, NotificationStatus
+from tickets.outbox_worker import OutboxWorker
+
+
+def _backlog(user, n):
+    NotificationOutbox.objects.bulk_create(
+        [NotificationOutbox(to_user=user, event="bench", payload={"i": i}) for i in range(n)]
+    )
+
+
+@pytest.mark.django_db
+def test_worker_drains_backlog_and_grows_batch(agent_user):
+    _backlog(agent_user, 70)
+
+    worker = OutboxWorker(batch_size=10, min_batch_size=10, max_batch_size=40, drain=True)
+    stats = worker.run()
+
+    assert stats.processed == 70
+    # 10 + 20 + 40 = 70 -> 3 to'la batch + 1 bo'sh (drain tugashi)
+    assert stats.batches == 4
+    assert not NotificationOutbox.objects.filter(status=NotificationStatus.PENDING).exists()
+
+
+@pytest.mark.django_db
+def test_all_failed_batch_counts_as_work(make_users, settings):
+    settings.NOTIFICATION_DELIVERY = {
+        "BACKEND": "tickets.delivery.InMemoryBackend",
+        "OPTIONS": {"fail_events": ["bench"]},
+    }
+    # har user da bitta qator — yiqilgan qator boshqa userlarni ushlab turmaydi
+    NotificationOutbox.objects.bulk_create([NotificationOutbox(to_user=u, event="bench") for u in make_users(40)])
+
+    worker = OutboxWorker(batch_size=20, min_batch_size=10, max_batch_size=40, drain=True)
+    assert worker.run_once() == 20
+    # hammasi yiqildi, lekin batch to'la edi -> kattalashadi, idle backoff yo'q
+    assert worker.batch_size == 40
+    assert worker.stats.sent == 0
+
+    stats = worker.run()
+    assert stats.processed == 40
+    assert not NotificationOutbox.objects.filter(status=NotificationStatus.PENDING).exists()
+
+
+@pytest.mark.django_db
+def test_worker_stop_exits_before_next_batch(agent_user):
+    _backlog(agent_user, 5)
+
+    worker = OutboxWorker(batch_size=10)
+    worker.stop()
+    stats = worker.run()
+
+    assert stats.batches == 0
+    assert NotificationOutbox.objects.filter(status=NotificationStatus.PENDING).count() == 5
+
+
+@pytest.mark.django_db
+def test_drain_command_reports_throughput(agent_user):
+    _backlog(agent_user, 25)
+
+    out = StringIO()
+    call_command("process_outbox", "--drain", "--limit", "10", stdout=out)
+
+    assert "Processed: 25 notifications" in out.getvalue()
+    assert "rows/s" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_sharded_batches_are_disjoint(client_user, agent_user):
+    from tickets.services import enqueue_notifications_bulk, process_outbox_batch, outbox_shard_key
+
+    enqueue_notifications_bulk(recipients=[client_user.id, agent_user.id] * 3, event="x", payload={})
+
+    slots = {outbox_shard_key(client_user.id) % 2, outbox_shard_key(agent_user.id) % 2}
+    processed = [process_outbox_batch(limit=100, shard=(i, 2))[0] for i in range(2)]
+
+    assert sum(processed) == 6
+    # bitta userning hamma qatorlari bitta shard da
+    assert sorted(p for p in processed if p) == ([6] if len(slots) == 1 else [3, 3])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_supervisor_thread_mode_reports_combined_throughput(agent_user):
+    from tickets.outbox_worker import run_supervised
+
+    _backlog(agent_user, 30)
+    stats = run_supervised(workers=1, mode="thread", shard_by_user=True, batch_size=10, drain=True)
+
+    assert stats.processed == 30
+    assert stats.rate > 0
+
+
+@pytest.mark.django_db
+def test_sqlite_falls_back_to_polling_even_with_channel(agent_user, settings):
+    import threading
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from tickets.outbox_worker import PollingWaiter, make_waiter
+    from tickets.services import enqueue_notification
+
+    settings.OUTBOX_NOTIFY_CHANNEL = "outbox_wakeup"
+    if connection.vendor == "postgresql":
+        pytest.skip("SQLite fallback only")
+
+    assert isinstance(make_waiter(threading.Event()), PollingWaiter)
+
+    with CaptureQueriesContext(connection) as ctx:
+        enqueue_notification(to_user=agent_user, event="x", payload={})
+    assert not any("pg_notify" in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_listen_waiter_wakes_up_on_commit(agent_user, settings):
+    import threading
+    from django.db import connection, transaction
+    from tickets.outbox_worker import PgListenWaiter
+    from tickets.services import enqueue_notification
+
+    if connection.vendor != "postgresql":
+        pytest.skip("LISTEN/NOTIFY requires PostgreSQL")
+
+    settings.OUTBOX_NOTIFY_CHANNEL = "outbox_wakeup_test"
+    waiter = PgListenWaiter(threading.Event(), "outbox_wakeup_test")
+    try:
+        with transaction.atomic():
+            enqueue_notification(to_user=agent_user, event="x", payload={})
+            assert waiter.wait(0.2) is False  # commit dan oldin hech narsa kelmaydi
+        assert waiter.wait(5) is True
+    finally:
+        waiter.close()
+
+
+def test_listen_waiter_reconnects_after_connection_loss(monkeypatch):
+    import threading
+    psycopg = pytest.importorskip("psycopg")
+    from tickets.outbox_worker import PgListenWaiter
+
+    class DroppedConnection:
+        closed = False
+
+        def notifies(self, **kwargs):
+            raise psycopg.OperationalError("server closed the connection unexpectedly")
+
+        def close(self):
+            self.closed = True
+
+    dropped = DroppedConnection()
+    connects = []
+
+    def fake_connect(self):
+        self.conn = dropped if not connects else object()
+        connects.append(True)
+
+    monkeypatch.setattr(PgListenWaiter, "_connect", fake_connect)
+    waiter = PgListenWaiter(threading.Event(), "outbox_wakeup")
+
+    assert waiter.wait(5) is False
+    assert dropped.closed
+    assert len(connects) == 2  # qayta ulanib LISTEN qilindi
+    assert waiter.conn is not dropped
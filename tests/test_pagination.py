@@ -0,0 +1,68 @@
+import pytest
+from django.utils import timezone
+from datetime import timedelta
+
+from tickets.models import Ticket, NotificationOutbox
+
+
+def _walk(api, url):
+    ids, cursor = [], ""
+    while True:
+        sep = "&" if "?" in url else "?"
+        res = api.get(f"{url}{sep}cursor={cursor}")
+        assert res.status_code == 200
+        body = res.json()
+        ids += [item["id"] for item in body["results"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return ids
+
+
+@pytest.mark.django_db
+def test_ticket_list_cursor_walks_all_rows_once(api, client_user, agent_user):
+    for i in range(7):
+        Ticket.objects.create(created_by=client_user, title=f"T{i}", description="x")
+
+    api.force_authenticate(user=agent_user)
+    ids = _walk(api, "/api/tickets/?page_size=3")
+
+    paged = api.get("/api/tickets/?page_size=100").json()
+    assert ids == [item["id"] for item in paged["results"]]
+    assert len(set(ids)) == 7
+
+
+@pytest.mark.django_db
+def test_agent_queue_cursor_keeps_queue_order(api, client_user, agent_user):
+    now = timezone.now()
+    for due in [now - timedelta(minutes=5), now + timedelta(hours=1), None, now - timedelta(hours=1), None]:
+        Ticket.objects.create(created_by=client_user, title="Q", description="x", status="open", due_at=due)
+
+    api.force_authenticate(user=agent_user)
+    ids = _walk(api, "/api/agent/queue/?status=open&page_size=2")
+
+    paged = api.get("/api/agent/queue/?status=open&page_size=100").json()
+    assert ids == [item["id"] for item in paged["results"]]
+    assert len(set(ids)) == 5
+
+
+@pytest.mark.django_db
+def test_notification_cursor_and_count_skip(api, client_user):
+    for _ in range(3):
+        NotificationOutbox.objects.create(to_user=client_user, event="x", payload={})
+
+    api.force_authenticate(user=client_user)
+    assert len(_walk(api, "/api/notifications/?page_size=2")) == 3
+
+    res = api.get("/api/notifications/?count=0")
+    assert res.status_code == 200
+    assert res.json()["count"] is None
+    assert len(res.json()["results"]) == 3
+
+
+@pytest.mark.django_db
+def test_tampered_cursor_is_rejected(api, agent_user):
+    api.force_authenticate(user=agent_user)
+    res = api.get("/api/tickets/?cursor=not-a-real-cursor")
+
+    assert res.status_code == 400
+    assert res.json()["error"]["code"] == "VALIDATION_ERROR"
@@ -0,0 +1,71 @@
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+pytest.importorskip("orjson")
+
+from common.renderers import FastJSONRenderer  # noqa: E402
+from tickets.models import Ticket, NotificationOutbox  # noqa: E402
+
+
+def _both(data, accepted_media_type=None):
+    return (
+        FastJSONRenderer().render(data, accepted_media_type, {}),
+        JSONRenderer().render(data, accepted_media_type, {}),
+    )
+
+
+@pytest.mark.parametrize("data", [
+    {"id": uuid.UUID("12345678-1234-5678-1234-567812345678"), "n": None, "ok": True, "i": 3},
+    {"utc": datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc)},
+    {"utc_no_micro": datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)},
+    {"offset": datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone(timedelta(hours=5)))},
+    {"naive": datetime(2026, 1, 2, 3, 4, 5), "date": date(2026, 1, 2), "time": time(1, 2, 3, 4)},
+    {"decimal": Decimal("12.50"), "lazy": gettext_lazy("Open")},
+    {"text": "Salom — ✓     \"q\" \\ \n\t\x01"},
+    {1: "int key", "nested": [{"a": [1, 2, {"b": None}]}], "empty": {}},
+    [],
+])
+def test_fast_renderer_matches_drf_bytes(data):
+    fast, drf = _both(data)
+    assert fast == drf
+
+
+@pytest.mark.parametrize("data", [
+    {"big": 1e16, "small": 1e-7, "neg_zero": -0.0},
+    {"sum": 0.1 + 0.2, "nested": [{"f": 1.5}]},
+    {"decimal": Decimal("1E+16"), "tuple": (2.5,)},
+])
+def test_floats_match_drf_bytes(data):
+    fast, drf = _both(data)
+    assert fast == drf
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_non_finite_floats_raise_like_drf(value):
+    for renderer in (FastJSONRenderer(), JSONRenderer()):
+        with pytest.raises(ValueError):
+            renderer.render({"x": [value]}, None, {})
+
+
+def test_indent_falls_back_to_drf():
+    fast, drf = _both({"a": [1, 2]}, "application/json; indent=4")
+    assert fast == drf
+    assert b"\n" in fast
+
+
+@pytest.mark.django_db
+def test_api_payloads_render_identically(api, client_user, agent_user):
+    ticket = Ticket.objects.create(created_by=client_user, assigned_to=agent_user, title="Ünï ✓", description="x")
+    NotificationOutbox.objects.create(to_user=client_user, event="x", payload={"ticket_id": str(ticket.id)})
+    api.force_authenticate(user=client_user)
+
+    for url in ["/api/tickets/", f"/api/tickets/{ticket.id}/", "/api/notifications/?cursor="]:
+        res = api.get(url)
+        assert res.status_code == 200
+        fast, drf = _both(res.data)
+        assert fast == drf
@@ -0,0 +1,164 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from tickets.models import Ticket, TicketHistory
+from tickets.routing import (
+    AgentLoadIndex, LeastLoadedStrategy, PriorityAwareStrategy, RoundRobinStrategy, reset_router,
+)
+from tickets.services import claim_ticket, create_ticket, rebuild_ticket_counters
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_router():
+    # router/index process bo'yicha saqlanadi — har test o'z agentlari bilan
+    reset_router()
+    yield
+    reset_router()
+
+
+@pytest.fixture
+def agents(db):
+    return [User.objects.create_user(username=f"agent{i}", password="pass1234", role="agent") for i in range(3)]
+
+
+def _index(load):
+    index = AgentLoadIndex()
+    index.agents = sorted(load, key=str)
+    index.load = dict(load)
+    return index
+
+
+def test_round_robin_cycles_and_skips_full_agents():
+    a, b, c = sorted((uuid.uuid4() for _ in range(3)), key=str)
+    index = _index({a: 0, b: 5, c: 0})
+
+    strategy = RoundRobinStrategy()
+    assert [strategy.choose({"priority": "low"}, index) for _ in range(4)] == [a, b, c, a]
+
+    capped = RoundRobinStrategy(max_load=5)
+    assert [capped.choose({"priority": "low"}, index) for _ in range(3)] == [a, c, a]
+
+
+def test_least_loaded_and_priority_aware_choices():
+    a, b, c = sorted((uuid.uuid4() for _ in range(3)), key=str)
+    index = _index({a: 3, b: 1, c: 2})
+    assert LeastLoadedStrategy().choose({"priority": "low"}, index) == b
+
+    strategy = PriorityAwareStrategy(max_load=3)
+    # low: faqat o'rtachadan (1.5) yengil agentlar — b
+    assert strategy.choose({"priority": "low"}, index) == b
+    # hamma to'la bo'lsa low kutadi, urgent baribir eng bo'sh agentga
+    full = _index({a: 3, b: 4, c: 3})
+    assert strategy.choose({"priority": "low"}, full) is None
+    assert strategy.choose({"priority": "urgent"}, full) == a
+
+
+@pytest.mark.django_db(transaction=True)  # index load i on_commit da oshadi
+def test_inline_routing_assigns_on_create(api, client_user, agents, settings):
+    claim_ticket(ticket_id=create_ticket(actor=client_user, title="x", description="x", priority="low").id, actor=agents[0])
+    settings.TICKET_ROUTING = {"MODE": "inline", "STRATEGY": "tickets.routing.LeastLoadedStrategy"}
+
+    api.force_authenticate(user=client_user)
+    res = api.post("/api/tickets/create/", {"title": "Auto", "description": "x", "priority": "high"}, format="json")
+    assert res.status_code == 201
+    assert res.json()["status"] == "in_progress"
+    assert res.json()["assigned_to_id"] in {str(agents[1].id), str(agents[2].id)}
+
+    history = TicketHistory.objects.filter(ticket_id=res.json()["id"])
+    assert set(history.values_list("field", flat=True)) == {"assigned_to", "status"}
+    assert {h.actor.username for h in history} == {"system"}
+    assert rebuild_ticket_counters() == 0
+
+    # yuklama teng taqsimlanadi: keyingi 4 ta ticketdan keyin hamma agentda 2 tadan
+    for i in range(4):
+        create_ticket(actor=client_user, title=f"T{i}", description="x", priority="low")
+    loads = sorted(Ticket.objects.filter(assigned_to__in=agents).values_list("assigned_to", flat=True))
+    assert sorted(loads.count(a.id) for a in agents) == [2, 2, 2]
+
+
+@pytest.mark.django_db(transaction=True)  # index load i on_commit da oshadi
+def test_route_tickets_command_respects_max_load(client_user, agents):
+    tickets = [create_ticket(actor=client_user, title=f"T{i}", description="x", priority="low") for i in range(8)]
+    Ticket.objects.filter(id=tickets[0].id).update(status="resolved")
+    rebuild_ticket_counters()  # update() counterlarni chetlab o'tdi
+
+    out = StringIO()
+    call_command(
+        "route_tickets", "--batch-size", "2", "--max-load", "2",
+        "--strategy", "tickets.routing.RoundRobinStrategy", stdout=out,
+    )
+
+    assert "Routed: 6 tickets" in out.getvalue()
+    assigned = Ticket.objects.filter(assigned_to__isnull=False)
+    assert assigned.count() == 6
+    assert set(assigned.values_list("status", flat=True)) == {"in_progress"}
+    assert Ticket.objects.filter(status="open", assigned_to__isnull=True).count() == 1
+    assert rebuild_ticket_counters() == 0
+
+    out = StringIO()
+    call_command("route_tickets", "--max-load", "2", stdout=out)
+    assert "Routed: 0 tickets" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_declined_ticket_does_not_block_urgent_behind_it(client_user, agents):
+    # hamma agent max_load da: low rad etiladi, urgent esa baribir eng bo'sh agentga
+    for agent in agents:
+        claim_ticket(ticket_id=create_ticket(actor=client_user, title="busy", description="x", priority="low").id, actor=agent)
+    lows = [create_ticket(actor=client_user, title=f"L{i}", description="x", priority="low") for i in range(3)]
+    urgent = create_ticket(actor=client_user, title="U", description="x", priority="urgent")
+    # urgent queue da low lardan keyin (2-batch da) turibdi
+    Ticket.objects.filter(id=urgent.id).update(due_at=max(t.due_at for t in lows) + timedelta(hours=1))
+
+    out = StringIO()
+    call_command(
+        "route_tickets", "--batch-size", "2", "--max-load", "1",
+        "--strategy", "tickets.routing.PriorityAwareStrategy", stdout=out,
+    )
+
+    assert "Routed: 1 tickets" in out.getvalue()
+    urgent.refresh_from_db()
+    assert urgent.status == "in_progress"
+    assert not Ticket.objects.filter(id__in=[t.id for t in lows], assigned_to__isnull=False).exists()
+    assert rebuild_ticket_counters() == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_inline_routing_counts_load_only_after_commit(client_user, agents, settings):
+    from django.db import transaction
+    from tickets.routing import get_router
+
+    settings.TICKET_ROUTING = {"MODE": "inline", "STRATEGY": "tickets.routing.LeastLoadedStrategy"}
+    index = get_router().index
+
+    ticket = create_ticket(actor=client_user, title="A", description="x", priority="low")
+    assert index.load[ticket.assigned_to_id] == 1
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            create_ticket(actor=client_user, title="B", description="x", priority="low")
+            raise RuntimeError("rollback")
+    assert sum(index.load.values()) == 1
+
+
+@pytest.mark.django_db
+def test_inline_routing_skips_agent_deactivated_after_refresh(client_user, agents, settings):
+    from tickets.routing import get_router
+
+    settings.TICKET_ROUTING = {"MODE": "inline", "STRATEGY": "tickets.routing.RoundRobinStrategy"}
+    get_router().index.refresh()
+    first = sorted(agents, key=lambda a: str(a.id))[0]
+    User.objects.filter(id=first.id).update(is_active=False)
+
+    ticket = create_ticket(actor=client_user, title="A", description="x", priority="low")
+
+    assert ticket.assigned_to_id is not None
+    assert ticket.assigned_to_id != first.id
+    assert first.id not in get_router().index.agents
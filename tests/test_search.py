@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+
+from tickets.models import Ticket, TicketSearchDocument
+from tickets.services import create_ticket, add_message
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor not in ("sqlite", "postgresql"), reason="full-text index faqat SQLite/PostgreSQL da"
+)
+
+
+def _ids(res):
+    assert res.status_code == 200
+    return [r["id"] for r in res.json()["results"]]
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_matches_first(api, client_user):
+    body_hit = create_ticket(actor=client_user, title="Login issue", description="printer shows an error", priority="low")
+    title_hit = create_ticket(actor=client_user, title="Printer broken", description="nothing works", priority="low")
+    create_ticket(actor=client_user, title="Other", description="unrelated", priority="low")
+
+    api.force_authenticate(user=client_user)
+    assert _ids(api.get("/api/tickets/?q=printer")) == [str(title_hit.id), str(body_hit.id)]
+
+
+@pytest.mark.django_db
+def test_search_includes_messages_and_respects_rbac(api, client_user, agent_user):
+    from django.contrib.auth import get_user_model
+
+    other = get_user_model().objects.create_user(username="client2", password="pass1234", role="client")
+    mine = create_ticket(actor=client_user, title="A", description="x", priority="low")
+    theirs = create_ticket(actor=other, title="B", description="x", priority="low")
+    add_message(ticket_id=mine.id, actor=agent_user, body="try resetting the router")
+    add_message(ticket_id=theirs.id, actor=agent_user, body="router replaced")
+
+    api.force_authenticate(user=client_user)
+    assert _ids(api.get("/api/tickets/?q=router")) == [str(mine.id)]
+
+    api.force_authenticate(user=agent_user)
+    assert set(_ids(api.get("/api/tickets/?q=Router"))) == {str(mine.id), str(theirs.id)}
+    assert _ids(api.get("/api/tickets/?q=router+resetting")) == [str(mine.id)]
+
+
+@pytest.mark.django_db
+def test_search_cursor_pages_without_gaps(api, client_user):
+    created = {
+        str(create_ticket(actor=client_user, title=f"VPN {i}", description="vpn " * (i % 3), priority="low").id)
+        for i in range(7)
+    }
+    create_ticket(actor=client_user, title="Mail", description="x", priority="low")
+
+    api.force_authenticate(user=client_user)
+    seen, url = [], "/api/tickets/?q=vpn&cursor=&page_size=3"
+    while url:
+        res = api.get(url)
+        seen += _ids(res)
+        cursor = res.json()["next_cursor"]
+        url = f"/api/tickets/?q=vpn&cursor={cursor}&page_size=3" if cursor else None
+
+    assert len(seen) == len(created)
+    assert set(seen) == created
+
+
+@pytest.mark.django_db
+def test_search_with_only_punctuation_returns_nothing(api, client_user):
+    create_ticket(actor=client_user, title="Quote \"test\"", description="x", priority="low")
+
+    api.force_authenticate(user=client_user)
+    assert _ids(api.get('/api/tickets/?q="*()')) == []
+    assert len(_ids(api.get('/api/tickets/?q="test'))) == 1
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index_command(client_user, agent_user):
+    from io import StringIO
+    from django.core.management import call_command
+    from tickets.search import search_tickets
+
+    ticket = Ticket.objects.create(created_by=client_user, title="Imported", description="legacy scanner")
+    ticket.messages.create(author=agent_user, body="firmware updated")
+    assert not search_tickets(Ticket.objects.all(), "scanner").exists()
+
+    out = StringIO()
+    call_command("rebuild_search_index", "--batch-size", "1", stdout=out)
+
+    assert TicketSearchDocument.objects.count() == 1
+    assert list(search_tickets(Ticket.objects.all(), "firmware")) == [ticket]
+    assert "1" in out.getvalue()
@@ -48,4 +48,161 @@ def test_agent_queue_orders_overdue_first(api, client_user, agent_user):
     assert res.status_code == 200
 
     results = res.json()["results"]
-    assert results[0]["id"] == str(t1.id)
\ No newline at end of file
+    assert results[0]["id"] == str(t1.id)
+
+
+def _queue_queries(api):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        res = api.get("/api/agent/queue/?status=open&page_size=50")
+    assert res.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_agent_queue_marks_sla_breaches_in_constant_queries(api, client_user, agent_user, settings):
+    from tickets.models import TicketHistory
+
+    settings.SLA_MARK_ON_READ = True
+    overdue = timezone.now() - timedelta(minutes=5)
+    api.force_authenticate(user=agent_user)
+
+    # warm-up: TicketCounter qatorlari birinchi flag da yaratiladi
+    Ticket.objects.create(created_by=client_user, title="W", description="x", due_at=overdue)
+    _queue_queries(api)
+
+    Ticket.objects.bulk_create(
+        [Ticket(created_by=client_user, title="A", description="x", due_at=overdue) for _ in range(2)]
+    )
+    few = _queue_queries(api)
+
+    Ticket.objects.bulk_create(
+        [Ticket(created_by=client_user, title="B", description="x", due_at=overdue) for _ in range(15)]
+    )
+    many = _queue_queries(api)
+
+    assert few == many
+    assert TicketHistory.objects.filter(field="sla", new_value="breached").count() == 18
+
+    # ikkinchi o'qish: hammasi allaqachon yozilgan — takror yo'q
+    _queue_queries(api)
+    assert TicketHistory.objects.filter(field="sla", new_value="breached").count() == 18
+
+
+@pytest.mark.django_db
+def test_sweep_sla_marks_unviewed_tickets_and_escalates(client_user, agent_user):
+    from io import StringIO
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from tickets.models import TicketHistory, NotificationOutbox
+
+    admin = get_user_model().objects.create_user(username="admin1", password="pass1234", role="admin")
+    now = timezone.now()
+    overdue = [
+        Ticket.objects.create(created_by=client_user, title=f"O{i}", description="x", due_at=now - timedelta(minutes=i + 1))
+        for i in range(5)
+    ]
+    Ticket.objects.create(created_by=client_user, title="Later", description="x", due_at=now + timedelta(hours=1))
+    Ticket.objects.create(
+        created_by=client_user, title="Done", description="x", status="resolved", due_at=now - timedelta(hours=1)
+    )
+
+    out = StringIO()
+    call_command("sweep_sla", "--batch-size", "2", "--notify", stdout=out)
+
+    assert "scanned 5 overdue tickets, marked 5 breaches" in out.getvalue()
+    marked = set(TicketHistory.objects.filter(field="sla", new_value="breached").values_list("ticket_id", flat=True))
+    assert marked == {t.id for t in overdue}
+    assert NotificationOutbox.objects.filter(to_user=admin, event="ticket_sla_breached").count() == 5
+
+    # ikkinchi sweep — takror yozmaydi
+    out = StringIO()
+    call_command("sweep_sla", "--notify", stdout=out)
+    assert "marked 0 breaches" in out.getvalue()
+    assert NotificationOutbox.objects.filter(event="ticket_sla_breached").count() == 5
+
+
+@pytest.mark.django_db
+def test_agent_queue_is_read_only_when_mark_on_read_disabled(api, client_user, agent_user, settings):
+    from tickets.models import TicketHistory
+
+    settings.SLA_MARK_ON_READ = False
+    Ticket.objects.create(created_by=client_user, title="O", description="x", due_at=timezone.now() - timedelta(minutes=1))
+
+    api.force_authenticate(user=agent_user)
+    assert api.get("/api/agent/queue/").status_code == 200
+    assert not TicketHistory.objects.exists()
+
+
+@pytest.mark.django_db
+def test_overdue_flag_is_maintained_by_sweep_and_services(api, client_user, agent_user, settings):
+    from django.core.management import call_command
+    from io import StringIO
+
+    settings.SLA_MARK_ON_READ = False
+    now = timezone.now()
+    later = Ticket.objects.create(created_by=client_user, title="Later", description="x", due_at=now + timedelta(hours=1))
+    overdue = Ticket.objects.create(
+        created_by=client_user, title="Overdue", description="x", due_at=now - timedelta(minutes=1)
+    )
+
+    call_command("sweep_sla", stdout=StringIO())
+    overdue.refresh_from_db()
+    assert overdue.is_overdue is True
+    assert overdue.sla_breached_at is not None
+
+    # queue faqat column bo'yicha tartiblaydi (read-only rejim)
+    api.force_authenticate(user=agent_user)
+    ids = [r["id"] for r in api.get("/api/agent/queue/").json()["results"]]
+    assert ids == [str(overdue.id), str(later.id)]
+
+    # claim -> OPEN emas, flag tozalanadi; breach vaqti reporting uchun qoladi
+    assert api.post(f"/api/tickets/{overdue.id}/claim/").status_code == 200
+    overdue.refresh_from_db()
+    assert overdue.is_overdue is False
+    assert overdue.sla_breached_at is not None
+
+
+@pytest.mark.django_db
+def test_queue_read_flags_only_page_rows_as_system_actor(api, client_user, agent_user, settings):
+    from tickets.models import TicketHistory
+
+    settings.SLA_MARK_ON_READ = True
+    overdue = timezone.now() - timedelta(minutes=5)
+    for i in range(3):
+        Ticket.objects.create(created_by=client_user, title=f"O{i}", description="x", due_at=overdue)
+
+    api.force_authenticate(user=agent_user)
+    assert api.get("/api/agent/queue/?page_size=1").status_code == 200
+
+    assert Ticket.objects.filter(is_overdue=True).count() == 1
+    breach = TicketHistory.objects.get(field="sla", new_value="breached")
+    assert breach.actor.username == "system"
+
+
+@pytest.mark.django_db
+def test_breach_marked_on_read_is_still_escalated_by_sweep(api, client_user, agent_user, settings):
+    from io import StringIO
+    from django.core.management import call_command
+    from django.contrib.auth import get_user_model
+    from tickets.models import NotificationOutbox
+
+    admin = get_user_model().objects.create_user(username="admin1", password="pass1234", role="admin")
+    settings.SLA_MARK_ON_READ = True
+    ticket = Ticket.objects.create(
+        created_by=client_user, title="O", description="x", due_at=timezone.now() - timedelta(minutes=1)
+    )
+    api.force_authenticate(user=agent_user)
+    api.get("/api/agent/queue/")
+    ticket.refresh_from_db()
+    assert ticket.is_overdue and ticket.sla_escalated_at is None
+
+    call_command("sweep_sla", "--notify", stdout=StringIO())
+    call_command("sweep_sla", "--notify", stdout=StringIO())
+
+    ticket.refresh_from_db()
+    assert ticket.sla_escalated_at is not None
+    assert NotificationOutbox.objects.filter(event="ticket_sla_breached").count() == 1
+    assert NotificationOutbox.objects.get(event="ticket_sla_breached").to_user == admin
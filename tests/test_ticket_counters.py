@@ -0,0 +1,80 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from tickets.models import Ticket, TicketCounter
+from tickets.services import create_ticket, claim_ticket, change_status, assign_ticket
+
+User = get_user_model()
+
+
+def _stats(api, user):
+    api.force_authenticate(user=user)
+    res = api.get("/api/tickets/stats/")
+    assert res.status_code == 200
+    return res.json()
+
+
+@pytest.mark.django_db
+def test_stats_follow_ticket_lifecycle(api, client_user, agent_user):
+    admin = User.objects.create_user(username="admin1", password="pass1234", role="admin")
+    t1 = create_ticket(actor=client_user, title="A", description="x", priority="low")
+    t2 = create_ticket(actor=client_user, title="B", description="x", priority="low")
+    create_ticket(actor=client_user, title="C", description="x", priority="low")
+
+    claim_ticket(ticket_id=t1.id, actor=agent_user)
+    change_status(ticket_id=t1.id, actor=agent_user, new_status="resolved")
+    assign_ticket(ticket_id=t2.id, actor=admin, agent_id=agent_user.id)
+
+    data = _stats(api, agent_user)
+    assert data["totals"] == {"open": 1, "in_progress": 1, "resolved": 1, "closed": 0, "overdue": 0}
+    assert data["unassigned"]["open"] == 1
+    assert data["agents"] == [
+        {"agent_id": str(agent_user.id), "open": 0, "in_progress": 1, "resolved": 1, "closed": 0, "overdue": 0}
+    ]
+
+
+@pytest.mark.django_db
+def test_overdue_flag_moves_counter(api, client_user, agent_user):
+    ticket = create_ticket(actor=client_user, title="A", description="x", priority="urgent")
+    Ticket.objects.filter(id=ticket.id).update(due_at=timezone.now() - timedelta(minutes=1))
+
+    call_command("sweep_sla", stdout=StringIO())
+    data = _stats(api, agent_user)
+    assert data["totals"]["open"] == 1
+    assert data["totals"]["overdue"] == 1
+
+    claim_ticket(ticket_id=ticket.id, actor=agent_user)
+    data = _stats(api, agent_user)
+    assert data["totals"]["overdue"] == 0
+    assert data["agents"][0]["in_progress"] == 1
+
+
+@pytest.mark.django_db
+def test_stats_requires_agent(api, client_user):
+    api.force_authenticate(user=client_user)
+    assert api.get("/api/tickets/stats/").status_code == 403
+
+
+@pytest.mark.django_db
+def test_reconcile_rebuilds_counters_from_tickets(api, client_user, agent_user):
+    create_ticket(actor=client_user, title="A", description="x", priority="low")
+    # servicelarni chetlab o'tgan yozuvlar -> drift
+    Ticket.objects.bulk_create([Ticket(created_by=client_user, title="B", description="x") for _ in range(3)])
+    TicketCounter.objects.create(agent=agent_user, status="closed", count=7)
+
+    out = StringIO()
+    call_command("reconcile_ticket_counters", stdout=out)
+    assert "Reconciled: 2 counter rows changed" in out.getvalue()
+
+    data = _stats(api, agent_user)
+    assert data["totals"]["open"] == 4
+    assert data["totals"]["closed"] == 0
+
+    out = StringIO()
+    call_command("reconcile_ticket_counters", stdout=out)
+    assert "Reconciled: 0 counter rows changed" in out.getvalue()
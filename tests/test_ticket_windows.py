@@ -0,0 +1,67 @@
+import pytest
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from tickets.models import Ticket, TicketMessage, TicketHistory
+
+
+def _ticket_with_messages(user, n):
+    ticket = Ticket.objects.create(created_by=user, title="Long", description="x")
+    base = timezone.now() - timedelta(days=1)
+    TicketMessage.objects.bulk_create([TicketMessage(ticket=ticket, author=user, body=f"m{i}") for i in range(n)])
+    # created_at ni aniq tartibga keltiramiz (m0 — eng eski)
+    for i, msg in enumerate(TicketMessage.objects.filter(ticket=ticket)):
+        TicketMessage.objects.filter(id=msg.id).update(created_at=base + timedelta(minutes=int(msg.body[1:])))
+    return ticket
+
+
+@pytest.mark.django_db
+def test_detail_latest_mode_embeds_newest_n_in_order(api, client_user):
+    ticket = _ticket_with_messages(client_user, 30)
+    api.force_authenticate(user=client_user)
+
+    full = api.get(f"/api/tickets/{ticket.id}/").json()
+    assert [m["body"] for m in full["messages"]] == [f"m{i}" for i in range(30)]
+
+    latest = api.get(f"/api/tickets/{ticket.id}/?latest=5")
+    assert [m["body"] for m in latest.json()["messages"]] == [f"m{i}" for i in range(25, 30)]
+    assert latest["ETag"] != api.get(f"/api/tickets/{ticket.id}/")["ETag"]
+
+    assert api.get(f"/api/tickets/{ticket.id}/?latest=x").status_code == 400
+
+
+@pytest.mark.django_db
+def test_messages_endpoint_walks_with_cursor(api, client_user):
+    ticket = _ticket_with_messages(client_user, 23)
+    api.force_authenticate(user=client_user)
+
+    bodies, cursor = [], ""
+    while cursor is not None:
+        with CaptureQueriesContext(connection) as ctx:
+            res = api.get(f"/api/tickets/{ticket.id}/messages/", {"cursor": cursor, "page_size": 10})
+        assert res.status_code == 200
+        assert len(ctx.captured_queries) == 2  # ticket permission + sahifa (author N+1 yo'q)
+        bodies += [m["body"] for m in res.json()["results"]]
+        cursor = res.json()["next_cursor"]
+
+    assert bodies == [f"m{i}" for i in range(23)]
+
+
+@pytest.mark.django_db
+def test_history_endpoint_respects_ticket_permission(api, client_user, agent_user):
+    from django.contrib.auth import get_user_model
+
+    ticket = Ticket.objects.create(created_by=client_user, title="H", description="x")
+    TicketHistory.objects.create(ticket=ticket, actor=agent_user, field="status", old_value="open", new_value="x")
+
+    api.force_authenticate(user=agent_user)
+    res = api.get(f"/api/tickets/{ticket.id}/history/?cursor=")
+    assert res.status_code == 200
+    assert [h["field"] for h in res.json()["results"]] == ["status"]
+
+    other = get_user_model().objects.create_user(username="client2", password="pass1234", role="client")
+    api.force_authenticate(user=other)
+    assert api.get(f"/api/tickets/{ticket.id}/history/").status_code == 403
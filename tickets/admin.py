@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Ticket, TicketMessage, TicketHistory, NotificationOutbox
+from .models import Ticket, TicketMessage, TicketHistory, NotificationOutbox, NotificationFanout, \
+    TicketCounter
 
 
 @admin.register(Ticket)
@@ -24,9 +25,22 @@ class TicketHistoryAdmin(admin.ModelAdmin):
     ordering = ("-created_at",)
 
 
+@admin.register(TicketCounter)
+class TicketCounterAdmin(admin.ModelAdmin):
+    list_display = ("id", "agent", "status", "is_overdue", "count")
+    list_filter = ("status", "is_overdue")
+
+
 @admin.register(NotificationOutbox)
 class NotificationOutboxAdmin(admin.ModelAdmin):
-    list_display = ("id", "to_user", "event", "status", "attempts", "created_at", "sent_at")
+    list_display = ("id", "to_user", "event", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
     list_filter = ("status", "event")
     search_fields = ("to_user__username", "event", "payload")
-    ordering = ("-created_at",)
\ No newline at end of file
+    ordering = ("-created_at",)
+
+
+@admin.register(NotificationFanout)
+class NotificationFanoutAdmin(admin.ModelAdmin):
+    list_display = ("id", "audience", "event", "status", "recipients_count", "created_at", "processed_at")
+    list_filter = ("status", "audience", "event")
+    ordering = ("-created_at",)
@@ -0,0 +1,69 @@
+"""
+TicketHistory yozuvlarini yig'ib, bitta bulk_create bilan yozish.
+
+    @transaction.atomic
+    @audit_batch()
+    def claim_ticket(...):
+        ...
+        record(TicketHistory(...))   # INSERT hozir emas
+        record(TicketHistory(...))
+    # funksiya oxirida (hali transaction ichida, COMMIT dan oldin) -> 1 ta INSERT
+
+- Recorder contextvar da: ichma-ich chaqirilgan servicelar tashqi recorder ga yozadi, flush bitta.
+- Exception bo'lsa flush qilinmaydi (transaction baribir rollback). Ichki blok yiqilsa, uning
+  yozuvlari recorder dan olib tashlanadi — tashqarida ushlansa ham (savepoint rollback bilan bir xil).
+- Recorder yo'q joyda record() darhol save() qiladi (eski xatti-harakat).
+- Decorator tartibi muhim: audit_batch transaction.atomic ICHIDA bo'lsin — flush commit dan oldin.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .models import TicketHistory
+
+AUDIT_BATCH_SIZE = 500
+
+_recorder: ContextVar = ContextVar("ticket_audit_recorder", default=None)
+
+
+class AuditRecorder:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, row: TicketHistory) -> None:
+        self.rows.append(row)
+
+    def flush(self) -> int:
+        rows, self.rows = self.rows, []
+        if rows:
+            TicketHistory.objects.bulk_create(rows, batch_size=AUDIT_BATCH_SIZE)
+        return len(rows)
+
+
+@contextmanager
+def audit_batch():
+    """Blok ichidagi record() lar oxirida bitta bulk_create. Ichma-ich bo'lsa tashqi blok flush qiladi."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        mark = len(recorder.rows)
+        try:
+            yield recorder
+        except BaseException:
+            del recorder.rows[mark:]
+            raise
+        return
+
+    recorder = AuditRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+        recorder.flush()
+    finally:
+        _recorder.reset(token)
+
+
+def record(row: TicketHistory) -> None:
+    recorder = _recorder.get()
+    if recorder is None:
+        row.save()
+    else:
+        recorder.add(row)
@@ -0,0 +1,84 @@
+"""
+Ticket detail response cache (TicketDetailSerializer output, ticket bo'yicha).
+
+Versioned keys:
+  ticket:detail:ver:<id>          -> token (har o'zgarishda yangi uuid)
+  ticket:detail:<id>:<token>:<variant>  -> {"etag", "data"}   (variant: "all" | "latest<N>")
+
+Service layer o'zgarishdan keyin (transaction.on_commit) yangi token yozadi — eski entry
+boshqa o'qilmaydi. Delete o'rniga versiya: commit dan oldin DB ni o'qib, keyin keshga yozgan
+parallel so'rov ham eski tokenga yozadi, yangi versiyani buzmaydi.
+
+View permission va ETag ni har so'rovda fingerprint query dan oladi (selectors.ticket_detail_fingerprint);
+entry dagi etag boshqa bo'lsa (masalan boshqa process keshi eskirgan) — entry ishlatilmaydi.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def _cache():
+    return caches[getattr(settings, "TICKET_DETAIL_CACHE_ALIAS", "default")]
+
+
+def _timeout() -> int:
+    return getattr(settings, "TICKET_DETAIL_CACHE_TIMEOUT", 300)
+
+
+def is_enabled() -> bool:
+    return _timeout() > 0
+
+
+def _version_key(ticket_id) -> str:
+    return f"ticket:detail:ver:{ticket_id}"
+
+
+def _entry_key(ticket_id, token: str, variant: str) -> str:
+    return f"ticket:detail:{ticket_id}:{token}:{variant}"
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex
+
+
+def _current_token(ticket_id) -> str:
+    token = _cache().get(_version_key(ticket_id))
+    if token is None:
+        # versiya yo'q (evict / birinchi o'qish) -> yangi token; add — parallel o'qishda bittasi yutadi
+        _cache().add(_version_key(ticket_id), _new_token(), timeout=None)
+        token = _cache().get(_version_key(ticket_id))
+    return token
+
+
+def get_ticket_detail(ticket_id, *, etag: str, variant: str = "all"):
+    """
+    Returns: (token, data | None). token — set_ticket_detail ga qaytariladi.
+    """
+    if not is_enabled():
+        return None, None
+    token = _current_token(ticket_id)
+    entry = _cache().get(_entry_key(ticket_id, token, variant))
+    if entry is None or entry["etag"] != etag:
+        return token, None
+    return token, entry["data"]
+
+
+def set_ticket_detail(ticket_id, token, *, etag: str, data, variant: str = "all") -> None:
+    if token is not None:
+        _cache().set(_entry_key(ticket_id, token, variant), {"etag": etag, "data": data}, timeout=_timeout())
+
+
+def invalidate_ticket_details(ticket_ids) -> None:
+    """
+    Service layer dan chaqiriladi (transaction ichida). Token commit dan keyin almashadi —
+    rollback bo'lsa kesh tegilmaydi.
+    """
+    ticket_ids = list(ticket_ids)
+    if not ticket_ids or not is_enabled():
+        return
+    transaction.on_commit(
+        lambda: _cache().set_many({_version_key(i): _new_token() for i in ticket_ids}, timeout=None),
+        robust=True,
+    )
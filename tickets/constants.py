@@ -10,6 +10,11 @@ ALLOWED_STATUS_TRANSITIONS = {
 }
 
 
+# Bulk endpointlar (/api/tickets/bulk/...): bitta so'rovda ko'pi bilan shuncha ticket
+# (hammasi bitta transaction + bitta lock pass ichida)
+BULK_TICKET_MAX = 500
+
+
 #==========================
 # second adding
 #==========================
@@ -19,4 +24,28 @@ SLA_BY_PRIORITY = {
     TicketPriority.HIGH: timedelta(hours=2),
     TicketPriority.MEDIUM: timedelta(hours=8),
     TicketPriority.LOW: timedelta(hours=24),
-}
\ No newline at end of file
+}
+
+
+# Outbox sharding: har bir user doim bitta shard ga tushadi (per-user ordering saqlanadi).
+# Worker i / N: shard_key % N == i
+OUTBOX_SHARD_SPACE = 1024
+
+
+# Outbox retry: exponential backoff (base * 2^(attempts-1), max gacha), keyin dead letter
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_DELAY = timedelta(seconds=30)
+OUTBOX_RETRY_MAX_DELAY = timedelta(hours=1)
+# Claim (lease): worker olgan qatorlar shuncha vaqt boshqa workerlarga ko'rinmaydi
+# (send transaction dan tashqarida). Worker yiqilsa — lease tugagach qayta yuboriladi.
+OUTBOX_CLAIM_TIMEOUT = timedelta(minutes=5)
+# lease tugashidan shuncha oldin yangi send boshlanmaydi (boshlangan send tugashiga joy;
+# backend timeout bundan katta bo'lsa — o'sha olinadi)
+OUTBOX_CLAIM_MARGIN = timedelta(seconds=30)
+
+
+# Outbox retention (manage.py archive_outbox):
+#   - SENT + o'qilgan qatorlar shuncha vaqtdan keyin archive ga ko'chadi
+#   - SENT (o'qilmagan) va DEAD qatorlar esa shuncha vaqtdan keyin
+OUTBOX_RETENTION_READ = timedelta(days=30)
+OUTBOX_RETENTION_UNREAD = timedelta(days=90)
@@ -0,0 +1,189 @@
+"""
+Notification delivery backends (outbox worker -> tashqi provider).
+
+settings.NOTIFICATION_DELIVERY = {
+    "BACKEND": "tickets.delivery.SimulatedBackend",
+    "OPTIONS": {
+        "max_concurrency": 8,   # bir vaqtda nechta send
+        "timeout": 5.0,         # bitta send uchun (seconds)
+    },
+}
+
+process_outbox_batch backend dan faqat natija oladi ({id: error | None}),
+DB statuslarini esa o'zi bulk UPDATE qiladi.
+
+send_many(notifications, deadline=...) — deadline (time.monotonic()) claim lease dan kelib chiqadi:
+undan keyin yangi send BOSHLANMAYDI (TIMEOUT_ERROR, retry xavfsiz) — lease tugab, boshqa worker
+qatorni qayta olganda biz ham yuborib qo'ymaylik.
+
+send lar DB transaction dan tashqarida ishlaydi (qatorlar lease bilan claim qilingan) —
+baribir backend ORM ga murojaat qilmasin; kerakli hamma narsa notification.payload / to_user da bor.
+"""
+import asyncio
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+
+DEFAULT_DELIVERY_BACKEND = "tickets.delivery.SimulatedBackend"
+
+TIMEOUT_ERROR = "Delivery timed out"
+
+
+def _error_message(exc) -> str:
+    return str(exc) or exc.__class__.__name__
+
+
+class BaseDeliveryBackend:
+    """
+    Sync backend: send() ni implement qiling.
+
+    max_concurrency > 1 -> send lar thread pool da parallel ishlaydi
+    (HTTP/SMTP kabi I/O-bound providerlar uchun).
+    timeout -> batch deadline: timeout * ceil(n / max_concurrency) (ketma-ket rejimda ham).
+               Deadline dan keyin yangi send BOSHLANMAYDI — ular "timed out" (retry xavfsiz).
+               Boshlangan send esa to'xtatilmaydi (thread ni to'xtatib bo'lmaydi) va tugashi
+               kutiladi — natijasi aniq bo'ladi, yuborilgan notification qayta yuborilmaydi.
+               Bitta send ning davomiyligini send() ning o'zi (HTTP client timeout) cheklaydi.
+    """
+    def __init__(self, *, max_concurrency: int = 1, timeout: float = None, **options):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self.options = options
+
+    def send(self, notification) -> None:
+        """Bitta notificationni yuboradi. Xato bo'lsa exception ko'taradi."""
+        raise NotImplementedError
+
+    def _send_one(self, notification):
+        try:
+            self.send(notification)
+            return None
+        except Exception as e:
+            return _error_message(e)
+
+    def _send_before(self, deadline, notification):
+        if deadline is not None and time.monotonic() >= deadline:
+            return TIMEOUT_ERROR
+        return self._send_one(notification)
+
+    def send_many(self, notifications, *, deadline: float = None) -> dict:
+        """
+        deadline: tashqi chegara (time.monotonic()); batch deadline bilan qaysi biri oldin bo'lsa.
+        Returns: {notification.id: None (sent) | "error message" (failed)}
+        """
+        notifications = list(notifications)
+
+        if self.timeout is not None:
+            waves = math.ceil(len(notifications) / self.max_concurrency)
+            batch_deadline = time.monotonic() + self.timeout * waves
+            deadline = batch_deadline if deadline is None else min(deadline, batch_deadline)
+
+        if self.max_concurrency == 1:
+            return {n.id: self._send_before(deadline, n) for n in notifications}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="outbox-delivery") as executor:
+            futures = {n.id: executor.submit(self._send_before, deadline, n) for n in notifications}
+            return {notification_id: future.result() for notification_id, future in futures.items()}
+
+
+class AsyncDeliveryBackend(BaseDeliveryBackend):
+    """
+    Async backend: asend() ni implement qiling (masalan httpx.AsyncClient bilan).
+
+    Semaphore(max_concurrency) + asyncio.wait_for(timeout) — har bir send alohida
+    timeout oladi va haqiqatan cancel qilinadi.
+    """
+    def send(self, notification) -> None:
+        asyncio.run(self.asend(notification))
+
+    async def asend(self, notification) -> None:
+        raise NotImplementedError
+
+    async def _asend_one(self, semaphore, deadline, notification):
+        async with semaphore:
+            if deadline is not None and time.monotonic() >= deadline:
+                return TIMEOUT_ERROR
+            try:
+                await asyncio.wait_for(self.asend(notification), timeout=self.timeout)
+                return None
+            except asyncio.TimeoutError:
+                return TIMEOUT_ERROR
+            except Exception as e:
+                return _error_message(e)
+
+    async def _asend_many(self, notifications, deadline) -> dict:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        errors = await asyncio.gather(*[self._asend_one(semaphore, deadline, n) for n in notifications])
+        return {n.id: error for n, error in zip(notifications, errors)}
+
+    def send_many(self, notifications, *, deadline: float = None) -> dict:
+        notifications = list(notifications)
+        if not notifications:
+            return {}
+        return asyncio.run(self._asend_many(notifications, deadline))
+
+
+#==========================
+# built-in backends
+#==========================
+class SimulatedBackend(BaseDeliveryBackend):
+    """
+    SIMULATION: hech narsa yubormaydi, hammasini "sent" deb hisoblaydi.
+    Production'da bu joyga provider (SES/Sendgrid/webhook) backend ulanadi.
+    """
+    def send(self, notification) -> None:
+        return None
+
+
+# InMemoryBackend yuborgan hamma narsa shu yerda (django.core.mail.outbox kabi)
+sent_messages = []
+_sent_lock = threading.Lock()
+
+
+def _message(notification) -> dict:
+    return {
+        "id": str(notification.id),
+        "to_user_id": str(notification.to_user_id),
+        "event": notification.event,
+        "payload": notification.payload,
+    }
+
+
+class InMemoryBackend(BaseDeliveryBackend):
+    """
+    Test/local uchun. OPTIONS:
+      fail_events: shu eventlar uchun send xato beradi (retry flow ni tekshirish uchun)
+    """
+    def send(self, notification) -> None:
+        if notification.event in self.options.get("fail_events", ()):
+            raise RuntimeError(f"Delivery failed for event {notification.event}")
+        with _sent_lock:
+            sent_messages.append(_message(notification))
+
+
+class FileSinkBackend(BaseDeliveryBackend):
+    """
+    Har notification -> faylga bitta JSON qator (NDJSON). OPTIONS: path
+    """
+    def __init__(self, *, path: str, **options):
+        super().__init__(**options)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, notification) -> None:
+        line = json.dumps(_message(notification), cls=DjangoJSONEncoder, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def get_delivery_backend() -> BaseDeliveryBackend:
+    config = getattr(settings, "NOTIFICATION_DELIVERY", {})
+    backend_cls = import_string(config.get("BACKEND", DEFAULT_DELIVERY_BACKEND))
+    return backend_cls(**config.get("OPTIONS", {}))
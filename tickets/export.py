@@ -0,0 +1,104 @@
+"""
+Ticket export (reporting): CSV yoki NDJSON, xohlasa history bilan.
+
+Butun natija xotiraga olinmaydi:
+  - tickets .values().iterator(chunk_size) bilan o'qiladi (PostgreSQL da server-side cursor)
+  - history har bo'lak uchun 1 ta query (ticket_id IN chunk) — prefetch bilan bir xil, lekin bo'lak bo'yicha
+  - natija satrlari generator orqali StreamingHttpResponse / stdout ga yoziladi
+"""
+import csv
+import json
+from itertools import islice
+
+from django.db.models import QuerySet
+
+from .models import TicketHistory
+from .serializers import TICKET_LIST_FIELDS, TicketHistorySerializer, fast_rows
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Spreadsheet formula injection (CSV injection): shu belgilardan boshlangan katak formula
+# sifatida bajariladi — oldiga ' qo'yib matnga aylantiramiz (OWASP tavsiyasi)
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+HISTORY_FIELDS = tuple(TicketHistorySerializer.Meta.fields)
+# hisobotlar uchun barqaror tartib (created_at, id) — takrorlanmaydi, tushib qolmaydi
+EXPORT_ORDERING = ("created_at", "id")
+
+
+class _Echo:
+    """csv.writer uchun "fayl": yozilgan satrni qaytaradi (Django docs: streaming large CSV)."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _history_by_ticket(ticket_ids) -> dict:
+    rows = list(
+        TicketHistory.objects
+        .filter(ticket_id__in=ticket_ids)
+        .order_by("ticket_id", "created_at", "id")
+        .values("ticket_id", *HISTORY_FIELDS)
+    )
+    grouped = {}
+    for row, item in zip(rows, fast_rows(rows, HISTORY_FIELDS)):
+        grouped.setdefault(row["ticket_id"], []).append(item)
+    return grouped
+
+
+def iter_export_rows(qs: QuerySet, *, with_history: bool = False, chunk_size: int = 2000):
+    """
+    qs: RBAC + filterlar qo'llangan Ticket queryset.
+    Yields: bo'lak-bo'lak JSON-ready dict lar ro'yxati (TicketListItemSerializer formati, + "history").
+    """
+    rows = qs.order_by(*EXPORT_ORDERING).values(*TICKET_LIST_FIELDS).iterator(chunk_size=chunk_size)
+    for chunk in _chunks(rows, chunk_size):
+        items = fast_rows(chunk, TICKET_LIST_FIELDS)
+        if with_history:
+            history = _history_by_ticket([row["id"] for row in chunk])
+            for row, item in zip(chunk, items):
+                item["history"] = history.get(row["id"], [])
+        yield items
+
+
+def stream_export(qs: QuerySet, *, fmt: str, with_history: bool = False, chunk_size: int = 2000):
+    """
+    fmt: "csv" | "ndjson"
+    Yields: str bo'laklari (har DB bo'lagi uchun bitta — kichik write lar ko'p bo'lmasin).
+
+    CSV da history bitta ustunda JSON ro'yxat sifatida; matn kataklari formula sifatida
+    bajarilmasligi uchun _csv_cell dan o'tadi.
+    """
+    columns = [*TICKET_LIST_FIELDS, *(["history"] if with_history else [])]
+
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for items in iter_export_rows(qs, with_history=with_history, chunk_size=chunk_size):
+            yield "".join(
+                writer.writerow([
+                    json.dumps(item[name]) if name == "history" else _csv_cell(item[name])
+                    for name in columns
+                ])
+                for item in items
+            )
+        return
+
+    for items in iter_export_rows(qs, with_history=with_history, chunk_size=chunk_size):
+        yield "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
@@ -0,0 +1,61 @@
+"""
+Periodik background commandlar uchun umumiy asos (sweep_sla, route_tickets).
+
+    class Command(PeriodicCommand):
+        default_interval = 60.0
+
+        def run_once(self, actor, options): ...
+
+--actor:    history da yoziladigan user (default: system actor)
+--loop:     SIGTERM/SIGINT gacha har --interval sekundda run_once
+--interval: oraliq (stop signal 1 sekund ichida seziladi)
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.outbox_worker import install_stop_signals, restore_signals
+from tickets.services import get_system_actor
+
+
+class PeriodicCommand(BaseCommand):
+    default_interval = 60.0
+
+    def add_arguments(self, parser):
+        parser.add_argument("--actor", default=None, help="Username recorded as history actor (default: system user).")
+        parser.add_argument("--loop", action="store_true", help="Run forever, once every --interval seconds.")
+        parser.add_argument("--interval", type=float, default=self.default_interval)
+
+    def handle(self, *args, **options):
+        actor = self.get_actor(options["actor"])
+        self.setup(options)
+
+        if not options["loop"]:
+            self.run_once(actor, options)
+            return
+
+        stopping = []
+        previous = install_stop_signals(lambda *a: stopping.append(True))
+        try:
+            while not stopping:
+                self.run_once(actor, options)
+                deadline = time.monotonic() + options["interval"]
+                while not stopping and time.monotonic() < deadline:
+                    time.sleep(min(1.0, options["interval"]))
+        finally:
+            restore_signals(previous)
+
+    def get_actor(self, username):
+        if not username:
+            return get_system_actor()
+        try:
+            return get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User not found: {username}")
+
+    def setup(self, options) -> None:
+        """Loop dan oldin bir marta (masalan process ichidagi router)."""
+
+    def run_once(self, actor, options) -> None:
+        raise NotImplementedError
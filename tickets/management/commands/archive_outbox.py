@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from datetime import timedelta
+
+from tickets.constants import OUTBOX_RETENTION_READ, OUTBOX_RETENTION_UNREAD
+from tickets.partitions import drop_partitions_before, ensure_monthly_partitions, is_partitioned, months_from
+from tickets.services import archive_outbox_batch
+
+
+class Command(BaseCommand):
+    help = "Move old sent/read/dead outbox rows to the archive table (or delete them) in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--read-older-than-days", type=int, default=OUTBOX_RETENTION_READ.days)
+        parser.add_argument("--unread-older-than-days", type=int, default=OUTBOX_RETENTION_UNREAD.days)
+        parser.add_argument("--delete", action="store_true", help="Delete instead of archiving.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument("--sleep", type=float, default=0.0, help="Pause between batches (seconds).")
+
+        # PostgreSQL archive partitions
+        parser.add_argument(
+            "--create-partitions",
+            type=int,
+            default=None,
+            metavar="MONTHS",
+            help="Pre-create monthly archive partitions for the next MONTHS months (PostgreSQL).",
+        )
+        parser.add_argument(
+            "--drop-archive-older-than-days",
+            type=int,
+            default=None,
+            help="Drop whole monthly archive partitions older than this (PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        self._maintain_partitions(now, options)
+
+        read_cutoff = now - timedelta(days=options["read_older_than_days"])
+        unread_cutoff = now - timedelta(days=options["unread_older_than_days"])
+
+        total = batches = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            moved = archive_outbox_batch(
+                read_cutoff=read_cutoff,
+                unread_cutoff=unread_cutoff,
+                batch_size=options["batch_size"],
+                delete=options["delete"],
+            )
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        action = "Deleted" if options["delete"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{action}: {total} notifications in {batches} batches"))
+
+    def _maintain_partitions(self, now, options):
+        wants = options["create_partitions"] is not None or options["drop_archive_older_than_days"] is not None
+        if not wants:
+            return
+
+        if not is_partitioned():
+            self.stdout.write(self.style.WARNING(
+                f"Archive table is not partitioned ({connection.vendor}); partition options ignored."
+            ))
+            return
+
+        if options["create_partitions"] is not None:
+            created = ensure_monthly_partitions(months_from(now, options["create_partitions"] + 1))
+            self.stdout.write(f"Partitions ensured: {', '.join(created)}")
+
+        if options["drop_archive_older_than_days"] is not None:
+            dropped = drop_partitions_before(now - timedelta(days=options["drop_archive_older_than_days"]))
+            self.stdout.write(f"Partitions dropped: {', '.join(dropped) or '-'}")
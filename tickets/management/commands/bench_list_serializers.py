@@ -0,0 +1,90 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tickets.models import Ticket, NotificationOutbox
+from tickets.serializers import (
+    TicketListItemSerializer,
+    NotificationListSerializer,
+    TICKET_LIST_FIELDS,
+    NOTIFICATION_LIST_FIELDS,
+    fast_rows,
+)
+
+
+def _as_row(obj, fields) -> dict:
+    # qs.values() qatori bilan bir xil: FK lar *_id ustun sifatida
+    return {name: getattr(obj, name) for name in fields}
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark: DRF list serializers vs fast_rows (per-item cost, DB siz, in-memory sahifa)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        page_size, repeat = options["page_size"], options["repeat"]
+        User = get_user_model()
+        now = timezone.now()
+
+        users = [User(id=uuid.uuid4(), username=f"bench{i}") for i in range(10)]
+        tickets = [
+            Ticket(
+                id=uuid.uuid4(),
+                title=f"Ticket {i}",
+                description="x",
+                status="open" if i % 3 else "in_progress",
+                priority="high",
+                created_by=users[i % 10],
+                assigned_to=users[(i + 1) % 10] if i % 2 else None,
+                due_at=now + timedelta(hours=i),
+                created_at=now - timedelta(minutes=i),
+                updated_at=now,
+            )
+            for i in range(page_size)
+        ]
+        notifications = [
+            NotificationOutbox(
+                id=uuid.uuid4(),
+                to_user=users[i % 10],
+                event="ticket_created",
+                payload={"ticket_id": str(tickets[i].id), "title": tickets[i].title},
+                status="sent",
+                attempts=1,
+                created_at=now - timedelta(minutes=i),
+                sent_at=now,
+            )
+            for i in range(page_size)
+        ]
+
+        cases = [
+            ("tickets", TicketListItemSerializer, tickets, TICKET_LIST_FIELDS),
+            ("notifications", NotificationListSerializer, notifications, NOTIFICATION_LIST_FIELDS),
+        ]
+        for name, serializer_cls, objects, fields in cases:
+            rows = [_as_row(obj, fields) for obj in objects]
+
+            drf_data = serializer_cls(objects, many=True).data
+            fast_data = fast_rows(rows, fields)
+            if [dict(item) for item in drf_data] != fast_data:
+                raise CommandError(f"{name}: fast_rows output differs from {serializer_cls.__name__}")
+
+            drf = self._per_item(lambda: serializer_cls(objects, many=True).data, repeat, page_size)
+            fast = self._per_item(lambda: fast_rows(rows, fields), repeat, page_size)
+            self.stdout.write(
+                f"{name:<14} page_size={page_size}  DRF {drf:7.2f} us/item   fast {fast:6.2f} us/item   "
+                f"x{drf / fast:.1f}"
+            )
+
+    def _per_item(self, fn, repeat: int, page_size: int) -> float:
+        fn()  # warm-up
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - started) / (repeat * page_size) * 1e6
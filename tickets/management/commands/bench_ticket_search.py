@@ -0,0 +1,70 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tickets.models import Ticket, TicketMessage
+from tickets.search import icontains_q, rebuild_search_index, search_tickets
+
+WORDS = (
+    "printer network vpn password reset invoice refund laptop screen battery email "
+    "outlook login timeout server database backup wifi router license upgrade crash"
+).split()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark: ?q= full-text index vs eski icontains (title/description/messages). Data rollback qilinadi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=5000)
+        parser.add_argument("--messages", type=int, default=3, help="Messages per ticket.")
+        parser.add_argument("--query", default="printer crash")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, options):
+        rnd = random.Random(42)
+        user = get_user_model().objects.create(username="bench-search", role="client")
+
+        def text(n):
+            return " ".join(rnd.choice(WORDS) for _ in range(n))
+
+        tickets = Ticket.objects.bulk_create(
+            [Ticket(created_by=user, title=text(4), description=text(30)) for _ in range(options["tickets"])],
+            batch_size=1000,
+        )
+        TicketMessage.objects.bulk_create(
+            [TicketMessage(ticket=t, author=user, body=text(20)) for t in tickets for _ in range(options["messages"])],
+            batch_size=1000,
+        )
+        rebuild_search_index()
+
+        q, repeat = options["query"], options["repeat"]
+        base = Ticket.objects.all()
+        # eski yo'l (admin search_fields kabi): har so'z alohida icontains filter (AND), messages JOIN + DISTINCT
+        legacy = base
+        for word in q.split():
+            legacy = legacy.filter(icontains_q(word))
+        legacy = legacy.distinct().order_by("-created_at")[:10]
+        indexed = search_tickets(base, q).order_by("-search_rank", "-created_at")[:10]
+
+        for name, qs in (("icontains", legacy), ("index", indexed)):
+            list(qs.all())  # warm-up
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(qs.all())
+            ms = (time.perf_counter() - started) / repeat * 1000
+            self.stdout.write(f"{name:<10} {ms:8.2f} ms/query  ({options['tickets']} tickets, q={q!r})")
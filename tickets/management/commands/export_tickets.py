@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tickets.export import EXPORT_FORMATS, stream_export
+from tickets.models import Ticket
+from tickets.selectors import apply_ticket_filters
+
+FILTER_OPTIONS = ("status", "priority", "assigned_to", "created_by", "created_from", "created_to")
+
+
+class Command(BaseCommand):
+    help = "Stream tickets (optionally with history) as CSV or NDJSON to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fmt", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--history", action="store_true", help="Include each ticket's history.")
+        parser.add_argument("--output", default="-", help="File path; '-' writes to stdout.")
+        parser.add_argument("--chunk-size", type=int, default=settings.TICKET_EXPORT_CHUNK_SIZE)
+
+        # apply_ticket_filters bilan bir xil filterlar
+        for name in FILTER_OPTIONS:
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name, default=None)
+
+    def handle(self, *args, **options):
+        params = {name: options[name] for name in FILTER_OPTIONS if options[name]}
+        qs = apply_ticket_filters(Ticket.objects.all(), params)
+        parts = stream_export(
+            qs, fmt=options["fmt"], with_history=options["history"], chunk_size=options["chunk_size"]
+        )
+
+        if options["output"] == "-":
+            for part in parts:
+                self.stdout.write(part, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as fh:
+            for part in parts:
+                fh.write(part)
+        self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}"))
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
-from tickets.services import process_outbox_batch
+from django.db import connection
+from tickets.services import process_outbox_batch, expand_fanout_jobs
+from tickets.outbox_worker import OutboxWorker, run_supervised, restore_signals
 
 
 class Command(BaseCommand):
@@ -8,7 +10,69 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--limit", type=int, default=50)
 
+        # daemon mode
+        parser.add_argument("--loop", action="store_true", help="Run as a long-lived worker until SIGTERM.")
+        parser.add_argument("--drain", action="store_true", help="Loop until the backlog is empty, then exit.")
+        parser.add_argument("--min-limit", type=int, default=10)
+        parser.add_argument("--max-limit", type=int, default=500)
+        parser.add_argument("--idle-sleep", type=float, default=0.5, help="Initial idle sleep (seconds).")
+        parser.add_argument("--max-idle-sleep", type=float, default=10.0)
+        parser.add_argument("--max-rate", type=float, default=None, help="Cap throughput (rows per second).")
+
+        # supervisor mode
+        parser.add_argument("--workers", type=int, default=1, help="Number of parallel workers.")
+        parser.add_argument("--worker-mode", choices=["thread", "process"], default="thread")
+        parser.add_argument(
+            "--shard-by-user",
+            action="store_true",
+            help="Worker i only takes rows with shard_key %% workers == i (keeps per-user ordering).",
+        )
+
     def handle(self, *args, **options):
         limit = options["limit"]
-        processed = process_outbox_batch(limit=limit)
-        self.stdout.write(self.style.SUCCESS(f"Processed: {processed} notifications"))
\ No newline at end of file
+
+        if options["loop"] or options["drain"]:
+            return self._run_worker(options)
+
+        expanded = expand_fanout_jobs()
+        if expanded:
+            self.stdout.write(f"Expanded fan-out jobs: {expanded} notifications")
+
+        processed, sent = process_outbox_batch(limit=limit)
+        self.stdout.write(self.style.SUCCESS(f"Processed: {processed} notifications ({sent} sent)"))
+
+    def _run_worker(self, options):
+        worker_kwargs = dict(
+            batch_size=options["limit"],
+            min_batch_size=options["min_limit"],
+            max_batch_size=options["max_limit"],
+            idle_sleep=options["idle_sleep"],
+            max_idle_sleep=options["max_idle_sleep"],
+            max_rate=options["max_rate"],
+            drain=options["drain"] and not options["loop"],
+        )
+
+        if options["workers"] > 1 or options["shard_by_user"]:
+            if connection.vendor == "sqlite" and options["workers"] > 1:
+                self.stderr.write(self.style.WARNING(
+                    "SQLite has no row locks (skip_locked is ignored): parallel workers will contend for the "
+                    "database lock. Use PostgreSQL for --workers > 1."
+                ))
+            stats = run_supervised(
+                workers=options["workers"],
+                mode=options["worker_mode"],
+                shard_by_user=options["shard_by_user"],
+                **worker_kwargs,
+            )
+        else:
+            worker = OutboxWorker(**worker_kwargs)
+            previous = worker.install_signal_handlers()
+            try:
+                stats = worker.run()
+            finally:
+                restore_signals(previous)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed: {stats.processed} notifications ({stats.sent} sent) in {stats.elapsed:.2f}s "
+            f"({options['workers']} workers, {stats.batches} batches, {stats.rate:.1f} rows/s)"
+        ))
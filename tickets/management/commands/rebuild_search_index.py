@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tickets.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild TicketSearchDocument rows (full-text index) from tickets and messages."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_search_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed: {written} tickets"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tickets.services import rebuild_ticket_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuild TicketCounter rows from the Ticket table (fixes drift after manual edits/imports)."
+
+    def handle(self, *args, **options):
+        changed = rebuild_ticket_counters()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled: {changed} counter rows changed"))
@@ -0,0 +1,37 @@
+from tickets.routing import build_router
+from tickets.services import ROUTING_BATCH_SIZE, route_ticket_batch
+
+from ._loop import PeriodicCommand
+
+
+class Command(PeriodicCommand):
+    help = "Auto-assign unassigned open tickets to agents (round-robin / least-loaded / priority-aware)."
+    default_interval = 5.0
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--batch-size", type=int, default=ROUTING_BATCH_SIZE)
+        parser.add_argument(
+            "--strategy",
+            default=None,
+            help="Dotted path of a routing strategy (default: settings.TICKET_ROUTING['STRATEGY']).",
+        )
+        parser.add_argument("--max-load", type=int, default=None, help="Skip agents with this many open tickets.")
+
+    def setup(self, options):
+        overrides = {} if options["max_load"] is None else {"max_load": options["max_load"]}
+        # load index shu process da yashaydi — loop davomida incremental yangilanadi
+        self.router = build_router(options["strategy"], **overrides)
+
+    def run_once(self, actor, options):
+        routed, after = 0, None
+        while True:
+            # rad etilgan ticketlar orqasidagilar ham ko'rilsin: keyset bo'yicha oldinga siljiymiz
+            _, batch_routed, after = route_ticket_batch(
+                actor=actor, router=self.router, limit=options["batch_size"], after=after
+            )
+            routed += batch_routed
+            if after is None:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Routed: {routed} tickets"))
@@ -0,0 +1,30 @@
+from tickets.services import sweep_sla_batch
+
+from ._loop import PeriodicCommand
+
+
+class Command(PeriodicCommand):
+    help = "Record SLA breaches for open tickets past due_at (bounded batches, index order)."
+    default_interval = 60.0
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--notify", action="store_true", help="Enqueue ticket_sla_breached escalations.")
+
+    def run_once(self, actor, options):
+        scanned = marked = 0
+        after = None
+        while True:
+            batch_scanned, batch_marked, after = sweep_sla_batch(
+                actor=actor,
+                after=after,
+                batch_size=options["batch_size"],
+                notify=options["notify"],
+            )
+            scanned += batch_scanned
+            marked += batch_marked
+            if after is None:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"SLA sweep: scanned {scanned} overdue tickets, marked {marked} breaches"))
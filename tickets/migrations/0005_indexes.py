@@ -0,0 +1,59 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0004_notificationoutbox_read_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(fields=['to_user', '-created_at'], name='outbox_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='outbox_pending_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['-created_at', '-id'], name='ticket_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['status', '-created_at'], name='ticket_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['priority', '-created_at'], name='ticket_priority_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['assigned_to', 'status'], name='ticket_assignee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['created_by', '-created_at'], name='ticket_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['due_at', 'created_at'], name='ticket_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tickethistory',
+            index=models.Index(fields=['ticket', 'created_at'], name='tickethist_ticket_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tickethistory',
+            index=models.Index(fields=['ticket', 'field'], name='tickethist_ticket_field_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketmessage',
+            index=models.Index(fields=['ticket', 'created_at'], name='ticketmsg_ticket_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:50
+
+import zlib
+
+from django.db import migrations, models
+
+
+def backfill_shard_keys(apps, schema_editor):
+    # tickets.services.outbox_shard_key bilan bir xil formula (OUTBOX_SHARD_SPACE = 1024)
+    NotificationOutbox = apps.get_model("tickets", "NotificationOutbox")
+    user_ids = NotificationOutbox.objects.order_by().values_list("to_user_id", flat=True).distinct()
+    for user_id in user_ids.iterator():
+        NotificationOutbox.objects.filter(to_user_id=user_id).update(
+            shard_key=zlib.crc32(user_id.bytes) % 1024,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_notificationfanout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='shard_key',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_shard_keys, migrations.RunPython.noop),
+    ]
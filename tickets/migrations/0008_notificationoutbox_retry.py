@@ -0,0 +1,43 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:55
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_next_attempt_at(apps, schema_editor):
+    # mavjud navbat FIFO tartibini saqlasin
+    NotificationOutbox = apps.get_model("tickets", "NotificationOutbox")
+    NotificationOutbox.objects.filter(status__in=["pending", "failed"]).update(
+        next_attempt_at=models.F("created_at"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0007_notificationoutbox_shard_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notificationoutbox',
+            name='outbox_pending_created_idx',
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_next_attempt_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='notificationoutbox',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed'), ('dead', 'Dead letter')], default='pending', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'failed'])), fields=['next_attempt_at'], name='outbox_due_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+ARCHIVE_TABLE = "tickets_notificationoutboxarchive"
+
+
+def partition_archive_table(apps, schema_editor):
+    """
+    PostgreSQL: archive jadvalini created_at bo'yicha RANGE partitioned qilib qayta yaratamiz.
+    Oylik partitionlarni tickets.partitions yaratadi/o'chiradi; DEFAULT — xavfsizlik uchun.
+    SQLite: oddiy jadval qoladi.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(f"ALTER TABLE {ARCHIVE_TABLE} RENAME TO {ARCHIVE_TABLE}_plain")
+    schema_editor.execute(
+        f"CREATE TABLE {ARCHIVE_TABLE} "
+        f"(LIKE {ARCHIVE_TABLE}_plain INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING INDEXES) "
+        f"PARTITION BY RANGE (created_at)"
+    )
+    schema_editor.execute(f"DROP TABLE {ARCHIVE_TABLE}_plain")
+    schema_editor.execute(f"CREATE TABLE {ARCHIVE_TABLE}_default PARTITION OF {ARCHIVE_TABLE} DEFAULT")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_notificationoutbox_retry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutboxArchive',
+            fields=[
+                ('pk', models.CompositePrimaryKey('id', 'created_at', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('id', models.UUIDField()),
+                ('event', models.CharField(max_length=64)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed'), ('dead', 'Dead letter')], max_length=16)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField()),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('to_user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(partition_archive_table, migrations.RunPython.noop),
+    ]
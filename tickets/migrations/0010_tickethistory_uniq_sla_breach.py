@@ -0,0 +1,38 @@
+# Generated by Django 5.2.11 on 2026-10-18 04:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def dedupe_sla_breaches(apps, schema_editor):
+    # Eski per-row flow (EXISTS + INSERT) parallel so'rovlarda takror yozgan bo'lishi mumkin
+    TicketHistory = apps.get_model("tickets", "TicketHistory")
+    seen = set()
+    duplicates = []
+    rows = (
+        TicketHistory.objects
+        .filter(field="sla", new_value="breached")
+        .order_by("ticket_id", "created_at")
+        .values_list("id", "ticket_id")
+    )
+    for history_id, ticket_id in rows.iterator():
+        if ticket_id in seen:
+            duplicates.append(history_id)
+        seen.add(ticket_id)
+    TicketHistory.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_notificationoutboxarchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_sla_breaches, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tickethistory',
+            constraint=models.UniqueConstraint(condition=models.Q(('field', 'sla'), ('new_value', 'breached')), fields=('ticket',), name='uniq_ticket_sla_breach'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:03
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+
+def backfill_overdue(apps, schema_editor):
+    # sla_breached_at: birinchi "sla/breached" history yozuvi; is_overdue: hozir OPEN + due_at o'tgan
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketHistory = apps.get_model("tickets", "TicketHistory")
+
+    breach = (
+        TicketHistory.objects
+        .filter(ticket=OuterRef("pk"), field="sla", new_value="breached")
+        .order_by("created_at")
+        .values("created_at")[:1]
+    )
+    Ticket.objects.filter(id__in=TicketHistory.objects.filter(field="sla", new_value="breached").values("ticket_id")) \
+        .update(sla_breached_at=Subquery(breach))
+    Ticket.objects.filter(status="open", due_at__lt=timezone.now()).update(is_overdue=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0010_tickethistory_uniq_sla_breach'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='is_overdue',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='sla_breached_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_overdue, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['-is_overdue', 'due_at', 'created_at', 'id'], name='ticket_open_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_counters(apps, schema_editor):
+    # tickets.services.rebuild_ticket_counters bilan bir xil: (assigned_to, status, is_overdue) -> count
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketCounter = apps.get_model("tickets", "TicketCounter")
+    rows = Ticket.objects.order_by().values("assigned_to_id", "status", "is_overdue").annotate(n=Count("id"))
+    TicketCounter.objects.bulk_create([
+        TicketCounter(agent_id=r["assigned_to_id"], status=r["status"], is_overdue=r["is_overdue"], count=r["n"])
+        for r in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_ticket_is_overdue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In progress'), ('resolved', 'Resolved'), ('closed', 'Closed')], max_length=16)),
+                ('is_overdue', models.BooleanField(default=False)),
+                ('count', models.IntegerField(default=0)),
+                ('agent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('agent__isnull', False)), fields=('agent', 'status', 'is_overdue'), name='uniq_ticket_counter_agent'), models.UniqueConstraint(condition=models.Q(('agent__isnull', True)), fields=('status', 'is_overdue'), name='uniq_ticket_counter_unassigned')],
+            },
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:22
+
+from itertools import islice
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+DOC_TABLE = "tickets_ticketsearchdocument"
+FTS_TABLE = "tickets_ticketsearchdocument_fts"
+
+
+def create_search_index(apps, schema_editor):
+    """
+    PostgreSQL: GENERATED tsvector ustun ('simple' config — uz/ru/en aralash matn, stemming yo'q) + GIN.
+    SQLite:     FTS5 external-content jadval; triggerlar hujjat jadvali bilan sinxron ushlaydi.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"ALTER TABLE {DOC_TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('simple', coalesce(body, '')), 'B')"
+            f") STORED"
+        )
+        schema_editor.execute(f"CREATE INDEX ticketsearch_vector_gin ON {DOC_TABLE} USING GIN (search_vector)")
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"title, body, content='{DOC_TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {DOC_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {DOC_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {DOC_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+            f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    # PostgreSQL: ustun va index jadval bilan birga o'chadi
+
+
+def backfill_documents(apps, schema_editor):
+    # tickets.search.build_document bilan bir xil: body = description + messages (xronologik)
+    # bo'lak bo'yicha: 500 ticket -> 1 ta messages query (ticket_id IN chunk) + 1 ta bulk INSERT
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketMessage = apps.get_model("tickets", "TicketMessage")
+    TicketSearchDocument = apps.get_model("tickets", "TicketSearchDocument")
+
+    rows = Ticket.objects.order_by("created_at", "id").values_list("id", "title", "description").iterator(chunk_size=500)
+    while chunk := list(islice(rows, 500)):
+        bodies = {}
+        messages = (
+            TicketMessage.objects
+            .filter(ticket_id__in=[ticket_id for ticket_id, _, _ in chunk])
+            .order_by("ticket_id", "created_at", "id")
+            .values_list("ticket_id", "body")
+        )
+        for ticket_id, body in messages:
+            bodies.setdefault(ticket_id, []).append(body)
+
+        TicketSearchDocument.objects.bulk_create([
+            TicketSearchDocument(
+                ticket_id=ticket_id, title=title, body="\n".join([description, *bodies.get(ticket_id, [])]),
+            )
+            for ticket_id, title, description in chunk
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0012_ticketcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=180)),
+                ('body', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='tickets.ticket')),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
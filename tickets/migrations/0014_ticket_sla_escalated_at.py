@@ -0,0 +1,38 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:49
+
+from django.db import migrations, models
+from django.utils import timezone
+
+ESCALATION_EVENT = "ticket_sla_breached"
+
+
+def backfill_escalated_at(apps, schema_editor):
+    # allaqachon escalation yuborilgan ticketlar (outbox + archive) — sweep_sla --notify takrorlamasin
+    # (aniq vaqt emas — migration payti; muhimi "yuborilgan" belgisi)
+    Ticket = apps.get_model("tickets", "Ticket")
+    escalated = set()
+    for model_name in ("NotificationOutbox", "NotificationOutboxArchive"):
+        rows = apps.get_model("tickets", model_name).objects.filter(event=ESCALATION_EVENT)
+        for payload in rows.values_list("payload", flat=True).iterator(chunk_size=1000):
+            if (payload or {}).get("ticket_id"):
+                escalated.add(payload["ticket_id"])
+
+    now, ids = timezone.now(), sorted(escalated)
+    for start in range(0, len(ids), 500):
+        Ticket.objects.filter(id__in=ids[start:start + 500]).update(sla_escalated_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0013_ticketsearchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='sla_escalated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_escalated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0014_ticket_sla_escalated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationfanout',
+            name='last_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AlterField(
+            model_name='notificationfanout',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=16),
+        ),
+    ]
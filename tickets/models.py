@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class TicketPriority(models.TextChoices):
@@ -24,6 +25,8 @@ class Ticket(models.Model):
     - assigned_to nullable (claim/assign flow)
     - status flow (open -> in_progress -> resolved -> closed)
     - resolved_at separate field (reporting uchun)
+    - is_overdue / sla_breached_at denormalized: services + sweep_sla yuritadi,
+      agent queue now() ga qarab hisoblamaydi — index bo'yicha o'qiydi
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
@@ -53,9 +56,39 @@ class Ticket(models.Model):
     resolved_at = models.DateTimeField(null=True, blank=True)
     due_at = models.DateTimeField(null=True, blank=True)
 
+    # faqat OPEN paytida True (claim/assign/status change tozalaydi)
+    is_overdue = models.BooleanField(default=False)
+    # birinchi marta SLA buzilgan payt (reporting uchun, tozalanmaydi)
+    sla_breached_at = models.DateTimeField(null=True, blank=True)
+    # breach escalation yuborilgan payt (sweep_sla --notify); history qatoridan mustaqil —
+    # breach qaysi yo'l bilan yozilgan bo'lsa ham (queue read, flag, sweep) escalation bir marta
+    sla_escalated_at = models.DateTimeField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # selectors.py dagi query shakllariga mos (apply_ticket_filters, agent_queue_qs)
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="ticket_created_id_idx"),
+            models.Index(fields=["status", "-created_at"], name="ticket_status_created_idx"),
+            models.Index(fields=["priority", "-created_at"], name="ticket_priority_created_idx"),
+            models.Index(fields=["assigned_to", "status"], name="ticket_assignee_status_idx"),
+            models.Index(fields=["created_by", "-created_at"], name="ticket_creator_created_idx"),
+            # SLA sweep / overdue flag: faqat OPEN ticketlar, due_at bo'yicha
+            models.Index(
+                fields=["due_at", "created_at"],
+                condition=models.Q(status="open"),
+                name="ticket_open_due_idx",
+            ),
+            # agent_queue_qs ordering bilan bir xil (AGENT_QUEUE_KEYS) — sortsiz index scan
+            models.Index(
+                fields=["-is_overdue", "due_at", "created_at", "id"],
+                condition=models.Q(status="open"),
+                name="ticket_open_queue_idx",
+            ),
+        ]
+
 
 class TicketMessage(models.Model):
     """
@@ -67,6 +100,11 @@ class TicketMessage(models.Model):
     body = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["ticket", "created_at"], name="ticketmsg_ticket_created_idx"),
+        ]
+
 
 class TicketHistory(models.Model):
     """
@@ -86,6 +124,73 @@ class TicketHistory(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["ticket", "created_at"], name="tickethist_ticket_created_idx"),
+            # _record_sla_breaches: ticket_id IN (...) AND field="sla"
+            models.Index(fields=["ticket", "field"], name="tickethist_ticket_field_idx"),
+        ]
+        constraints = [
+            # SLA breach har ticket uchun faqat 1 marta (parallel queue o'qishlarida ham)
+            models.UniqueConstraint(
+                fields=["ticket"],
+                condition=models.Q(field="sla", new_value="breached"),
+                name="uniq_ticket_sla_breach",
+            ),
+        ]
+
+
+class TicketSearchDocument(models.Model):
+    """
+    Full-text search hujjati (ticket bo'yicha 1 ta): title + description + messages.
+    services.py yuritadi (create_ticket, add_message); manage.py rebuild_search_index — noldan.
+
+    Index DB ga qarab (migration 0013, tickets/search.py):
+      - PostgreSQL: search_vector (GENERATED tsvector, title=A / body=B) + GIN index
+      - SQLite:     FTS5 external-content jadval + triggerlar
+    Integer PK — FTS5 content_rowid uchun (implicit rowid VACUUM da o'zgarishi mumkin).
+    """
+    ticket = models.OneToOneField(Ticket, on_delete=models.CASCADE, related_name="search_document")
+    title = models.CharField(max_length=180)
+    body = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class TicketCounter(models.Model):
+    """
+    Denormalized summary: (agent, status, is_overdue) -> nechta ticket.
+    Dashboard count lari uchun — COUNT(*) o'rniga bir necha kichik qator o'qiladi.
+
+    services.py (create/claim/assign/change_status/overdue flag) delta bilan yangilaydi,
+    manage.py reconcile_ticket_counters noldan qayta hisoblaydi.
+    agent = NULL -> unassigned ticketlar.
+    """
+    agent = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    status = models.CharField(max_length=16, choices=TicketStatus.choices)
+    is_overdue = models.BooleanField(default=False)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # NULL lar UNIQUE da teng hisoblanmaydi — unassigned uchun alohida constraint
+            models.UniqueConstraint(
+                fields=["agent", "status", "is_overdue"],
+                condition=models.Q(agent__isnull=False),
+                name="uniq_ticket_counter_agent",
+            ),
+            models.UniqueConstraint(
+                fields=["status", "is_overdue"],
+                condition=models.Q(agent__isnull=True),
+                name="uniq_ticket_counter_unassigned",
+            ),
+        ]
+
 
 #==========================
 # second adding
@@ -93,7 +198,8 @@ class TicketHistory(models.Model):
 class NotificationStatus(models.TextChoices):
     PENDING = "pending", "Pending"
     SENT = "sent", "Sent"
-    FAILED = "failed", "Failed"
+    FAILED = "failed", "Failed"  # retry kutmoqda (next_attempt_at)
+    DEAD = "dead", "Dead letter"  # max attempts tugadi, qo'lda ko'rib chiqiladi
 
 
 class NotificationOutbox(models.Model):
@@ -118,12 +224,93 @@ class NotificationOutbox(models.Model):
     status = models.CharField(max_length=16, choices=NotificationStatus.choices, default=NotificationStatus.PENDING)
     attempts = models.PositiveIntegerField(default=0)
 
+    # hash(to_user_id) % OUTBOX_SHARD_SPACE — sharded workerlar uchun (bitta user = bitta shard)
+    shard_key = models.PositiveSmallIntegerField(default=0)
+
     last_error = models.TextField(blank=True, default="")
+    # worker faqat next_attempt_at <= now bo'lgan PENDING/FAILED qatorlarni oladi (backoff)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
     read_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     sent_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # NotificationListView: to_user bo'yicha, yangilari birinchi
+            models.Index(fields=["to_user", "-created_at"], name="outbox_user_created_idx"),
+            # process_outbox_batch: faqat yuborilishi kerak bo'lgan (due) qatorlar
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status__in=["pending", "failed"]),
+                name="outbox_due_idx",
+            ),
+        ]
+
+
+class FanoutStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
+class NotificationFanout(models.Model):
+    """
+    Deferred broadcast: bitta event -> audience (masalan barcha agentlar).
+
+    create_ticket har bir agent uchun qator yozish o'rniga 1 ta job yozadi (O(1)),
+    worker (process_outbox) keyinroq uni NotificationOutbox qatorlariga expand qiladi.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    audience = models.CharField(max_length=32)  # e.g. "agents"
+    event = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+
+    status = models.CharField(max_length=16, choices=FanoutStatus.choices, default=FanoutStatus.PENDING)
+    recipients_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(status="pending"),
+                name="fanout_pending_created_idx",
+            ),
+        ]
 
 
+class NotificationOutboxArchive(models.Model):
+    """
+    Eski (sent/read/dead) outbox qatorlari shu yerga ko'chiriladi — hot jadval kichik qoladi.
+    manage.py archive_outbox
+
+    PostgreSQL da jadval created_at bo'yicha oylik RANGE partitionlarga bo'lingan
+    (migration 0009), shuning uchun PK ga created_at ham kiradi.
+    """
+    pk = models.CompositePrimaryKey("id", "created_at")
+    id = models.UUIDField()
+
+    # archive — FK constraint/cascade shart emas (partitionlar ham yengil bo'ladi)
+    to_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+",
+    )
+    event = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+
+    status = models.CharField(max_length=16, choices=NotificationStatus.choices)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField()
+    sent_at = models.DateTimeField(null=True, blank=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
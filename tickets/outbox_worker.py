@@ -0,0 +1,372 @@
+"""
+Long-running outbox worker (manage.py process_outbox --loop).
+
+Cron har tickda Django ni qayta ko'taradi; bu worker esa bitta process ichida
+process_outbox_batch ni aylantiradi:
+  - backlog katta bo'lsa batch kattalashadi, kichik bo'lsa kichrayadi
+  - ish bo'lmasa sleep eksponensial uzayadi (idle backoff)
+  - SIGTERM/SIGINT -> joriy batch tugaydi, keyin chiqadi
+  - max_rate -> rows/second limiti (provider rate limit uchun)
+
+run_supervised() esa N ta workerni (thread yoki process) parallel ishga tushiradi.
+
+PostgreSQL + settings.OUTBOX_NOTIFY_CHANNEL: idle paytida sleep o'rniga LISTEN da
+bloklanamiz — enqueue dagi NOTIFY workerni darhol uyg'otadi (polling yo'q).
+"""
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DatabaseError, connection, connections
+
+from .services import process_outbox_batch, expand_fanout_jobs
+
+logger = logging.getLogger(__name__)
+
+
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+def install_stop_signals(handler) -> dict:
+    """
+    SIGTERM/SIGINT -> handler. Oldingi handlerlarni qaytaradi (restore qilish uchun).
+    signal faqat main thread da o'rnatiladi.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return {}
+    return {sig: signal.signal(sig, handler) for sig in STOP_SIGNALS}
+
+
+def restore_signals(previous: dict) -> None:
+    for sig, handler in previous.items():
+        signal.signal(sig, handler)
+
+
+#==========================
+# idle waiters
+#==========================
+class PollingWaiter:
+    """Oddiy sleep (SQLite / NOTIFY o'chirilgan). stop() kelsa darhol uyg'onadi."""
+    def __init__(self, stop_event: threading.Event):
+        self.stop_event = stop_event
+
+    def wait(self, timeout: float) -> bool:
+        self.stop_event.wait(timeout)
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class PgListenWaiter:
+    """
+    Alohida psycopg 3 connection da LISTEN <channel>.
+    wait() NOTIFY kelsa (True) yoki timeout da (False) qaytadi.
+    Connection uzilsa (OperationalError) — qayta ulanib LISTEN qilamiz va False qaytaramiz:
+    worker baribir bitta batch qiladi, uzilish paytidagi NOTIFY lar yo'qolmaydi.
+    """
+    # stop() ni tekshirib turish uchun notifies() ni qisqa bo'laklarda chaqiramiz
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, stop_event: threading.Event, channel: str):
+        self.stop_event = stop_event
+        self.channel = channel
+        self.conn = None
+        self._connect()
+
+    def _connect(self) -> None:
+        from psycopg import sql
+
+        self.conn = connection.get_new_connection(connection.get_connection_params())
+        self.conn.autocommit = True
+        self.conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+
+    def _reconnect(self) -> None:
+        self.close()
+        try:
+            self._connect()
+        except Exception:
+            # DB hali ko'tarilmagan — keyingi wait() da yana urinamiz
+            logger.exception("Outbox LISTEN reconnect failed")
+            self.conn = None
+
+    def wait(self, timeout: float) -> bool:
+        from psycopg import OperationalError
+
+        if self.conn is None:
+            self._reconnect()
+            if self.conn is None:
+                self.stop_event.wait(timeout)
+            return False
+
+        deadline = time.monotonic() + timeout
+        while not self.stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            notified = False
+            try:
+                for _ in self.conn.notifies(timeout=min(self.CHECK_INTERVAL, remaining), stop_after=1):
+                    notified = True
+            except OperationalError:
+                logger.warning("Outbox LISTEN connection lost, reconnecting")
+                self._reconnect()
+                return False
+            if notified:
+                return True
+        return False
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def make_waiter(stop_event: threading.Event):
+    channel = getattr(settings, "OUTBOX_NOTIFY_CHANNEL", "")
+    if channel and connection.vendor == "postgresql":
+        return PgListenWaiter(stop_event, channel)
+    return PollingWaiter(stop_event)
+
+
+class WorkerStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.finished = None
+        self.processed = 0  # urinilgan (sent + failed) qatorlar
+        self.sent = 0
+        self.batches = 0
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rate(self) -> float:
+        """Throughput: rows per second."""
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        *,
+        batch_size: int = 50,
+        min_batch_size: int = 10,
+        max_batch_size: int = 500,
+        idle_sleep: float = 0.5,
+        max_idle_sleep: float = 10.0,
+        max_rate: float = None,
+        drain: bool = False,
+        shard=None,
+    ):
+        self.min_batch_size = max(1, min_batch_size)
+        self.max_batch_size = max(self.min_batch_size, max_batch_size)
+        self.batch_size = min(self.max_batch_size, max(self.min_batch_size, batch_size))
+
+        self.idle_sleep = idle_sleep
+        self.max_idle_sleep = max(idle_sleep, max_idle_sleep)
+        self._current_idle_sleep = idle_sleep
+
+        self.max_rate = max_rate
+        self.drain = drain  # True: backlog tugasa chiqadi (benchmark / one-off drain)
+        self.shard = shard  # (index, total) yoki None
+
+        self.stats = WorkerStats()
+        self._stop = threading.Event()
+        self._waiter = PollingWaiter(self._stop)
+
+    # -------------------------
+    # lifecycle
+    # -------------------------
+    def stop(self, *args) -> None:
+        self._stop.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def install_signal_handlers(self) -> dict:
+        return install_stop_signals(self.stop)
+
+    def sleep(self, seconds: float) -> None:
+        # time.sleep emas: stop() kelganda darhol uyg'onamiz
+        if seconds > 0:
+            self._stop.wait(seconds)
+
+    # -------------------------
+    # work
+    # -------------------------
+    def run_once(self) -> int:
+        expand_fanout_jobs()
+
+        started = time.monotonic()
+        # attempted: hammasi yiqilgan batch ham backlog — kichraytirmaymiz, idle ga o'tmaymiz
+        processed, sent = process_outbox_batch(limit=self.batch_size, shard=self.shard)
+
+        self.stats.batches += 1
+        self.stats.processed += processed
+        self.stats.sent += sent
+        self._adapt(processed)
+        self._throttle(processed, time.monotonic() - started)
+        return processed
+
+    def _adapt(self, processed: int) -> None:
+        if processed >= self.batch_size:
+            # batch to'la keldi -> backlog bor, kattalashtiramiz
+            self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+        elif processed < self.batch_size // 2:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+
+        if processed:
+            self._current_idle_sleep = self.idle_sleep
+
+    def _throttle(self, processed: int, took: float) -> None:
+        if not self.max_rate or not processed:
+            return
+        min_duration = processed / self.max_rate
+        self.sleep(min_duration - took)
+
+    def _idle(self) -> None:
+        if self._waiter.wait(self._current_idle_sleep):
+            # NOTIFY keldi -> yangi ish bor, backoff ni reset qilamiz
+            self._current_idle_sleep = self.idle_sleep
+        else:
+            self._current_idle_sleep = min(self.max_idle_sleep, self._current_idle_sleep * 2)
+
+    def run(self) -> WorkerStats:
+        # LISTEN birinchi batch dan OLDIN — oradagi NOTIFY yo'qolmasin
+        if not self.drain:
+            self._waiter = make_waiter(self._stop)
+        try:
+            self._loop()
+        finally:
+            self._waiter.close()
+
+        self.stats.finished = time.monotonic()
+        return self.stats
+
+    def _loop(self) -> None:
+        while not self.stopping:
+            try:
+                processed = self.run_once()
+            except DatabaseError:
+                # lock timeout / connection drop: batch rollback bo'ldi, keyinroq qayta urinamiz
+                logger.exception("Outbox batch failed")
+                connection.close_if_unusable_or_obsolete()
+                if self.drain:
+                    break
+                self._idle()
+                continue
+
+            if processed:
+                continue
+            if self.drain:
+                break
+            self._idle()
+
+
+#==========================
+# supervisor (N workers)
+#==========================
+def _worker_kwargs(index: int, workers: int, shard_by_user: bool, worker_kwargs: dict) -> dict:
+    kwargs = dict(worker_kwargs)
+    if shard_by_user:
+        kwargs["shard"] = (index, workers)
+    return kwargs
+
+
+def _thread_main(worker: OutboxWorker) -> WorkerStats:
+    try:
+        return worker.run()
+    finally:
+        # har thread o'z DB connectionini ochadi — yopib ketamiz
+        connection.close()
+
+
+def _process_main(kwargs: dict, results) -> None:
+    worker = OutboxWorker(**kwargs)
+    worker.install_signal_handlers()
+    try:
+        stats = worker.run()
+    finally:
+        connections.close_all()
+    results.put((stats.processed, stats.sent, stats.batches))
+
+
+def run_supervised(*, workers: int, mode: str = "thread", shard_by_user: bool = False, **worker_kwargs) -> WorkerStats:
+    """
+    N ta worker: har biri select_for_update(skip_locked=True) bilan alohida batch oladi.
+    shard_by_user=True -> worker i faqat shard_key % N == i qatorlarni oladi.
+
+    mode:
+      - "thread":  bitta process, N thread (I/O-bound delivery uchun yetarli)
+      - "process": N ta fork qilingan process (CPU-bound yoki GIL dan qochish uchun)
+
+    Returns: umumiy (combined) stats — throughput = jami rows / wall time.
+    """
+    workers = max(1, workers)
+    combined = WorkerStats()
+
+    if mode == "thread":
+        pool = [OutboxWorker(**_worker_kwargs(i, workers, shard_by_user, worker_kwargs)) for i in range(workers)]
+
+        def stop_all(*args):
+            for w in pool:
+                w.stop()
+
+        previous = install_stop_signals(stop_all)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outbox-worker") as executor:
+                for stats in executor.map(_thread_main, pool):
+                    combined.processed += stats.processed
+                    combined.sent += stats.sent
+                    combined.batches += stats.batches
+        finally:
+            restore_signals(previous)
+
+    elif mode == "process":
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+
+        # fork dan oldin: ochiq DB socketlar childlarga meros qolmasin
+        connections.close_all()
+        procs = [
+            ctx.Process(
+                target=_process_main,
+                args=(_worker_kwargs(i, workers, shard_by_user, worker_kwargs), results),
+                name=f"outbox-worker-{i}",
+            )
+            for i in range(workers)
+        ]
+
+        def stop_all(*args):
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()  # SIGTERM -> child batchni tugatib chiqadi
+
+        for p in procs:
+            p.start()
+
+        previous = install_stop_signals(stop_all)
+        try:
+            for p in procs:
+                p.join()
+        finally:
+            restore_signals(previous)
+
+        while not results.empty():
+            processed, sent, batches = results.get()
+            combined.processed += processed
+            combined.sent += sent
+            combined.batches += batches
+
+    else:
+        raise ValueError(f"Unknown worker mode: {mode}")
+
+    combined.finished = time.monotonic()
+    return combined
@@ -0,0 +1,112 @@
+"""
+PostgreSQL monthly partitions for NotificationOutboxArchive (created_at bo'yicha RANGE).
+
+- ensure_monthly_partitions: kerakli oylar uchun partition (CREATE TABLE IF NOT EXISTS ... PARTITION OF)
+- drop_partitions_before:   butun oyni DETACH + DROP (DELETE emas — bir zumda, vacuum yo'q)
+
+SQLite / partitionlanmagan jadvalda hammasi no-op.
+"""
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
+
+from .models import NotificationOutboxArchive
+
+ARCHIVE_TABLE = NotificationOutboxArchive._meta.db_table
+PARTITION_NAME_RE = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def _month_start(value: datetime) -> datetime:
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _next_month(value: datetime) -> datetime:
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def months_from(start: datetime, count: int) -> list:
+    """start oyidan boshlab count ta oy boshlari."""
+    months, month = [], _month_start(start)
+    for _ in range(count):
+        months.append(month)
+        month = _next_month(month)
+    return months
+
+
+def partition_name(month: datetime, table: str = ARCHIVE_TABLE) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(table: str = ARCHIVE_TABLE) -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [table],
+        )
+        return cur.fetchone() is not None
+
+
+def ensure_monthly_partitions(months, table: str = ARCHIVE_TABLE) -> list:
+    """
+    months: datetime lar (istalgan kun) — har biri uchun oy partitioni bo'lishini ta'minlaydi.
+    Returns: tekshirilgan partition nomlari.
+    """
+    if not is_partitioned(table):
+        return []
+
+    names = []
+    with connection.cursor() as cur:
+        for start in sorted({_month_start(m) for m in months}):
+            name = partition_name(start, table)
+            cur.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                [start, _next_month(start)],
+            )
+            names.append(name)
+    return names
+
+
+def list_partitions(table: str = ARCHIVE_TABLE) -> list:
+    if not is_partitioned(table):
+        return []
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [table],
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+def drop_partitions_before(cutoff: datetime, table: str = ARCHIVE_TABLE) -> list:
+    """
+    Butunlay cutoff dan oldin tugaydigan oylik partitionlarni o'chiradi.
+    Returns: o'chirilgan partition nomlari.
+    """
+    dropped = []
+    for name in list_partitions(table):
+        match = PARTITION_NAME_RE.search(name)
+        if not match:
+            continue  # DEFAULT partition va h.k.
+
+        start = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc)
+        if _next_month(start) > cutoff:
+            continue
+
+        with connection.cursor() as cur:
+            cur.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            cur.execute(f"DROP TABLE {name}")
+        dropped.append(name)
+    return dropped
@@ -0,0 +1,249 @@
+"""
+Ticket auto-assignment (routing): yangi OPEN ticketlar agentlarga avtomatik taqsimlanadi.
+
+settings.TICKET_ROUTING = {
+    "MODE": "off",          # off | inline (create_ticket ichida) | background (manage.py route_tickets)
+    "STRATEGY": "tickets.routing.LeastLoadedStrategy",
+    "OPTIONS": {
+        "max_load": 0,           # agentda shuncha ochiq ticket bo'lsa — yangisi berilmaydi (0 -> cheksiz)
+        "refresh_seconds": 30,   # load index DB dan qayta o'qilish oralig'i
+    },
+}
+
+Bu modul faqat "kimga?" savoliga javob beradi (DB ga yozmaydi). Yozish services.py da:
+  - inline:     create_ticket -> route_new_ticket (ticket hali o'zimizniki, lock yo'q)
+  - background: route_ticket_batch (select_for_update(skip_locked=True) — claim qilinayotgan
+                qatorlarni kutmaydi, ularni keyingi batch ga qoldiradi)
+
+AgentLoadIndex — process ichidagi xotira: agentlar ro'yxati + ochiq (open/in_progress)
+assigned ticketlar soni. TicketCounter dan o'qiladi (Ticket jadvali emas, 2 ta kichik query),
+har assignment COMMIT bo'lgandan keyin (transaction.on_commit) xotirada +1 — rollback bo'lgan
+assignment index ni shishirmaydi. Har refresh_seconds da to'liq qayta o'qiladi (boshqa process lar,
+claim/resolve lar shunda hisobga kiradi); DB o'qish lock dan tashqarida, keyin yangi ro'yxat
+lock ostida almashtiriladi — boshqa request lar refresh ni kutmaydi.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils.module_loading import import_string
+
+from users.models import UserRole
+from .models import TicketCounter, TicketPriority, TicketStatus
+
+ROUTING_MODES = ("off", "inline", "background")
+DEFAULT_ROUTING_STRATEGY = "tickets.routing.LeastLoadedStrategy"
+
+# agent "band" hisoblanadigan statuslar
+OPEN_LOAD_STATUSES = (TicketStatus.OPEN, TicketStatus.IN_PROGRESS)
+
+
+def routing_config() -> dict:
+    return getattr(settings, "TICKET_ROUTING", {})
+
+
+def routing_mode() -> str:
+    return routing_config().get("MODE", "off")
+
+
+#==========================
+# load index
+#==========================
+class AgentLoadIndex:
+    """
+    agents: active agent id lari (barqaror tartib — round-robin uchun)
+    load:   {agent_id: ochiq assigned ticketlar soni}
+    """
+    def __init__(self, *, refresh_seconds: float = 30.0):
+        self.refresh_seconds = refresh_seconds
+        self.agents = []
+        self.load = {}
+        self.refreshed_at = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def read():
+        """DB dan (lock siz): (agents, load)."""
+        from django.contrib.auth import get_user_model
+
+        agents = sorted(
+            get_user_model().objects.filter(role=UserRole.AGENT, is_active=True).values_list("id", flat=True),
+            key=str,
+        )
+        rows = (
+            TicketCounter.objects
+            .filter(agent_id__in=agents, status__in=OPEN_LOAD_STATUSES)
+            .values("agent_id")
+            .annotate(n=Sum("count"))
+            .values_list("agent_id", "n")
+        )
+        load = dict.fromkeys(agents, 0)
+        load.update(rows)
+        return agents, load
+
+    def refresh(self) -> None:
+        agents, load = self.read()
+        with self.lock:
+            self.agents, self.load = agents, load
+            self.refreshed_at = time.monotonic()
+            self.refreshing = False
+
+    def refresh_if_stale(self) -> None:
+        with self.lock:
+            stale = self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.refresh_seconds
+            # bittasi refresh qilayotgan bo'lsa, qolganlar eski ro'yxat bilan davom etadi
+            # (birinchi marta esa ro'yxat bo'sh — hammasi o'zi o'qiydi)
+            if not stale or (self.refreshing and self.refreshed_at is not None):
+                return
+            self.refreshing = True
+        try:
+            self.refresh()
+        finally:
+            self.refreshing = False
+
+    def assigned(self, agent_id, n: int = 1) -> None:
+        """Commit bo'lgan assignment (transaction.on_commit dan)."""
+        with self.lock:
+            self.load[agent_id] = self.load.get(agent_id, 0) + n
+
+
+class _PendingLoad:
+    """index + shu transaction da hali commit bo'lmagan assignmentlar (strategy uchun ko'rinish)."""
+    def __init__(self, index: AgentLoadIndex, pending: dict):
+        self.agents = index.agents
+        self.load = index.load
+        if pending:
+            self.load = {agent_id: n + pending.get(agent_id, 0) for agent_id, n in index.load.items()}
+
+
+#==========================
+# strategies
+#==========================
+class BaseRoutingStrategy:
+    """
+    choose(ticket, index) -> agent_id | None  (None -> ticket queue da qoladi)
+    ticket: Ticket yoki dict ("priority" kerak). Index lock ostida chaqiriladi.
+    """
+    def __init__(self, *, max_load: int = 0, **options):
+        self.max_load = max(0, int(max_load))
+        self.options = options
+
+    def available(self, index: AgentLoadIndex) -> list:
+        if not self.max_load:
+            return list(index.agents)
+        return [agent_id for agent_id in index.agents if index.load.get(agent_id, 0) < self.max_load]
+
+    @staticmethod
+    def least_loaded(candidates, index: AgentLoadIndex):
+        # teng bo'lsa — id bo'yicha birinchisi (deterministik)
+        if not candidates:
+            return None
+        return min(candidates, key=lambda agent_id: (index.load.get(agent_id, 0), str(agent_id)))
+
+    def choose(self, ticket, index: AgentLoadIndex):
+        raise NotImplementedError
+
+
+class RoundRobinStrategy(BaseRoutingStrategy):
+    """Agentlar navbat bilan (max_load ga yetganlar o'tkazib yuboriladi)."""
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.last = None
+
+    def next_after_last(self, candidates):
+        if not candidates:
+            return None
+        # oxirgi tanlangandan keyingisi (refresh da agentlar ro'yxati o'zgargan bo'lsa ham ishlaydi)
+        after = [agent_id for agent_id in candidates if self.last is not None and str(agent_id) > str(self.last)]
+        self.last = (after or candidates)[0]
+        return self.last
+
+    def choose(self, ticket, index):
+        return self.next_after_last(self.available(index))
+
+
+class LeastLoadedStrategy(BaseRoutingStrategy):
+    """Eng kam ochiq ticketi bor agent."""
+    def choose(self, ticket, index):
+        return self.least_loaded(self.available(index), index)
+
+
+class PriorityAwareStrategy(RoundRobinStrategy):
+    """
+    urgent/high -> eng bo'sh agent (max_load to'lgan bo'lsa ham — queue da kutib qolmasin)
+    medium/low  -> round-robin, lekin faqat yuklamasi o'rtachadan oshmagan agentlarga
+                   (bo'shroq agentlar shoshilinch ticketlar uchun qoladi)
+    """
+    URGENT_PRIORITIES = (TicketPriority.URGENT, TicketPriority.HIGH)
+
+    def choose(self, ticket, index):
+        priority = ticket["priority"] if isinstance(ticket, dict) else ticket.priority
+        candidates = self.available(index)
+
+        if priority in self.URGENT_PRIORITIES:
+            return self.least_loaded(candidates or index.agents, index)
+
+        if not candidates:
+            return None
+        average = sum(index.load.get(agent_id, 0) for agent_id in candidates) / len(candidates)
+        return self.next_after_last([agent_id for agent_id in candidates if index.load.get(agent_id, 0) <= average])
+
+
+#==========================
+# process-level router
+#==========================
+class Router:
+    """strategy + index (inline rejimda bir nechta request thread lari)."""
+    def __init__(self, strategy: BaseRoutingStrategy, index: AgentLoadIndex):
+        self.strategy = strategy
+        self.index = index
+
+    def pick(self, ticket, pending: dict = None):
+        """
+        Agent tanlaydi, lekin load ni o'zgartirmaydi: chaqiruvchi commit dan keyin assigned() qiladi.
+        pending: shu transaction da allaqachon berilganlar ({agent_id: n}) — batch ichida hisobga olinadi.
+        """
+        self.index.refresh_if_stale()
+        with self.index.lock:
+            return self.strategy.choose(ticket, _PendingLoad(self.index, pending))
+
+    def assigned_on_commit(self, counts: dict) -> None:
+        """{agent_id: n} — transaction commit bo'lsa index ga qo'shiladi (rollback -> hech narsa)."""
+        counts = {agent_id: n for agent_id, n in counts.items() if n}
+        if counts:
+            transaction.on_commit(lambda: self._assigned(counts))
+
+    def _assigned(self, counts: dict) -> None:
+        for agent_id, n in counts.items():
+            self.index.assigned(agent_id, n)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def build_router(strategy_path: str = None, **overrides) -> Router:
+    config = routing_config()
+    options = {**config.get("OPTIONS", {}), **overrides}
+    refresh_seconds = float(options.pop("refresh_seconds", 30.0))
+    strategy_cls = import_string(strategy_path or config.get("STRATEGY", DEFAULT_ROUTING_STRATEGY))
+    return Router(strategy_cls(**options), AgentLoadIndex(refresh_seconds=refresh_seconds))
+
+
+def get_router() -> Router:
+    """Process bo'yicha bitta router (index request lar orasida saqlanadi)."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = build_router()
+        return _router
+
+
+def reset_router() -> None:
+    """Settings o'zgarganda / testlarda: keyingi get_router() yangisini quradi."""
+    global _router
+    with _router_lock:
+        _router = None
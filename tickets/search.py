@@ -0,0 +1,123 @@
+"""
+Ticket full-text search (GET /api/tickets/?q=...).
+
+TicketSearchDocument (ticket bo'yicha 1 ta hujjat: title + description + messages) ustida:
+  - PostgreSQL: search_vector @@ websearch_to_tsquery('simple', q), GIN index; rank = ts_rank
+  - SQLite:     FTS5 MATCH (external content jadval); rank = -bm25 (title og'irroq)
+  - boshqa DB:  icontains (index yo'q — faqat moslik uchun)
+
+Hujjatni services.py yuritadi: create_ticket -> index_ticket, add_message -> append_message.
+"""
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat
+
+from .models import Ticket, TicketSearchDocument
+
+DOC_TABLE = TicketSearchDocument._meta.db_table
+FTS_TABLE = f"{DOC_TABLE}_fts"
+TICKET_TABLE = Ticket._meta.db_table
+
+# FTS5 bm25 ustun og'irliklari (title, body); Postgres da setweight A/B
+FTS_TITLE_WEIGHT = 10.0
+FTS_BODY_WEIGHT = 1.0
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+#==========================
+# index maintenance
+#==========================
+def build_document(ticket, message_bodies=()) -> TicketSearchDocument:
+    return TicketSearchDocument(
+        ticket_id=ticket.id,
+        title=ticket.title,
+        body="\n".join([ticket.description, *message_bodies]),
+    )
+
+
+def index_ticket(ticket) -> None:
+    """Yangi ticket uchun hujjat (create_ticket ichida)."""
+    build_document(ticket).save()
+
+
+def append_message(ticket_id, body: str) -> None:
+    """add_message ichida: hujjat body siga yangi message qo'shiladi (1 ta UPDATE)."""
+    TicketSearchDocument.objects.filter(ticket_id=ticket_id).update(body=Concat(F("body"), Value("\n"), Value(body)))
+
+
+def rebuild_search_index(*, batch_size: int = 500) -> int:
+    """
+    Hamma hujjatlarni noldan yozadi (servicelarni chetlab o'tgan import/edit lardan keyin).
+    Returns: yozilgan hujjatlar soni.
+    """
+    TicketSearchDocument.objects.all().delete()
+
+    written, batch = 0, []
+    tickets = Ticket.objects.order_by("created_at", "id").prefetch_related("messages")
+    for ticket in tickets.iterator(chunk_size=batch_size):
+        bodies = [m.body for m in sorted(ticket.messages.all(), key=lambda m: (m.created_at, m.id))]
+        batch.append(build_document(ticket, bodies))
+        if len(batch) >= batch_size:
+            TicketSearchDocument.objects.bulk_create(batch)
+            written, batch = written + len(batch), []
+
+    TicketSearchDocument.objects.bulk_create(batch)
+    return written + len(batch)
+
+
+#==========================
+# querying
+#==========================
+def _fts5_query(q: str) -> str:
+    # foydalanuvchi matnini FTS5 sintaksisiga aylantirmaymiz: har so'z "..." (AND), xato sintaksis yo'q
+    return " ".join(f'"{token}"' for token in TOKEN_RE.findall(q))
+
+
+def icontains_q(q: str) -> Q:
+    """Eski yo'l (admin search_fields kabi) — benchmark va index yo'q DB lar uchun."""
+    return Q(title__icontains=q) | Q(description__icontains=q) | Q(messages__body__icontains=q)
+
+
+def search_tickets(qs: QuerySet, q: str) -> QuerySet:
+    """
+    qs ni q bo'yicha filterlaydi va search_rank (katta = mosroq) annotate qiladi.
+    Bo'sh / faqat belgilardan iborat q -> bo'sh natija.
+
+    Hujjat (va SQLite da FTS jadval) JOIN qilinadi — rank shu qatordan hisoblanadi
+    (correlated subquery har qator uchun FTS so'rovini qayta bajargan bo'lardi).
+    """
+    vendor = connection.vendor
+
+    if vendor == "postgresql":
+        tsquery = "websearch_to_tsquery('simple', %s)"
+        qs = qs.extra(
+            tables=[DOC_TABLE],
+            where=[f"{DOC_TABLE}.ticket_id = {TICKET_TABLE}.id", f"{DOC_TABLE}.search_vector @@ {tsquery}"],
+            params=[q],
+        )
+        rank = RawSQL(f"ts_rank({DOC_TABLE}.search_vector, {tsquery})", [q], output_field=FloatField())
+        return qs.annotate(search_rank=rank)
+
+    if vendor == "sqlite":
+        match = _fts5_query(q)
+        if not match:
+            return qs.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+        qs = qs.extra(
+            tables=[DOC_TABLE, FTS_TABLE],
+            where=[
+                f"{FTS_TABLE} MATCH %s",
+                f"{FTS_TABLE}.rowid = {DOC_TABLE}.id",
+                f"{DOC_TABLE}.ticket_id = {TICKET_TABLE}.id",
+            ],
+            params=[match],
+        )
+        rank = RawSQL(f"-bm25({FTS_TABLE}, {FTS_TITLE_WEIGHT}, {FTS_BODY_WEIGHT})", [], output_field=FloatField())
+        return qs.annotate(search_rank=rank)
+
+    return qs.filter(id__in=Ticket.objects.filter(icontains_q(q)).values("id")).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
@@ -1,7 +1,19 @@
-from django.db.models import QuerySet, Case, When, Value, BooleanField
+from django.db.models import Count, Max, OuterRef, Prefetch, QuerySet, Subquery, Sum
 from django.utils.dateparse import parse_datetime
-from django.utils import timezone
-from .models import Ticket, NotificationOutbox
+from typing import Optional
+
+from common.pagination import order_by_keys
+from .models import Ticket, NotificationOutbox, TicketCounter, TicketStatus, TicketMessage, TicketHistory
+
+# Keyset pagination orderings (oxirgi kalit — unique tie-breaker)
+TICKET_LIST_KEYS = (("created_at", True), ("id", True))
+# ?q= search: mosroq birinchi (search_rank annotation — tickets/search.py)
+TICKET_SEARCH_KEYS = (("search_rank", True), ("created_at", True), ("id", True))
+AGENT_QUEUE_KEYS = (("is_overdue", True), ("due_at", False), ("created_at", False), ("id", False))
+NOTIFICATION_LIST_KEYS = (("created_at", True), ("id", True))
+# Ticket ichidagi messages/history: xronologik (ticket, created_at) index bo'yicha
+MESSAGE_LIST_KEYS = (("created_at", False), ("id", False))
+HISTORY_LIST_KEYS = (("created_at", False), ("id", False))
 
 
 def tickets_qs() -> QuerySet:
@@ -59,20 +71,128 @@ def agent_queue_qs(qs: QuerySet) -> QuerySet:
       1) OPEN va overdue bo'lganlar tepada
       2) due_at eng yaqin
       3) created_at eskiroq (FIFO vibe)
+      (due_at bo'lmaganlar oxirida, id — tie-breaker)
+
+    is_overdue — denormalized column (flag_overdue_tickets / sweep_sla yuritadi),
+    ordering ticket_open_queue_idx bilan bir xil -> sortsiz index scan.
     """
-    now = timezone.now()
+    return order_by_keys(qs, AGENT_QUEUE_KEYS)
 
-    # overdue flag annotate (DB level sorting)
-    qs = qs.annotate(
-        is_overdue=Case(
-            When(due_at__isnull=False, due_at__lt=now, status="open", then=Value(True)),
-            default=Value(False),
-            output_field=BooleanField(),
+
+def _latest_window(model, ticket_id, keys, latest: Optional[int]) -> QuerySet:
+    """
+    latest=None -> ticketning hamma qatorlari; aks holda eng yangi N tasi.
+    Ikkala holda ham natija xronologik (keys) tartibda.
+    """
+    qs = order_by_keys(model.objects.all(), keys)
+    if latest is None:
+        return qs
+    newest = model.objects.filter(ticket_id=ticket_id).order_by("-created_at", "-id").values("id")[:latest]
+    return qs.filter(id__in=newest)
+
+
+def ticket_detail_qs(ticket_id, *, latest: Optional[int] = None) -> QuerySet:
+    """
+    TicketDetailView uchun: messages/history explicit ordering bilan prefetch.
+    latest=N -> har biridan faqat eng yangi N ta (uzoq yashagan ticketlar uchun; qolgani
+    /messages/ va /history/ endpointlarida cursor bilan).
+    """
+    return (
+        tickets_qs()
+        .filter(id=ticket_id)
+        .prefetch_related(
+            Prefetch("messages", queryset=_latest_window(TicketMessage, ticket_id, MESSAGE_LIST_KEYS, latest)),
+            Prefetch("history", queryset=_latest_window(TicketHistory, ticket_id, HISTORY_LIST_KEYS, latest)),
         )
     )
 
-    return qs.order_by("-is_overdue", "due_at", "created_at")
+
+def ticket_messages_qs(ticket_id) -> QuerySet:
+    return order_by_keys(TicketMessage.objects.filter(ticket_id=ticket_id), MESSAGE_LIST_KEYS)
+
+
+def ticket_history_qs(ticket_id) -> QuerySet:
+    return order_by_keys(TicketHistory.objects.filter(ticket_id=ticket_id), HISTORY_LIST_KEYS)
 
 
 def notifications_qs():
-    return NotificationOutbox.objects.select_related("to_user")
\ No newline at end of file
+    return NotificationOutbox.objects.select_related("to_user")
+
+
+def _empty_counts() -> dict:
+    return {**{status: 0 for status in TicketStatus.values}, "overdue": 0}
+
+
+def ticket_counts() -> dict:
+    """
+    Dashboard count lari TicketCounter dan (Ticket jadvali o'qilmaydi, 1 ta kichik query).
+
+    Returns:
+      {
+        "totals":     {"open": 3, "in_progress": 1, "resolved": 0, "closed": 0, "overdue": 1},
+        "unassigned": {...},
+        "agents":     [{"agent_id": "<uuid>", "open": 0, ..., "overdue": 0}, ...]
+      }
+    """
+    totals, unassigned, agents = _empty_counts(), _empty_counts(), {}
+
+    rows = TicketCounter.objects.filter(count__gt=0).values_list("agent_id", "status", "is_overdue", "count")
+    for agent_id, status, is_overdue, count in rows:
+        targets = [totals, unassigned if agent_id is None else agents.setdefault(agent_id, _empty_counts())]
+        for target in targets:
+            target[status] += count
+            if is_overdue:
+                target["overdue"] += count
+
+    return {
+        "totals": totals,
+        "unassigned": unassigned,
+        "agents": [
+            {"agent_id": str(agent_id), **counts}
+            for agent_id, counts in sorted(agents.items(), key=lambda item: str(item[0]))
+        ],
+    }
+
+
+#==========================
+# conditional GET fingerprints (1 ta yengil query, serializer yo'q)
+#==========================
+def ticket_detail_fingerprint(ticket_id):
+    """
+    Ticket.updated_at + eng yangi message/history vaqti (ticket, created_at index lari bo'yicha LIMIT 1)
+    + created_by_id (permission uchun). Ticket yo'q bo'lsa None.
+    """
+    newest_message = TicketMessage.objects.filter(ticket=OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+    newest_history = TicketHistory.objects.filter(ticket=OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+
+    return (
+        Ticket.objects
+        .filter(id=ticket_id)
+        .annotate(last_message_at=Subquery(newest_message), last_history_at=Subquery(newest_history))
+        .values("id", "created_by_id", "updated_at", "last_message_at", "last_history_at")
+        .first()
+    )
+
+
+def ticket_list_fingerprint(qs: QuerySet) -> dict:
+    """
+    Filterlangan list to'plami uchun COUNT + MAX(updated_at) (1 ta query, sahifa o'qilmaydi).
+    List ustunlarini o'zgartiradigan hamma yozuvlar updated_at ni ham yozadi; o'chirilgan qator count ni
+    o'zgartiradi. (is_overdue/sla_* .update() lari list da ko'rinmaydi.)
+    """
+    return qs.order_by().aggregate(count=Count("id"), updated_at=Max("updated_at"))
+
+
+def notification_list_fingerprint(qs: QuerySet) -> dict:
+    """
+    NotificationOutbox da updated_at yo'q — list ustunlarining har o'zgarishi quyidagilardan birini siljitadi:
+      yangi qator -> count, created_at; SENT -> sent_at; ack -> read_at;
+      FAILED / DEAD -> attempts (+1); archive (delete) -> count.
+    """
+    return qs.order_by().aggregate(
+        count=Count("id"),
+        created_at=Max("created_at"),
+        sent_at=Max("sent_at"),
+        read_at=Max("read_at"),
+        attempts=Sum("attempts"),
+    )
@@ -1,4 +1,10 @@
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
+from .constants import BULK_TICKET_MAX
 from .models import Ticket, TicketMessage, TicketStatus, TicketPriority, NotificationOutbox
 
 
@@ -41,7 +47,8 @@ from .models import Ticket, TicketMessage, TicketHistory
 
 
 class TicketMessageSerializer(serializers.ModelSerializer):
-    author_id = serializers.UUIDField(source="author.id", read_only=True)
+    # author_id ustunining o'zi — har qator uchun author ni yuklamaymiz (N+1 yo'q)
+    author_id = serializers.UUIDField(read_only=True)
 
     class Meta:
         model = TicketMessage
@@ -49,7 +56,7 @@ class TicketMessageSerializer(serializers.ModelSerializer):
 
 
 class TicketHistorySerializer(serializers.ModelSerializer):
-    actor_id = serializers.UUIDField(source="actor.id", read_only=True)
+    actor_id = serializers.UUIDField(read_only=True)
 
     class Meta:
         model = TicketHistory
@@ -93,6 +100,18 @@ class TicketAssignSerializer(serializers.Serializer):
     agent_id = serializers.UUIDField()
 
 
+class TicketBulkSerializer(serializers.Serializer):
+    ticket_ids = serializers.ListField(child=serializers.UUIDField(), min_length=1, max_length=BULK_TICKET_MAX)
+
+
+class TicketBulkAssignSerializer(TicketBulkSerializer):
+    agent_id = serializers.UUIDField()
+
+
+class TicketBulkStatusSerializer(TicketBulkSerializer):
+    status = serializers.ChoiceField(choices=TicketStatus.values)
+
+
 class NotificationListSerializer(serializers.ModelSerializer):
     to_user_id = serializers.UUIDField(source="to_user.id", read_only=True)
 
@@ -116,4 +135,48 @@ class NotificationAckSerializer(serializers.Serializer):
     Body bo'sh bo'lishi ham mumkin, lekin serializer qoldiramiz:
     kelajakda 'read_at' o'rniga 'seen' flag kerak bo'lsa shu joydan boshqaramiz.
     """
-    pass
\ No newline at end of file
+    pass
+
+
+#==========================
+# fast path (list endpointlar)
+#==========================
+# ModelSerializer har item uchun field obyektlari, source (created_by.id) va to_representation
+# zanjiridan o'tadi. List sahifalar uchun .values() qatorlarini to'g'ridan-to'g'ri JSON-ready
+# dict ga aylantiramiz — natija DRF serializer bilan bir xil (tests/test_fast_serializers.py).
+# DRF DATETIME_FORMAT default (ISO 8601) bo'lishi kerak.
+TICKET_LIST_FIELDS = tuple(TicketListItemSerializer.Meta.fields)
+NOTIFICATION_LIST_FIELDS = tuple(NotificationListSerializer.Meta.fields)
+
+
+def _drf_datetime(value: datetime, tz) -> str:
+    # rest_framework.fields.DateTimeField: enforce_timezone + isoformat, "+00:00" -> "Z"
+    if tz is not None:
+        value = value.astimezone(tz) if value.tzinfo is not None else timezone.make_aware(value, tz)
+    elif value.tzinfo is not None:
+        value = timezone.make_naive(value, dt_timezone.utc)
+    text = value.isoformat()
+    if text.endswith("+00:00"):
+        text = text[:-6] + "Z"
+    return text
+
+
+def fast_rows(rows, fields) -> list:
+    """
+    rows: qs.values(...) natijasi (fields + ordering kalitlari bo'lishi mumkin)
+    Returns: faqat fields, serializer tartibida.
+    """
+    # current timezone bir marta (DRF har datetime uchun qayta so'raydi)
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    results = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            value = row[name]
+            if isinstance(value, uuid.UUID):
+                value = str(value)
+            elif isinstance(value, datetime):
+                value = _drf_datetime(value, tz)
+            item[name] = value
+        results.append(item)
+    return results
@@ -1,24 +1,55 @@
 # Services: transaction + select_for_update (race condition killer)
 
-from django.db import transaction
+from django.db import IntegrityError, OperationalError, connection, transaction
 from django.utils import timezone
 
-from common.exceptions import ConflictError, PermissionDenied, NotFoundError
+from common.exceptions import AppError, ConflictError, PermissionDenied, NotFoundError
+from common.pagination import keyset_after_q, order_by_keys
 from users.models import UserRole
-from .models import Ticket, TicketHistory, TicketStatus, TicketMessage, NotificationOutbox, NotificationStatus
-from .constants import ALLOWED_STATUS_TRANSITIONS, SLA_BY_PRIORITY
+from .models import Ticket, TicketHistory, TicketPriority, TicketStatus, TicketMessage, NotificationOutbox, NotificationStatus, \
+    NotificationFanout, FanoutStatus, NotificationOutboxArchive, TicketCounter
+from .audit import audit_batch, record
+from .cache import invalidate_ticket_details
+from .delivery import get_delivery_backend
+from .search import index_ticket, append_message
+from .routing import Router, get_router, routing_mode
+from .selectors import AGENT_QUEUE_KEYS
+from .constants import ALLOWED_STATUS_TRANSITIONS, SLA_BY_PRIORITY, OUTBOX_SHARD_SPACE, \
+    OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_BASE_DELAY, OUTBOX_RETRY_MAX_DELAY, OUTBOX_CLAIM_TIMEOUT, \
+    OUTBOX_CLAIM_MARGIN
 from django.contrib.auth import get_user_model
-from django.db.models import F
+from django.db.models import Count, Exists, F, OuterRef, Q, QuerySet, Value
+from django.db.models.functions import Coalesce, Mod
+from collections import Counter, deque
+from itertools import islice
+import logging
+import random
+import time
+import uuid
+import zlib
 
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
+OUTBOX_BULK_BATCH_SIZE = 500
 
-def _history(*, ticket, actor, field, old, new):
-    """
-    Audit helper: har muhim o'zgarish history ga yoziladi.
-    """
-    TicketHistory.objects.create(
+# TicketHistory: SLA breach yozuvi (ticket uchun bitta)
+SLA_FIELD = "sla"
+SLA_BREACHED = "breached"
+# route_tickets: bitta transaction da nechta ticket taqsimlanadi
+ROUTING_BATCH_SIZE = 200
+
+# broadcast_notification audience -> User filter
+FANOUT_AUDIENCES = {
+    "agents": {"role": UserRole.AGENT, "is_active": True},
+    "admins": {"role": UserRole.ADMIN, "is_active": True},
+}
+
+
+def _history_row(*, ticket, actor, field, old, new) -> TicketHistory:
+    # saqlanmagan qator (bulk_create uchun)
+    return TicketHistory(
         ticket=ticket,
         actor=actor,
         field=field,
@@ -27,7 +58,86 @@ def _history(*, ticket, actor, field, old, new):
     )
 
 
+def _history(*, ticket, actor, field, old, new):
+    """
+    Audit helper: har muhim o'zgarish history ga yoziladi.
+    audit_batch() ichida — yig'iladi va blok oxirida bitta bulk_create (tickets/audit.py).
+    """
+    record(_history_row(ticket=ticket, actor=actor, field=field, old=old, new=new))
+
+
+#==========================
+# ticket counters (TicketCounter)
+#==========================
+def _counter_key(ticket) -> tuple:
+    return ticket.assigned_to_id, ticket.status, ticket.is_overdue
+
+
+def _bump_counters(deltas) -> None:
+    """
+    deltas: {(agent_id, status, is_overdue): +n / -n}
+    Ticket o'zgargan transaction ichida chaqiriladi (rollback bo'lsa counter ham qaytadi).
+    Kalitlar tartib bilan — parallel transactionlar counter qatorlarini bir xil tartibda lock qiladi.
+    """
+    for key in sorted(deltas, key=lambda k: (str(k[0] or ""), k[1], k[2])):
+        delta = deltas[key]
+        if not delta:
+            continue
+
+        agent_id, status, is_overdue = key
+        filters = {"agent_id": agent_id, "status": status, "is_overdue": is_overdue}
+        if TicketCounter.objects.filter(**filters).update(count=F("count") + delta):
+            continue
+
+        # Qator hali yo'q: parallel INSERT yutib qo'ysa — savepoint rollback, keyin UPDATE
+        try:
+            with transaction.atomic():
+                TicketCounter.objects.create(count=delta, **filters)
+        except IntegrityError:
+            TicketCounter.objects.filter(**filters).update(count=F("count") + delta)
+
+
+def _move_counter(old_key: tuple, new_key: tuple) -> None:
+    if old_key != new_key:
+        _bump_counters({old_key: -1, new_key: 1})
+
+
+@transaction.atomic
+def rebuild_ticket_counters() -> int:
+    """
+    TicketCounter ni Ticket jadvalidan noldan hisoblaydi (reconcile_ticket_counters).
+
+    Postgres: EXCLUSIVE lock — o'qishlar ishlaydi, counter yozuvchilar rebuild tugashini kutadi
+    va o'z deltalarini undan keyin qo'shadi (ular aggregate ga kirmagan bo'ladi).
+
+    Returns: o'zgargan/yaratilgan counter qatorlari soni.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cur:
+            cur.execute(f"LOCK TABLE {TicketCounter._meta.db_table} IN EXCLUSIVE MODE")
+
+    actual = {
+        (row["assigned_to_id"], row["status"], row["is_overdue"]): row["n"]
+        for row in Ticket.objects.order_by().values("assigned_to_id", "status", "is_overdue").annotate(n=Count("id"))
+    }
+
+    stale = []
+    for counter in TicketCounter.objects.all():
+        expected = actual.pop((counter.agent_id, counter.status, counter.is_overdue), 0)
+        if counter.count != expected:
+            counter.count = expected
+            stale.append(counter)
+
+    TicketCounter.objects.bulk_update(stale, ["count"], batch_size=OUTBOX_BULK_BATCH_SIZE)
+    TicketCounter.objects.bulk_create([
+        TicketCounter(agent_id=agent_id, status=status, is_overdue=is_overdue, count=n)
+        for (agent_id, status, is_overdue), n in actual.items()
+    ])
+    return len(stale) + len(actual)
+
+
 @transaction.atomic
+@audit_batch()
 def claim_ticket(*, ticket_id, actor) -> Ticket:
     """
     Agent ticketni o'ziga "claim" qiladi.
@@ -54,19 +164,24 @@ def claim_ticket(*, ticket_id, actor) -> Ticket:
 
     old_assigned = ticket.assigned_to_id
     old_status = ticket.status
+    old_key = _counter_key(ticket)
 
     ticket.assigned_to = actor
     ticket.status = TicketStatus.IN_PROGRESS
-    ticket.save(update_fields=["assigned_to", "status", "updated_at"])
+    ticket.is_overdue = False  # queue da faqat OPEN overdue lar tepada
+    ticket.save(update_fields=["assigned_to", "status", "is_overdue", "updated_at"])
+    _move_counter(old_key, _counter_key(ticket))
 
     _history(ticket=ticket, actor=actor, field="assigned_to", old=old_assigned, new=actor.id)
     _history(ticket=ticket, actor=actor, field="status", old=old_status, new=ticket.status)
+    invalidate_ticket_details([ticket.id])
 
     return ticket
 
 
 # yangilangan change status
 @transaction.atomic
+@audit_batch()
 def change_status(*, ticket_id, actor, new_status: str) -> Ticket:
     """
     Status change with strict flow validation.
@@ -98,7 +213,9 @@ def change_status(*, ticket_id, actor, new_status: str) -> Ticket:
         raise PermissionDenied("Only agent/admin can close tickets")
 
     old_status = ticket.status
+    old_key = _counter_key(ticket)
     ticket.status = new_status
+    ticket.is_overdue = ticket.is_overdue and new_status == TicketStatus.OPEN
 
     if new_status == TicketStatus.RESOLVED:
         ticket.resolved_at = timezone.now()
@@ -113,10 +230,12 @@ def change_status(*, ticket_id, actor, new_status: str) -> Ticket:
             },
         )
 
-    ticket.save(update_fields=["status", "resolved_at", "updated_at"])
+    ticket.save(update_fields=["status", "resolved_at", "is_overdue", "updated_at"])
+    _move_counter(old_key, _counter_key(ticket))
 
 
     _history(ticket=ticket, actor=actor, field="status", old=old_status, new=new_status)
+    invalidate_ticket_details([ticket.id])
 
     return ticket
 
@@ -168,14 +287,18 @@ def add_message(*, ticket_id, actor, body: str) -> TicketMessage:
         raise NotFoundError("Ticket not found")
 
     msg = TicketMessage.objects.create(ticket=ticket, author=actor, body=body)
+    append_message(ticket.id, body)
+    invalidate_ticket_details([ticket.id])
     return msg
 
 # new
 @transaction.atomic
+@audit_batch()
 def create_ticket(*, actor, title: str, description: str, priority: str) -> Ticket:
     """
     Ticket creation:
     - due_at SLA bilan hisoblanadi
+    - TICKET_ROUTING MODE=inline -> agent INSERT dan oldin tanlanadi (qo'shimcha UPDATE / lock yo'q)
     - (xohlasang) create event historyga yozish mumkin
     """
     from django.utils import timezone
@@ -183,63 +306,225 @@ def create_ticket(*, actor, title: str, description: str, priority: str) -> Tick
     delta = SLA_BY_PRIORITY.get(priority)
     due_at = timezone.now() + delta if delta else None
 
-    ticket = Ticket.objects.create(
+    ticket = Ticket(
         created_by=actor,
         title=title,
         description=description,
         priority=priority,
         due_at=due_at,
     )
+    routed = []
+    if routing_mode() == "inline":
+        router = get_router()
+        agent_id = _pick_routable_agent(router, ticket)
+        routed = _route(ticket, agent_id)
+        if routed:
+            router.assigned_on_commit({agent_id: 1})
+    ticket.save(force_insert=True)
+    _bump_counters({_counter_key(ticket): 1})
+    index_ticket(ticket)
+
+    if routed:
+        system = get_system_actor()
+        for field, old, new in routed:
+            _history(ticket=ticket, actor=system, field=field, old=old, new=new)
 
     # Notify all agents (simple). Real systemda: team/queue bo‘yicha target qilinadi.
-    from django.contrib.auth import get_user_model
-    User = get_user_model()
-    agents = User.objects.filter(role="agent", is_active=True)
-
-    for a in agents:
-        enqueue_notification(
-            to_user=a,
-            event="ticket_created",
-            payload={
-                "ticket_id": str(ticket.id),
-                "title": ticket.title,
-                "priority": ticket.priority,
-            },
-        )
+    # NOTIFICATION_FANOUT_MODE ga qarab: darhol bulk INSERT yoki 1 ta fan-out job.
+    broadcast_notification(
+        audience="agents",
+        event="ticket_created",
+        payload={
+            "ticket_id": str(ticket.id),
+            "title": ticket.title,
+            "priority": ticket.priority,
+        },
+    )
     return ticket
 
 
-# new
+def _flag_overdue(ticket_ids, now) -> None:
+    """
+    Ticket.is_overdue / sla_breached_at (denormalized) + TicketCounter.
+    Qatorlar lock qilinadi (id tartibida) — parallel flag bir ticketni ikki marta sanamaydi.
+    sla_breached_at birinchi qiymat saqlanadi.
+    """
+    rows = list(
+        Ticket.objects
+        .select_for_update()
+        .filter(id__in=ticket_ids, is_overdue=False)
+        .order_by("id")
+        .values_list("id", "assigned_to_id", "status")
+    )
+    if not rows:
+        return
+
+    Ticket.objects.filter(id__in=[ticket_id for ticket_id, _, _ in rows]).update(
+        is_overdue=True,
+        sla_breached_at=Coalesce("sla_breached_at", Value(now)),
+    )
+
+    deltas = Counter()
+    for _, agent_id, status in rows:
+        deltas[(agent_id, status, False)] -= 1
+        deltas[(agent_id, status, True)] += 1
+    _bump_counters(deltas)
+
+
 @transaction.atomic
-def mark_sla_breached_if_needed(*, ticket: Ticket, actor) -> None:
+def flag_overdue_tickets(*, actor, ticket_ids) -> int:
     """
-    Overdue bo‘lsa, historyga 1 marta yozamiz.
-    field = "sla"
-    new_value = "breached"
+    ticket_ids (agent queue sahifasi) ichidan hali flag qilinmagan OPEN + due_at o'tganlar ->
+    is_overdue=True + "sla/breached" history. Butun jadval emas — faqat shu qatorlar.
+
+    Escalation bu yerda yuborilmaydi: sweep_sla --notify sla_escalated_at bo'yicha yuboradi
+    (breach qaysi yo'l bilan yozilganidan qat'i nazar). Query soni doimiy.
+
+    Returns: flag qilingan ticketlar soni.
     """
     from django.utils import timezone
 
-    if ticket.status != "open" or not ticket.due_at:
-        return
+    now = timezone.now()
+    ticket_ids = list(
+        Ticket.objects
+        .filter(id__in=list(ticket_ids), status=TicketStatus.OPEN, is_overdue=False, due_at__lt=now)
+        .values_list("id", flat=True)
+    )
+    if not ticket_ids:
+        return 0
 
-    if ticket.due_at >= timezone.now():
-        return
+    _record_sla_breaches(ticket_ids, actor, now)
+    return len(ticket_ids)
 
-    exists = TicketHistory.objects.filter(ticket=ticket, field="sla", new_value="breached").exists()
-    if exists:
-        return
 
-    TicketHistory.objects.create(
-        ticket=ticket,
-        actor=actor,
-        field="sla",
-        old_value="",
-        new_value="breached",
+def _record_sla_breaches(ticket_ids, actor, now) -> int:
+    """
+    Breach ning yagona yozish yo'li (queue read va sweep uchun):
+      - _flag_overdue: is_overdue / sla_breached_at + counterlar (allaqachon flag qilinganlar o'tkaziladi)
+      - "sla/breached" history — faqat hali yo'qlariga (1 ta IN query + 1 ta bulk_create;
+        ignore_conflicts: parallel yozilgan bo'lsa uniq_ticket_sla_breach takrorni o'tkazib yuboradi)
+
+    Returns: yangi yozilgan history qatorlari soni.
+    """
+    _flag_overdue(ticket_ids, now)
+
+    already = set(
+        TicketHistory.objects
+        .filter(ticket_id__in=ticket_ids, field=SLA_FIELD, new_value=SLA_BREACHED)
+        .values_list("ticket_id", flat=True)
+    )
+    missing_ids = [ticket_id for ticket_id in ticket_ids if ticket_id not in already]
+    if not missing_ids:
+        return 0
+
+    TicketHistory.objects.bulk_create(
+        [
+            TicketHistory(ticket_id=ticket_id, actor=actor, field=SLA_FIELD, old_value="", new_value=SLA_BREACHED)
+            for ticket_id in missing_ids
+        ],
+        ignore_conflicts=True,
+    )
+    invalidate_ticket_details(missing_ids)
+    return len(missing_ids)
+
+
+def get_system_actor():
+    """
+    Background joblar (SLA sweep va h.k.) uchun actor: settings.SYSTEM_ACTOR_USERNAME.
+    is_active=False — login qila olmaydi, broadcast larga tushmaydi.
+    """
+    from django.conf import settings
+
+    actor, _ = User.objects.get_or_create(
+        username=getattr(settings, "SYSTEM_ACTOR_USERNAME", "system"),
+        defaults={"role": UserRole.ADMIN, "is_active": False},
+    )
+    return actor
+
+
+SLA_SWEEP_KEYS = (("due_at", False), ("created_at", False), ("id", False))
+
+
+@transaction.atomic
+def sweep_sla_batch(*, actor, after=None, batch_size: int = 500, notify: bool = False):
+    """
+    Background SLA sweep (bitta bounded batch).
+
+    OPEN + due_at o'tgan ticketlarni ticket_open_due_idx tartibida (due_at, created_at, id)
+    keyset bilan o'qiydi, is_overdue flag qo'yadi va "sla/breached" yozuvi yo'qlarini bulk yozadi.
+    notify=True -> escalation: assigned agentga, bo'lmasa barcha active adminlarga "ticket_sla_breached".
+                   Kalit — sla_escalated_at (history emas): breach queue read da yozilgan bo'lsa ham yuboriladi.
+
+    after: oldingi batch ning oxirgi keyset qiymatlari (None -> boshidan).
+    Returns: (scanned, marked, next_after) — next_after None bo'lsa skan tugadi.
+    """
+    from django.utils import timezone
+    from common.pagination import order_by_keys, keyset_after_q
+
+    now = timezone.now()
+    qs = Ticket.objects.filter(status=TicketStatus.OPEN, due_at__lt=now)
+    if after is not None:
+        qs = qs.filter(keyset_after_q(qs, SLA_SWEEP_KEYS, after))
+
+    batch = list(
+        order_by_keys(qs, SLA_SWEEP_KEYS)
+        .values(
+            "id", "due_at", "created_at", "assigned_to_id", "title", "priority", "sla_escalated_at"
+        )[:batch_size]
     )
+    if not batch:
+        return 0, 0, None
+
+    marked = _record_sla_breaches([t["id"] for t in batch], actor, now)
+
+    if notify:
+        _escalate_sla_breaches([t for t in batch if t["sla_escalated_at"] is None], now)
+
+    last = batch[-1]
+    next_after = [last[name] for name, _ in SLA_SWEEP_KEYS] if len(batch) == batch_size else None
+    return len(batch), marked, next_after
+
+
+def _escalate_sla_breaches(tickets, now) -> int:
+    """
+    sla_escalated_at hali NULL bo'lganlarni lock qilib belgilaydi va faqat ular uchun escalation yozadi
+    (parallel sweep lar bir ticketni ikki marta yubormaydi).
+    """
+    by_id = {t["id"]: t for t in tickets}
+    if not by_id:
+        return 0
+
+    ticket_ids = list(
+        Ticket.objects
+        .select_for_update()
+        .filter(id__in=list(by_id), sla_escalated_at__isnull=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    if not ticket_ids:
+        return 0
+
+    Ticket.objects.filter(id__in=ticket_ids).update(sla_escalated_at=now)
+    return _enqueue_sla_escalations([by_id[ticket_id] for ticket_id in ticket_ids])
+
+
+def _enqueue_sla_escalations(tickets) -> int:
+    admin_ids = None
+    rows = []
+    for t in tickets:
+        payload = {"ticket_id": str(t["id"]), "title": t["title"], "priority": t["priority"]}
+        if t["assigned_to_id"]:
+            rows.append((t["assigned_to_id"], "ticket_sla_breached", payload))
+            continue
+        if admin_ids is None:
+            admin_ids = list(_audience_qs("admins").values_list("id", flat=True))
+        rows.extend((admin_id, "ticket_sla_breached", payload) for admin_id in admin_ids)
+    return enqueue_notification_rows(rows)
 
 
 # new
 @transaction.atomic
+@audit_batch()
 def assign_ticket(*, ticket_id, actor, agent_id):
     """
     Admin agentga assign qiladi.
@@ -266,23 +551,285 @@ def assign_ticket(*, ticket_id, actor, agent_id):
 
     old_assigned = ticket.assigned_to_id
     old_status = ticket.status
+    old_key = _counter_key(ticket)
 
     ticket.assigned_to = agent
 
     # Agar hali open bo‘lsa, in_progress qilamiz
     if ticket.status == "open":
         ticket.status = "in_progress"
+        ticket.is_overdue = False
 
-    ticket.save(update_fields=["assigned_to", "status", "updated_at"])
+    ticket.save(update_fields=["assigned_to", "status", "is_overdue", "updated_at"])
+    _move_counter(old_key, _counter_key(ticket))
 
     _history(ticket=ticket, actor=actor, field="assigned_to", old=old_assigned, new=agent.id)
 
     if old_status != ticket.status:
         _history(ticket=ticket, actor=actor, field="status", old=old_status, new=ticket.status)
+    invalidate_ticket_details([ticket.id])
 
     return ticket
 
 
+#==========================
+# bulk operations (/api/tickets/bulk/...)
+#==========================
+def _bulk_apply(*, ticket_ids, actor, apply, update_fields) -> list:
+    """
+    Bitta transaction, bitta lock pass:
+      1) SELECT ... FOR UPDATE ... ORDER BY id — hamma ticketlar bir marta, doim bir xil tartibda
+         (parallel bulk so'rovlar bir-birini deadlock qilmaydi)
+      2) apply(ticket) har ticket uchun xotirada: o'zgartiradi va [(field, old, new), ...] qaytaradi
+         yoki AppError (faqat shu ticket o'tkazib yuboriladi)
+      3) bulk_update + counter deltalar; history audit_batch orqali bitta bulk_create —
+         query soni ticketlar soniga bog'liq emas
+
+    Returns: ticket_ids tartibida [{"id": uuid, "ticket": Ticket | None, "error": AppError | None}, ...]
+    """
+    ticket_ids = list(dict.fromkeys(uuid.UUID(str(ticket_id)) for ticket_id in ticket_ids))
+    locked = Ticket.objects.select_for_update().filter(id__in=ticket_ids).order_by("id")
+    tickets = {ticket.id: ticket for ticket in locked}
+
+    now = timezone.now()
+    results, changed, deltas = [], [], Counter()
+    for ticket_id in ticket_ids:
+        ticket = tickets.get(ticket_id)
+        if ticket is None:
+            results.append({"id": ticket_id, "ticket": None, "error": NotFoundError("Ticket not found")})
+            continue
+
+        old_key = _counter_key(ticket)
+        try:
+            changes = apply(ticket)
+        except AppError as e:
+            results.append({"id": ticket_id, "ticket": None, "error": e})
+            continue
+
+        ticket.updated_at = now  # bulk_update auto_now ni qo'ymaydi
+        deltas[old_key] -= 1
+        deltas[_counter_key(ticket)] += 1
+        for field, old, new in changes:
+            _history(ticket=ticket, actor=actor, field=field, old=old, new=new)
+        changed.append(ticket)
+        results.append({"id": ticket_id, "ticket": ticket, "error": None})
+
+    if changed:
+        Ticket.objects.bulk_update(changed, [*update_fields, "updated_at"], batch_size=OUTBOX_BULK_BATCH_SIZE)
+        _bump_counters(deltas)
+        invalidate_ticket_details([ticket.id for ticket in changed])
+    return results
+
+
+@transaction.atomic
+@audit_batch()
+def bulk_claim_tickets(*, ticket_ids, actor) -> list:
+    """claim_ticket ning bulk varianti: bo'sh ticketlar actor ga, status -> in_progress."""
+    if actor.role not in [UserRole.AGENT, UserRole.ADMIN]:
+        raise PermissionDenied("Only agent/admin can claim tickets")
+
+    def apply(ticket):
+        if ticket.assigned_to_id is not None:
+            raise ConflictError("Ticket already claimed", details={"assigned_to": str(ticket.assigned_to_id)})
+
+        old_status = ticket.status
+        ticket.assigned_to_id = actor.id
+        ticket.status = TicketStatus.IN_PROGRESS
+        ticket.is_overdue = False
+        return [("assigned_to", None, actor.id), ("status", old_status, ticket.status)]
+
+    return _bulk_apply(
+        ticket_ids=ticket_ids, actor=actor, apply=apply, update_fields=["assigned_to", "status", "is_overdue"]
+    )
+
+
+@transaction.atomic
+@audit_batch()
+def bulk_assign_tickets(*, ticket_ids, actor, agent_id) -> list:
+    """assign_ticket ning bulk varianti: agent bir marta tekshiriladi."""
+    if actor.role != "admin":
+        raise PermissionDenied("Only admin can assign tickets")
+
+    try:
+        agent = User.objects.get(id=agent_id)
+    except User.DoesNotExist:
+        raise NotFoundError("Agent not found")
+
+    if agent.role != "agent":
+        raise ConflictError("Assigned user must have agent role")
+
+    def apply(ticket):
+        changes = [("assigned_to", ticket.assigned_to_id, agent.id)]
+        ticket.assigned_to_id = agent.id
+        if ticket.status == TicketStatus.OPEN:
+            changes.append(("status", ticket.status, TicketStatus.IN_PROGRESS))
+            ticket.status = TicketStatus.IN_PROGRESS
+            ticket.is_overdue = False
+        return changes
+
+    return _bulk_apply(
+        ticket_ids=ticket_ids, actor=actor, apply=apply, update_fields=["assigned_to", "status", "is_overdue"]
+    )
+
+
+@transaction.atomic
+@audit_batch()
+def bulk_change_status(*, ticket_ids, actor, new_status: str) -> list:
+    """
+    change_status ning bulk varianti: transition lar ALLOWED_STATUS_TRANSITIONS bo'yicha xotirada
+    tekshiriladi; ruxsat yo'q ticketlar natijada ConflictError bilan qaytadi.
+    """
+    if new_status in (TicketStatus.RESOLVED, TicketStatus.CLOSED) and actor.role not in ["agent", "admin"]:
+        raise PermissionDenied(f"Only agent/admin can set status {new_status}")
+
+    now = timezone.now()
+
+    def apply(ticket):
+        allowed_next = ALLOWED_STATUS_TRANSITIONS.get(ticket.status, set())
+        if new_status not in allowed_next:
+            raise ConflictError(
+                f"Invalid status transition: {ticket.status} -> {new_status}",
+                details={"allowed": list(allowed_next)},
+            )
+
+        old_status = ticket.status
+        ticket.status = new_status
+        ticket.is_overdue = ticket.is_overdue and new_status == TicketStatus.OPEN
+        if new_status == TicketStatus.RESOLVED:
+            ticket.resolved_at = now
+        return [("status", old_status, new_status)]
+
+    results = _bulk_apply(
+        ticket_ids=ticket_ids, actor=actor, apply=apply, update_fields=["status", "resolved_at", "is_overdue"]
+    )
+
+    if new_status == TicketStatus.RESOLVED:
+        enqueue_notification_rows(
+            (ticket.created_by_id, "ticket_resolved", {"ticket_id": str(ticket.id), "title": ticket.title})
+            for ticket in (r["ticket"] for r in results)
+            if ticket is not None
+        )
+    return results
+
+
+#==========================
+# auto-assignment (tickets/routing.py)
+#==========================
+def _routable_agent_ids(agent_ids) -> set:
+    """Index eskirgan bo'lishi mumkin: agent hali active va roli agent mi (1 query)."""
+    return set(
+        User.objects.filter(id__in=list(agent_ids), role=UserRole.AGENT, is_active=True).values_list("id", flat=True)
+    )
+
+
+def _pick_routable_agent(router: Router, ticket):
+    """Inline routing: tanlangan agent yaroqsiz bo'lsa — index ni yangilab bir marta qayta tanlaymiz."""
+    agent_id = router.pick(ticket)
+    if agent_id is None or _routable_agent_ids([agent_id]):
+        return agent_id
+
+    router.index.refresh()
+    agent_id = router.pick(ticket)
+    if agent_id is None or _routable_agent_ids([agent_id]):
+        return agent_id
+    return None
+
+
+def _route(ticket, agent_id) -> list:
+    """
+    Ticketni xotirada agentga beradi (assign_ticket bilan bir xil: OPEN -> IN_PROGRESS).
+    Returns: history uchun [(field, old, new), ...]; agent_id None -> [] (queue da qoladi).
+    """
+    if agent_id is None:
+        return []
+
+    changes = [("assigned_to", ticket.assigned_to_id, agent_id), ("status", ticket.status, TicketStatus.IN_PROGRESS)]
+    ticket.assigned_to_id = agent_id
+    ticket.status = TicketStatus.IN_PROGRESS
+    ticket.is_overdue = False
+    return changes
+
+
+@transaction.atomic
+@audit_batch()
+def route_ticket_batch(*, actor, router: Router = None, limit: int = ROUTING_BATCH_SIZE, after: list = None):
+    """
+    Background routing (manage.py route_tickets): assign qilinmagan OPEN ticketlar queue tartibida
+    (ticket_open_queue_idx) router tanlagan agentlarga.
+
+    Lock: select_for_update(skip_locked=True) — agent hozir claim qilayotgan qatorni kutmaymiz
+    va u ham bizni kutmaydi (keyingi batch da u allaqachon assigned bo'ladi). Yozish:
+    1 agent tekshiruvi + 1 bulk_update + 1 history INSERT + counter deltalar.
+    Index load i faqat commit dan keyin oshadi (batch ichida pending hisobga olinadi).
+
+    Strategy rad etgan ticket (None) queue da qoladi, lekin orqasidagilar davom etadi — masalan
+    max_load to'lgan paytda low rad etiladi, urgent esa baribir beriladi. Bir priority rad etilsa
+    shu batch da uning qolgan ticketlari so'ralmaydi (load faqat oshadi); hamma priority rad
+    etilsa batch to'xtaydi.
+
+    after: oldingi batch qaytargan keyset qiymatlari — rad etilgan ticketlar qayta skan qilinmaydi.
+
+    Returns: (scanned, routed, after) — after=None: queue oxiri yoki strategy da hech kim yo'q.
+    """
+    router = router or get_router()
+    qs = Ticket.objects.select_for_update(skip_locked=True).filter(status=TicketStatus.OPEN, assigned_to__isnull=True)
+    if after is not None:
+        qs = qs.filter(keyset_after_q(qs, AGENT_QUEUE_KEYS, after))
+    tickets = list(order_by_keys(qs, AGENT_QUEUE_KEYS)[:limit])
+    # routing is_overdue ni o'zgartiradi — cursor ni oldindan olamiz
+    next_after = [getattr(tickets[-1], name) for name, _ in AGENT_QUEUE_KEYS] if tickets and len(tickets) == limit else None
+
+    now = timezone.now()
+    picks, pending, declined = [], Counter(), set()
+    scanned = 0
+    for ticket in tickets:
+        if len(declined) == len(TicketPriority.values):
+            break
+        scanned += 1
+        if ticket.priority in declined:
+            continue
+
+        agent_id = router.pick(ticket, pending)
+        if agent_id is None:
+            declined.add(ticket.priority)
+            continue
+        pending[agent_id] += 1
+        picks.append((ticket, agent_id))
+
+    # index eskirgan bo'lsa (agent o'chirilgan / roli o'zgargan): ularning ticketlari queue da qoladi,
+    # index yangilanadi — keyingi ishga tushishda boshqa agentga
+    routable = _routable_agent_ids(pending) if pending else set()
+    if len(routable) < len(pending):
+        router.index.refresh()
+
+    routed, deltas, assigned = [], Counter(), Counter()
+    for ticket, agent_id in picks:
+        if agent_id not in routable:
+            continue
+        old_key = _counter_key(ticket)
+        changes = _route(ticket, agent_id)
+
+        ticket.updated_at = now
+        deltas[old_key] -= 1
+        deltas[_counter_key(ticket)] += 1
+        assigned[agent_id] += 1
+        for field, old, new in changes:
+            _history(ticket=ticket, actor=actor, field=field, old=old, new=new)
+        routed.append(ticket)
+
+    if routed:
+        Ticket.objects.bulk_update(
+            routed, ["assigned_to", "status", "is_overdue", "updated_at"], batch_size=OUTBOX_BULK_BATCH_SIZE
+        )
+        _bump_counters(deltas)
+        invalidate_ticket_details([ticket.id for ticket in routed])
+        router.assigned_on_commit(assigned)
+
+    if len(declined) == len(TicketPriority.values):
+        next_after = None
+    return scanned, len(routed), next_after
+
+
 def enqueue_notification(*, to_user, event: str, payload: dict) -> None:
     """
     DB outboxga yozib qo‘yamiz.
@@ -292,45 +839,385 @@ def enqueue_notification(*, to_user, event: str, payload: dict) -> None:
         to_user=to_user,
         event=event,
         payload=payload,
+        shard_key=outbox_shard_key(to_user.id),
+    )
+    notify_outbox_worker()
+
+
+def notify_outbox_worker() -> None:
+    """
+    Opt-in (settings.OUTBOX_NOTIFY_CHANNEL, faqat PostgreSQL): LISTEN qilayotgan workerni uyg'otadi.
+
+    NOTIFY transaction ichida yuborilsa ham PostgreSQL uni faqat COMMIT dan keyin yetkazadi
+    (rollback bo'lsa — umuman yo'q), bir transaction dagi bir xil NOTIFY lar esa bittaga
+    birlashadi. Ya'ni "after commit" semantikasi bepul keladi.
+    """
+    from django.conf import settings
+    from django.db import connection
+
+    channel = getattr(settings, "OUTBOX_NOTIFY_CHANNEL", "")
+    if not channel or connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cur:
+        cur.execute("SELECT pg_notify(%s, '')", [channel])
+
+
+def outbox_shard_key(user_id) -> int:
+    """
+    Barqaror hash (Python hash() process ga bog'liq — ishlatmaymiz).
+    Bitta userning barcha notificationlari bitta shard da -> tartib saqlanadi.
+    """
+    return zlib.crc32(uuid.UUID(str(user_id)).bytes) % OUTBOX_SHARD_SPACE
+
+
+def enqueue_notifications_bulk(*, recipients, event: str, payload: dict, batch_size: int = OUTBOX_BULK_BATCH_SIZE) -> int:
+    """
+    Broadcast uchun: bitta event ko'p userga.
+
+    recipients: User queryset (values_list bilan stream qilinadi) yoki user id lar iterable.
+    Har bir chunk bitta bulk_create — query soni recipientlar soniga emas, chunk soniga bog'liq.
+
+    Returns: yozilgan outbox qatorlari soni.
+    """
+    if isinstance(recipients, QuerySet):
+        user_ids = recipients.order_by().values_list("id", flat=True).iterator(chunk_size=batch_size)
+    else:
+        user_ids = iter(recipients)
+
+    return enqueue_notification_rows(
+        ((user_id, event, payload) for user_id in user_ids),
+        batch_size=batch_size,
     )
 
 
+def enqueue_notification_rows(rows, *, batch_size: int = OUTBOX_BULK_BATCH_SIZE) -> int:
+    """
+    Har xil user/event/payload lar uchun bulk yozish: rows = iterable of (user_id, event, payload).
+    Chunk lab bulk_create (generator ham bo'ladi — hammasi xotiraga yig'ilmaydi).
+
+    Returns: yozilgan outbox qatorlari soni.
+    """
+    rows = iter(rows)
+    created = 0
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+
+        NotificationOutbox.objects.bulk_create(
+            [
+                NotificationOutbox(
+                    to_user_id=user_id,
+                    event=event,
+                    payload=payload,
+                    shard_key=outbox_shard_key(user_id),
+                )
+                for user_id, event, payload in chunk
+            ],
+            batch_size=batch_size,
+        )
+        created += len(chunk)
+
+    if created:
+        notify_outbox_worker()
+    return created
+
+
+def _audience_qs(audience: str) -> QuerySet:
+    if audience not in FANOUT_AUDIENCES:
+        raise ValueError(f"Unknown fan-out audience: {audience}")
+    return User.objects.filter(**FANOUT_AUDIENCES[audience])
+
+
+def broadcast_notification(*, audience: str, event: str, payload: dict) -> None:
+    """
+    Audience (masalan "agents") ga bitta event.
+
+    settings.NOTIFICATION_FANOUT_MODE:
+      - "inline":    shu transaction ichida enqueue_notifications_bulk
+      - "on_commit": 1 ta NotificationFanout job; commit dan keyin shu process expand qiladi
+                     (ticket transaction qisqa qoladi; xato bo'lsa job worker ga qoladi)
+      - "deferred":  1 ta NotificationFanout job; process_outbox worker expand qiladi
+    """
+    from django.conf import settings
+
+    mode = getattr(settings, "NOTIFICATION_FANOUT_MODE", "inline")
+
+    if mode == "inline":
+        enqueue_notifications_bulk(recipients=_audience_qs(audience), event=event, payload=payload)
+        return
+
+    _audience_qs(audience)  # noma'lum audience ni darhol (request ichida) ushlaymiz
+    job = NotificationFanout.objects.create(audience=audience, event=event, payload=payload)
+    if mode == "deferred":
+        notify_outbox_worker()  # worker job ni expand qilishi uchun
+
+    if mode == "on_commit":
+        # robust=True: expand yiqilsa ham request muvaffaqiyatli, job pending qoladi
+        transaction.on_commit(lambda: expand_fanout_jobs(job_id=job.id), robust=True)
+
+
 @transaction.atomic
-def process_outbox_batch(*, limit: int = 50) -> int:
+def expand_fanout_jobs(*, limit: int = 10, job_id=None) -> int:
     """
-    Pending notificationlarni batch qilib "send" qiladi.
-    select_for_update(skip_locked=True) -> parallel workerlar bo‘lsa ham safe.
+    Pending fan-out joblarni per-recipient NotificationOutbox qatorlariga aylantiradi.
+    select_for_update(skip_locked=True) -> har job faqat 1 marta expand bo'ladi.
+
+    Har job o'z savepoint ida: bitta "poison" job (masalan noma'lum audience) butun
+    batch ni rollback qilmaydi — u FAILED (last_error bilan) bo'ladi, qolganlari DONE.
+    OperationalError (lock timeout / connection) esa yuqoriga chiqadi — keyingi tick da qayta.
 
-    Bu yerda real email yubormaymiz.
-    Production'da bu joyga provider (SES/Sendgrid) ulab qo‘yiladi.
+    Returns: yozilgan outbox qatorlari soni.
     """
     from django.utils import timezone
 
     qs = (
-        NotificationOutbox.objects
+        NotificationFanout.objects
         .select_for_update(skip_locked=True)
-        .filter(status=NotificationStatus.PENDING)
-        .order_by("created_at")[:limit]
+        .filter(status=FanoutStatus.PENDING)
+        .order_by("created_at")
     )
+    if job_id is not None:
+        qs = qs.filter(id=job_id)
 
-    processed = 0
-    for n in qs:
+    created = 0
+    for job in qs[:limit]:
         try:
-            # SIMULATION: "sent" deb belgilaymiz
-            n.status = NotificationStatus.SENT
-            n.sent_at = timezone.now()
-            n.last_error = ""
-            n.save(update_fields=["status", "sent_at", "last_error"])
-
-            processed += 1
-        except Exception as e:
-            # Failure accounting (retryable)
-            n.status = NotificationStatus.FAILED
-            n.attempts = F("attempts") + 1
-            n.last_error = str(e)
-            n.save(update_fields=["status", "attempts", "last_error"])
-
-    return processed
+            with transaction.atomic():
+                job.recipients_count = enqueue_notifications_bulk(
+                    recipients=_audience_qs(job.audience),
+                    event=job.event,
+                    payload=job.payload,
+                )
+        except OperationalError:
+            raise
+        except Exception as exc:
+            job.status = FanoutStatus.FAILED
+            job.recipients_count = 0
+            job.last_error = str(exc)
+        else:
+            job.status = FanoutStatus.DONE
+            created += job.recipients_count
+        job.processed_at = timezone.now()
+        job.save(update_fields=["recipients_count", "status", "last_error", "processed_at"])
+
+    return created
+
+
+def process_outbox_batch(*, limit: int = 50, shard=None):
+    """
+    Pending notificationlarni batch qilib "send" qiladi. 3 bosqich:
+
+      1. claim (transaction): select_for_update(skip_locked=True) + next_attempt_at ni
+         OUTBOX_CLAIM_TIMEOUT ga suramiz (lease) -> COMMIT. Parallel workerlar bu qatorlarni olmaydi.
+      2. send (transaction dan TASHQARIDA): sekin provider DB lock / connection ni ushlab turmaydi.
+         Lease tugashidan OUTBOX_CLAIM_MARGIN (yoki backend timeout) oldin yangi send boshlanmaydi —
+         ulgurmaganlar TIMEOUT_ERROR bilan retry ga qaytadi.
+      3. record (transaction): faqat lease hali bizda bo'lgan (next_attempt_at == claim qiymati)
+         qatorlar yoziladi — lease yo'qolgan bo'lsa, qatorni boshqa worker olgan, uning natijasini
+         ustidan yozmaymiz.
+
+    Worker 2-3 orasida yiqilsa, lease tugagach qatorlar qayta yuboriladi (at-least-once).
+
+    Per-user ordering (created_at, id):
+      - userning oldingi PENDING/FAILED qatori keyinroq navbatda (next_attempt_at katta — retry backoff
+        yoki boshqa worker lease i) bo'lsa, keyingi qatorlari olinmaydi (_outbox_head_of_line);
+      - batch ichida bitta userning qatorlari ketma-ket yuboriladi (_send_in_user_order), biri yiqilsa
+        qolganlari yuborilmaydi va lease siz qaytariladi (attempts o'zgarmaydi).
+
+    shard=(index, total): faqat shard_key % total == index qatorlar
+    (bitta user faqat bitta workerga tushadi — workerlar bir-birining user larini kutmaydi).
+
+    Yuborish settings.NOTIFICATION_DELIVERY backendiga topshiriladi (tickets.delivery).
+    Query soni batch hajmidan qat'i nazar o'zgarmaydi
+    (SELECT + claim UPDATE + lease SELECT + sent UPDATE + failed bulk_update).
+
+    Retry: faqat vaqti kelgan (next_attempt_at <= now) PENDING/FAILED qatorlar olinadi.
+    Xato -> attempts+1, next_attempt_at = now + backoff; OUTBOX_MAX_ATTEMPTS dan keyin DEAD.
+
+    Returns: (attempted, sent) — worker batch hajmi / idle / drain ni attempted bo'yicha boshqaradi
+    (hammasi yiqilgan batch ham "ish bor" degani; ushlab qolingan qatorlar attempted emas).
+    """
+    from django.utils import timezone
+
+    with transaction.atomic():
+        now, started = timezone.now(), time.monotonic()
+        qs = (
+            NotificationOutbox.objects
+            .select_related("to_user")  # backend ORM ga bormasin (email va h.k.)
+            .select_for_update(skip_locked=True, of=("self",))  # user qatorlarini lock qilmaymiz
+            .filter(
+                status__in=[NotificationStatus.PENDING, NotificationStatus.FAILED],
+                next_attempt_at__lte=now,
+            )
+            .filter(_outbox_head_of_line())
+        )
+        if shard is not None:
+            index, total = shard
+            qs = qs.annotate(shard_slot=Mod("shard_key", total)).filter(shard_slot=index)
+
+        batch = list(qs.order_by("next_attempt_at", "created_at", "id")[:limit])
+        if not batch:
+            return 0, 0
+        lease_until = now + OUTBOX_CLAIM_TIMEOUT
+        NotificationOutbox.objects.filter(id__in=[n.id for n in batch]).update(next_attempt_at=lease_until)
+
+    backend = get_delivery_backend()
+    margin = max(OUTBOX_CLAIM_MARGIN.total_seconds(), getattr(backend, "timeout", None) or 0)
+    results = _send_in_user_order(backend, batch, deadline=started + OUTBOX_CLAIM_TIMEOUT.total_seconds() - margin)
+
+    with transaction.atomic():
+        # lease hali bizdami? (lock: tekshiruv va yozish orasida boshqa worker claim qilolmaydi)
+        leased = set(
+            NotificationOutbox.objects
+            .select_for_update()
+            .filter(id__in=[n.id for n in batch], next_attempt_at=lease_until)
+            .values_list("id", flat=True)
+        )
+        if len(leased) < len(batch):
+            logger.warning("Outbox lease lost for %d notifications; results discarded", len(batch) - len(leased))
+
+        now = timezone.now()
+        sent_ids = []
+        failed = []
+        for n in batch:
+            if n.id not in leased:
+                continue
+            error = results.get(n.id, "No delivery result")
+            if error is None:
+                sent_ids.append(n.id)
+                continue
+            if error is OUTBOX_HELD:
+                # yuborilmadi: lease ni qaytaramiz, oldingi qator retry bo'lguncha _outbox_head_of_line ushlab turadi
+                n.next_attempt_at = now
+                failed.append(n)
+                continue
+            # Failure accounting. Qator lock ostida — attempts ni Python da oshiramiz.
+            n.attempts += 1
+            n.last_error = error
+            if n.attempts >= OUTBOX_MAX_ATTEMPTS:
+                n.status = NotificationStatus.DEAD
+            else:
+                n.status = NotificationStatus.FAILED
+                n.next_attempt_at = now + outbox_retry_delay(n.attempts)
+            failed.append(n)
+
+        if sent_ids:
+            NotificationOutbox.objects.filter(id__in=sent_ids).update(
+                status=NotificationStatus.SENT,
+                sent_at=now,
+                last_error="",
+            )
+
+        if failed:
+            NotificationOutbox.objects.bulk_update(failed, ["status", "attempts", "last_error", "next_attempt_at"])
+
+    held = sum(1 for error in results.values() if error is OUTBOX_HELD)
+    return len(batch) - held, len(sent_ids)
+
+
+# _send_in_user_order: userning oldingi qatori yiqilgani uchun yuborilmagan qator
+OUTBOX_HELD = object()
+
+
+def _outbox_head_of_line() -> Q:
+    """
+    Qator olinadi, agar shu userning undan oldingi (created_at, id) PENDING/FAILED qatorlari hammasi
+    navbatda undan oldin turgan bo'lsa (next_attempt_at kichik yoki teng) — ya'ni batch ga ular
+    birinchi tushadi. Retry backoff dagi / boshqa worker lease idagi oldingi qator keyingilarini ushlab turadi.
+    (to_user, created_at) index — outbox_user_created_idx.
+    """
+    earlier = NotificationOutbox.objects.filter(
+        Q(created_at__lt=OuterRef("created_at")) | Q(created_at=OuterRef("created_at"), id__lt=OuterRef("id")),
+        to_user=OuterRef("to_user"),
+        status__in=[NotificationStatus.PENDING, NotificationStatus.FAILED],
+        # teng bo'lsa order_by(next_attempt_at, created_at, id) oldingisini baribir birinchi oladi
+        next_attempt_at__gt=OuterRef("next_attempt_at"),
+    )
+    return ~Exists(earlier)
+
+
+def _send_in_user_order(backend, batch, *, deadline) -> dict:
+    """
+    Round k = har userning k-chi qatori: turli userlar parallel (backend.send_many), bitta userniki
+    ketma-ket. Userning qatori yiqilsa — uning qolgan qatorlari OUTBOX_HELD (yuborilmaydi).
+    Odatda (userga bitta qator) bitta round.
+    """
+    queues = {}
+    for n in batch:
+        queues.setdefault(n.to_user_id, deque()).append(n)
+
+    results = {}
+    while queues:
+        wave = [rows.popleft() for rows in queues.values()]
+        results.update(backend.send_many(wave, deadline=deadline))
+        for n in wave:
+            if results.get(n.id, "No delivery result") is not None:
+                results.update(dict.fromkeys((m.id for m in queues[n.to_user_id]), OUTBOX_HELD))
+                queues[n.to_user_id].clear()
+        queues = {user_id: rows for user_id, rows in queues.items() if rows}
+    return results
+
+
+def outbox_retry_delay(attempts: int):
+    """
+    Exponential backoff + jitter: base * 2^(attempts-1), OUTBOX_RETRY_MAX_DELAY dan oshmaydi.
+    Jitter (50-100%) -> bir vaqtda yiqilgan qatorlar bir vaqtda qaytib kelmaydi.
+    """
+    delay = min(OUTBOX_RETRY_MAX_DELAY, OUTBOX_RETRY_BASE_DELAY * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+ARCHIVE_COPY_FIELDS = [
+    "id", "to_user_id", "event", "payload", "status", "attempts",
+    "last_error", "created_at", "sent_at", "read_at",
+]
+
+
+def outbox_retention_q(*, read_cutoff, unread_cutoff) -> Q:
+    """
+    Archive/delete qilinadigan qatorlar:
+      - SENT + read, created_at < read_cutoff
+      - SENT yoki DEAD (o'qilmagan bo'lsa ham), created_at < unread_cutoff
+    PENDING/FAILED hech qachon tegilmaydi.
+    """
+    return (
+        Q(status=NotificationStatus.SENT, read_at__isnull=False, created_at__lt=read_cutoff)
+        | Q(status__in=[NotificationStatus.SENT, NotificationStatus.DEAD], created_at__lt=unread_cutoff)
+    )
+
+
+@transaction.atomic
+def archive_outbox_batch(*, read_cutoff, unread_cutoff, batch_size: int = 1000, delete: bool = False) -> int:
+    """
+    Bitta bounded batch: eski qatorlarni NotificationOutboxArchive ga ko'chiradi (yoki delete=True -> o'chiradi).
+    Kichik transactionlar -> uzun lock / katta WAL spike yo'q; parallel worker bilan skip_locked.
+
+    Returns: ko'chirilgan/o'chirilgan qatorlar soni (0 -> tugadi).
+    """
+    from .partitions import ensure_monthly_partitions
+
+    ids = list(
+        NotificationOutbox.objects
+        .select_for_update(skip_locked=True)
+        .filter(outbox_retention_q(read_cutoff=read_cutoff, unread_cutoff=unread_cutoff))
+        .order_by("created_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+
+    if not delete:
+        rows = list(NotificationOutbox.objects.filter(id__in=ids).values(*ARCHIVE_COPY_FIELDS))
+        ensure_monthly_partitions([row["created_at"] for row in rows])
+        NotificationOutboxArchive.objects.bulk_create(
+            [NotificationOutboxArchive(**row) for row in rows],
+            batch_size=batch_size,
+        )
+
+    NotificationOutbox.objects.filter(id__in=ids).delete()
+    return len(ids)
 
 
 from django.utils import timezone
@@ -6,8 +6,14 @@ from .views import (
     TicketStatusView,
     TicketDetailView,
     TicketMessageCreateView,
+    TicketHistoryView,
     AgentQueueView,
+    TicketStatsView,
+    TicketExportView,
     TicketAssignView,
+    TicketBulkClaimView,
+    TicketBulkAssignView,
+    TicketBulkStatusView,
     NotificationListView,
     NotificationDetailView,
     NotificationAckView
@@ -16,9 +22,12 @@ from .views import (
 urlpatterns = [
     path("tickets/", TicketListView.as_view()),
     path("tickets/create/", TicketCreateView.as_view()),
+    path("tickets/stats/", TicketStatsView.as_view()),
+    path("tickets/export/", TicketExportView.as_view()),
 
     path("tickets/<uuid:ticket_id>/", TicketDetailView.as_view()),
     path("tickets/<uuid:ticket_id>/messages/", TicketMessageCreateView.as_view()),
+    path("tickets/<uuid:ticket_id>/history/", TicketHistoryView.as_view()),
 
     path("tickets/<uuid:ticket_id>/claim/", TicketClaimView.as_view()),
     path("tickets/<uuid:ticket_id>/status/", TicketStatusView.as_view()),
@@ -27,6 +36,11 @@ urlpatterns = [
 
     path("tickets/<uuid:ticket_id>/assign/", TicketAssignView.as_view()),
 
+    # bulk (bitta transaction, bitta lock pass)
+    path("tickets/bulk/claim/", TicketBulkClaimView.as_view()),
+    path("tickets/bulk/assign/", TicketBulkAssignView.as_view()),
+    path("tickets/bulk/status/", TicketBulkStatusView.as_view()),
+
     # notification
     path("notifications/", NotificationListView.as_view()),
     path("notifications/<uuid:notification_id>/", NotificationDetailView.as_view()),
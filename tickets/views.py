@@ -1,9 +1,13 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
 from common.responses import error_response
-from common.exceptions import AppError
-from common.pagination import paginate_queryset
+from common.exceptions import AppError, NotFoundError, PermissionDenied, ValidationError
+from common.pagination import paginate_request, order_by_keys, values_with_keys, MAX_PAGE_SIZE
+from common.conditional import make_validators, not_modified_response, latest, list_validators, page_validators
+from . import cache as ticket_cache
 from .models import Ticket, NotificationOutbox
 from .serializers import (
     TicketCreateSerializer,
@@ -13,13 +17,25 @@ from .serializers import (
     MessageCreateSerializer,
     TicketMessageSerializer,
     TicketAssignSerializer,
+    TicketHistorySerializer,
+    TicketBulkSerializer,
+    TicketBulkAssignSerializer,
+    TicketBulkStatusSerializer,
     NotificationListSerializer,
     NotificationAckSerializer,
+    TICKET_LIST_FIELDS,
+    NOTIFICATION_LIST_FIELDS,
+    fast_rows,
 )
 from .permissions import CanViewTicket, CanWriteTicket, IsAgentOrAdmin, IsNotificationOwner
-from .services import add_message, claim_ticket, change_status, create_ticket, mark_sla_breached_if_needed, \
-    assign_ticket, acknowledge_notification
-from .selectors import tickets_qs, apply_ticket_filters, agent_queue_qs, notifications_qs
+from .export import EXPORT_FORMATS, EXPORT_CONTENT_TYPES, stream_export
+from .search import search_tickets
+from .services import add_message, claim_ticket, change_status, create_ticket, flag_overdue_tickets, \
+    assign_ticket, acknowledge_notification, get_system_actor, bulk_claim_tickets, bulk_assign_tickets, bulk_change_status
+from .selectors import tickets_qs, apply_ticket_filters, agent_queue_qs, notifications_qs, ticket_counts, \
+    ticket_detail_fingerprint, ticket_list_fingerprint, notification_list_fingerprint, ticket_detail_qs, \
+    ticket_messages_qs, ticket_history_qs, \
+    TICKET_LIST_KEYS, TICKET_SEARCH_KEYS, AGENT_QUEUE_KEYS, NOTIFICATION_LIST_KEYS, MESSAGE_LIST_KEYS, HISTORY_LIST_KEYS
 
 
 
@@ -55,10 +71,16 @@ class TicketCreateView(APIView):
 class TicketListView(APIView):
     """
     GET /api/tickets?status=open&priority=high&page=1&page_size=10
+    GET /api/tickets?status=open&cursor=&page_size=10   (keyset mode, count yo'q)
+    GET /api/tickets?cursor=<next_cursor>
+    GET /api/tickets?q=printer+error      (full-text: title, description, messages; rank bo'yicha)
+
+    ETag: URL + to'plam COUNT/MAX(updated_at) — 304 sahifa query sidan oldin.
+    ?q= da rank message matniga bog'liq (updated_at ga emas) — ETag sahifaning o'zidan.
     """
 
     def get(self, request):
-        qs = tickets_qs().order_by("-created_at")
+        qs = tickets_qs()
 
         # RBAC: client faqat o'ziniki
         if request.user.role == "client":
@@ -67,18 +89,38 @@ class TicketListView(APIView):
         # filters
         qs = apply_ticket_filters(qs, request.query_params)
 
-        page = int(request.query_params.get("page", "1"))
-        page_size = int(request.query_params.get("page_size", "10"))
-        data = paginate_queryset(qs, page=page, page_size=page_size)
-
-        return Response(
-            {
-                "page": data["page"],
-                "page_size": data["page_size"],
-                "count": data["count"],
-                "results": TicketListItemSerializer(data["results"], many=True).data,
-            }
-        )
+        keys = TICKET_LIST_KEYS
+        q = request.query_params.get("q", "").strip()
+        if q:
+            qs, keys = search_tickets(qs, q), TICKET_SEARCH_KEYS
+        qs = order_by_keys(qs, keys)
+
+        # Conditional GET: o'zgarmagan to'plam -> 304 (sahifa query si ham, serializer ham yo'q)
+        count = None
+        if not q:
+            fp = ticket_list_fingerprint(qs)
+            count = fp["count"]
+            validators = list_validators(request.get_full_path(), fp)
+            not_modified = not_modified_response(request, validators)
+            if not_modified is not None:
+                return not_modified
+
+        # fast path: .values() qatorlari (JOIN yo'q), TicketListItemSerializer bilan bir xil JSON
+        rows = values_with_keys(qs, TICKET_LIST_FIELDS, keys)
+        try:
+            data = paginate_request(rows, request.query_params, keys=keys, default_page_size=10, count=count)
+            data["results"] = list(data["results"])
+        except AppError as e:
+            return error_response(e)
+
+        if q:
+            validators = page_validators(request.get_full_path(), data)
+            not_modified = not_modified_response(request, validators)
+            if not_modified is not None:
+                return not_modified
+
+        data["results"] = fast_rows(data["results"], TICKET_LIST_FIELDS)
+        return Response(data, headers=validators.headers)
 
 
 class TicketClaimView(APIView):
@@ -123,33 +165,101 @@ class TicketStatusView(APIView):
 #==========================
 # second adding
 #==========================
+def _latest_param(params):
+    """?latest=N -> N (1..MAX_PAGE_SIZE); ?latest= -> settings default; yo'q -> None (hammasi)."""
+    if "latest" not in params:
+        return None
+    raw = params.get("latest") or settings.TICKET_DETAIL_LATEST_DEFAULT
+    try:
+        return min(MAX_PAGE_SIZE, max(1, int(raw)))
+    except (TypeError, ValueError):
+        raise ValidationError(details={"latest": ["latest must be an integer"]})
+
+
+def _check_can_view(request, view, ticket_id):
+    """Ticket ichidagi list endpointlar uchun: yengil ticket (faqat created_by_id) + CanViewTicket."""
+    ticket = Ticket.objects.only("id", "created_by_id").filter(id=ticket_id).first()
+    if ticket is None:
+        raise NotFoundError("Ticket not found")
+    if not CanViewTicket().has_object_permission(request, view, ticket):
+        raise PermissionDenied("Forbidden")
+
+
 class TicketDetailView(APIView):
     """
     GET /api/tickets/{id}
+    GET /api/tickets/{id}?latest=20   (messages/history dan faqat eng yangi N ta; qolgani
+                                       /messages/ va /history/ da cursor bilan)
     - client faqat o'ziniki
     - agent/admin hammasi
+    - ETag / Last-Modified: updated_at + eng yangi message/history (If-None-Match -> 304)
     """
     def get(self, request, ticket_id):
-        ticket = Ticket.objects.select_related("created_by", "assigned_to") \
-            .prefetch_related("messages", "history") \
-            .get(id=ticket_id)
+        try:
+            embed_latest = _latest_param(request.query_params)
+        except AppError as e:
+            return error_response(e)
+        variant = "all" if embed_latest is None else f"latest{embed_latest}"
 
-        # object permission
-        perm = CanViewTicket()
-        if not perm.has_object_permission(request, self, ticket):
-            return Response({"error": {"code": "PERMISSION_DENIED", "message": "Forbidden", "details": {}}}, status=403)
+        # 1 ta yengil query: permission (created_by_id) + ETag/Last-Modified uchun timestamplar
+        fp = ticket_detail_fingerprint(ticket_id)
+        if fp is None:
+            return error_response(NotFoundError("Ticket not found"))
 
-        return Response(TicketDetailSerializer(ticket).data)
+        # object permission — kesh/304 dan oldin, har so'rovda
+        if not self._can_view(request, Ticket(id=ticket_id, created_by_id=fp["created_by_id"])):
+            return self._forbidden()
+
+        last_modified = latest(fp["updated_at"], fp["last_message_at"], fp["last_history_at"])
+        validators = make_validators(
+            ticket_id, variant, fp["updated_at"], fp["last_message_at"], fp["last_history_at"],
+            last_modified=last_modified,
+        )
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        # Kesh (tickets/cache.py): serializer output; service layer o'zgarishda versiyani almashtiradi
+        token, data = ticket_cache.get_ticket_detail(ticket_id, etag=validators.etag, variant=variant)
+        if data is None:
+            try:
+                ticket = ticket_detail_qs(ticket_id, latest=embed_latest).get()
+            except Ticket.DoesNotExist:
+                return error_response(NotFoundError("Ticket not found"))
+
+            data = TicketDetailSerializer(ticket).data
+            ticket_cache.set_ticket_detail(ticket_id, token, etag=validators.etag, data=data, variant=variant)
+
+        return Response(data, headers=validators.headers)
+
+    def _can_view(self, request, ticket) -> bool:
+        return CanViewTicket().has_object_permission(request, self, ticket)
+
+    def _forbidden(self):
+        return Response({"error": {"code": "PERMISSION_DENIED", "message": "Forbidden", "details": {}}}, status=403)
 
 
 class TicketMessageCreateView(APIView):
     """
+    GET  /api/tickets/{id}/messages?cursor=&page_size=50   (xronologik, keyset)
     POST /api/tickets/{id}/messages
     Body: { "body": "..." }
 
     - client: faqat o'z ticketiga
     - agent/admin: hammasiga
     """
+    def get(self, request, ticket_id):
+        try:
+            _check_can_view(request, self, ticket_id)
+            data = paginate_request(
+                ticket_messages_qs(ticket_id), request.query_params, keys=MESSAGE_LIST_KEYS, default_page_size=50
+            )
+        except AppError as e:
+            return error_response(e)
+
+        data["results"] = TicketMessageSerializer(data["results"], many=True).data
+        return Response(data)
+
     def post(self, request, ticket_id):
         ser = MessageCreateSerializer(data=request.data)
         if not ser.is_valid():
@@ -176,6 +286,7 @@ class TicketMessageCreateView(APIView):
 class AgentQueueView(APIView):
     """
     GET /api/agent/queue?status=open&page=1&page_size=10
+    GET /api/agent/queue?status=open&cursor=&page_size=10   (keyset mode)
 
     - faqat agent/admin
     - default: status=open (work queue)
@@ -193,22 +304,78 @@ class AgentQueueView(APIView):
         qs = apply_ticket_filters(qs, request.query_params)
         qs = agent_queue_qs(qs)
 
-        page = int(request.query_params.get("page", "1"))
-        page_size = int(request.query_params.get("page_size", "10"))
-        data = paginate_queryset(qs, page=page, page_size=page_size)
-
-        # Side-effect: SLA breached audit (only for visible page items)
-        for t in data["results"]:
-            mark_sla_breached_if_needed(ticket=t, actor=request.user)
-
-        return Response(
-            {
-                "page": data["page"],
-                "page_size": data["page_size"],
-                "count": data["count"],
-                "results": TicketListItemSerializer(data["results"], many=True).data,
-            }
+        rows = values_with_keys(qs, TICKET_LIST_FIELDS, AGENT_QUEUE_KEYS)
+        try:
+            data = paginate_request(rows, request.query_params, keys=AGENT_QUEUE_KEYS, default_page_size=10)
+            data["results"] = list(data["results"])
+        except AppError as e:
+            return error_response(e)
+
+        # Opt-in side-effect (SLA_MARK_ON_READ): faqat shu sahifadagi overdue ticketlar flag + "sla/breached"
+        # (system actor nomidan). Ordering keyingi o'qishda yangilanadi; asosiy yo'l — sweep_sla.
+        if settings.SLA_MARK_ON_READ:
+            flag_overdue_tickets(actor=get_system_actor(), ticket_ids=[row["id"] for row in data["results"]])
+
+        data["results"] = fast_rows(data["results"], TICKET_LIST_FIELDS)
+        return Response(data)
+
+
+class TicketStatsView(APIView):
+    """
+    GET /api/tickets/stats
+    - faqat agent/admin
+    - status / overdue bo'yicha count lar: jami, unassigned, har agent
+    - TicketCounter dan o'qiladi (COUNT(*) yo'q) — dashboard polling uchun arzon
+    """
+    permission_classes = [IsAgentOrAdmin]
+
+    def get(self, request):
+        return Response(ticket_counts())
+
+
+class TicketExportView(APIView):
+    """
+    GET /api/tickets/export?fmt=csv|ndjson&history=1&status=open&...
+    - filterlar va RBAC TicketListView bilan bir xil (client faqat o'ziniki)
+    - pagination / count yo'q: hamma mos ticketlar (created_at, id) tartibida oqim bilan yuboriladi
+    - "format" emas "fmt": ?format= DRF content negotiation uchun band
+    """
+
+    def get(self, request):
+        fmt = request.query_params.get("fmt", "csv")
+        if fmt not in EXPORT_FORMATS:
+            return error_response(ValidationError(details={"fmt": [f"fmt must be one of: {', '.join(EXPORT_FORMATS)}"]}))
+        with_history = request.query_params.get("history") in ("1", "true")
+
+        qs = Ticket.objects.all()
+        if request.user.role == "client":
+            qs = qs.filter(created_by=request.user)
+        qs = apply_ticket_filters(qs, request.query_params)
+
+        response = StreamingHttpResponse(
+            stream_export(qs, fmt=fmt, with_history=with_history, chunk_size=settings.TICKET_EXPORT_CHUNK_SIZE),
+            content_type=EXPORT_CONTENT_TYPES[fmt],
         )
+        response["Content-Disposition"] = f'attachment; filename="tickets.{fmt}"'
+        return response
+
+
+class TicketHistoryView(APIView):
+    """
+    GET /api/tickets/{id}/history?cursor=&page_size=50   (xronologik, keyset)
+    - ko'rish huquqi detail bilan bir xil (CanViewTicket)
+    """
+    def get(self, request, ticket_id):
+        try:
+            _check_can_view(request, self, ticket_id)
+            data = paginate_request(
+                ticket_history_qs(ticket_id), request.query_params, keys=HISTORY_LIST_KEYS, default_page_size=50
+            )
+        except AppError as e:
+            return error_response(e)
+
+        data["results"] = TicketHistorySerializer(data["results"], many=True).data
+        return Response(data)
 
 
 # new
@@ -240,30 +407,147 @@ class TicketAssignView(APIView):
         return Response(TicketListItemSerializer(ticket).data, status=200)
 
 
+#==========================
+# bulk operations
+#==========================
+def _bulk_response(results) -> Response:
+    """
+    Har ticket uchun natija (so'rovdagi tartibda):
+      {"id": "...", "ok": true,  "ticket": {...TicketListItemSerializer...}}
+      {"id": "...", "ok": false, "error": {"code": "CONFLICT", "message": "...", "details": {...}}}
+    """
+    tickets = [r["ticket"] for r in results if r["ticket"] is not None]
+    items = iter(fast_rows([{name: getattr(t, name) for name in TICKET_LIST_FIELDS} for t in tickets], TICKET_LIST_FIELDS))
+
+    out = []
+    for r in results:
+        if r["error"] is None:
+            out.append({"id": str(r["id"]), "ok": True, "ticket": next(items)})
+        else:
+            error = r["error"]
+            out.append({
+                "id": str(r["id"]),
+                "ok": False,
+                "error": {"code": error.code, "message": error.message, "details": error.details},
+            })
+
+    updated = len(tickets)
+    return Response({"updated": updated, "failed": len(results) - updated, "results": out}, status=200)
+
+
+def _bulk_invalid(ser) -> Response:
+    return Response(
+        {"error": {"code": "VALIDATION_ERROR", "message": "Invalid input", "details": ser.errors}},
+        status=400,
+    )
+
+
+class TicketBulkClaimView(APIView):
+    """
+    POST /api/tickets/bulk/claim
+    Body: { "ticket_ids": ["<uuid>", ...] }   (ko'pi bilan BULK_TICKET_MAX)
+
+    Hammasi bitta transaction da; band ticketlar natijada CONFLICT bilan, qolganlari claim qilinadi.
+    """
+    permission_classes = [IsAgentOrAdmin]
+
+    def post(self, request):
+        ser = TicketBulkSerializer(data=request.data)
+        if not ser.is_valid():
+            return _bulk_invalid(ser)
+
+        try:
+            results = bulk_claim_tickets(ticket_ids=ser.validated_data["ticket_ids"], actor=request.user)
+        except AppError as e:
+            return error_response(e)
+
+        return _bulk_response(results)
+
+
+class TicketBulkAssignView(APIView):
+    """
+    POST /api/tickets/bulk/assign
+    Body: { "ticket_ids": [...], "agent_id": "<uuid>" }
+
+    Faqat admin.
+    """
+    def post(self, request):
+        ser = TicketBulkAssignSerializer(data=request.data)
+        if not ser.is_valid():
+            return _bulk_invalid(ser)
+
+        try:
+            results = bulk_assign_tickets(
+                ticket_ids=ser.validated_data["ticket_ids"],
+                actor=request.user,
+                agent_id=ser.validated_data["agent_id"],
+            )
+        except AppError as e:
+            return error_response(e)
+
+        return _bulk_response(results)
+
+
+class TicketBulkStatusView(APIView):
+    """
+    PATCH /api/tickets/bulk/status
+    Body: { "ticket_ids": [...], "status": "resolved" }
+
+    Ruxsat etilmagan transition lar natijada CONFLICT bilan (boshqalari o'zgaradi).
+    """
+    permission_classes = [IsAgentOrAdmin]
+
+    def patch(self, request):
+        ser = TicketBulkStatusSerializer(data=request.data)
+        if not ser.is_valid():
+            return _bulk_invalid(ser)
+
+        try:
+            results = bulk_change_status(
+                ticket_ids=ser.validated_data["ticket_ids"],
+                actor=request.user,
+                new_status=ser.validated_data["status"],
+            )
+        except AppError as e:
+            return error_response(e)
+
+        return _bulk_response(results)
+
+
 class NotificationListView(APIView):
     """
     GET /api/notifications?status=sent&page=1&page_size=20
+    GET /api/notifications?cursor=&page_size=20   (keyset mode)
 
     - faqat o'z notificationlari
     - filter: status (pending/sent/failed)
+    - ETag to'plam aggregate idan (If-None-Match -> 304, sahifa query sisiz)
     """
     def get(self, request):
-        qs = notifications_qs().filter(to_user=request.user).order_by("-created_at")
+        qs = order_by_keys(notifications_qs().filter(to_user=request.user), NOTIFICATION_LIST_KEYS)
 
         status = request.query_params.get("status")
         if status:
             qs = qs.filter(status=status)
 
-        page = int(request.query_params.get("page", "1"))
-        page_size = int(request.query_params.get("page_size", "20"))
-        data = paginate_queryset(qs, page=page, page_size=page_size)
+        # Conditional GET (polling): to'plam o'zgarmagan bo'lsa 304 — sahifa o'qilmaydi
+        fp = notification_list_fingerprint(qs)
+        validators = list_validators(request.get_full_path(), fp)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        rows = values_with_keys(qs, NOTIFICATION_LIST_FIELDS, NOTIFICATION_LIST_KEYS)
+        try:
+            data = paginate_request(
+                rows, request.query_params, keys=NOTIFICATION_LIST_KEYS, default_page_size=20, count=fp["count"]
+            )
+            data["results"] = list(data["results"])
+        except AppError as e:
+            return error_response(e)
 
-        return Response({
-            "page": data["page"],
-            "page_size": data["page_size"],
-            "count": data["count"],
-            "results": NotificationListSerializer(data["results"], many=True).data,
-        })
+        data["results"] = fast_rows(data["results"], NOTIFICATION_LIST_FIELDS)
+        return Response(data, headers=validators.headers)
 
 
 class NotificationDetailView(APIView):